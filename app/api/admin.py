@@ -0,0 +1,147 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import ValidationError
+
+from app import models
+from app.api.auth import get_current_admin_user
+from app.core.config import settings
+from app.core.jobs import JobQueueFull, job_runner
+from app.core.profiler import SamplingProfiler, request_profiles
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+)
+
+# One process-wide profile at a time
+_profile_lock = threading.Lock()
+
+
+def _collapsed_response(profiler: SamplingProfiler, name: str, headers: Optional[dict] = None) -> PlainTextResponse:
+    """Collapsed stacks as a downloadable file, ready for flamegraph.pl or speedscope"""
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.collapsed"
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(profiler.samples),
+            "X-Profile-Duration": f"{profiler.duration:.3f}",
+            **(headers or {}),
+        },
+    )
+
+
+def _interval_seconds(interval_ms: Optional[float]) -> float:
+    return (interval_ms or settings.PROFILER_INTERVAL_MS) / 1000
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_process(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000),
+    include_idle: bool = False,
+    current_user: models.User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Sample every thread of this worker process for `seconds` and return the
+    collapsed stacks.
+    """
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profiles are limited to {settings.PROFILER_MAX_SECONDS} seconds",
+        )
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    try:
+        profiler = SamplingProfiler(_interval_seconds(interval_ms), include_idle).start()
+        try:
+            # The event loop keeps serving requests while the sampler thread records them
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    finally:
+        _profile_lock.release()
+    return _collapsed_response(profiler, "process")
+
+
+@router.post("/profile/request")
+async def arm_request_profile(
+    path_prefix: str = Query(..., min_length=1),
+    method: Optional[str] = None,
+    interval_ms: Optional[float] = Query(None, ge=0.5, le=1000),
+    current_user: models.User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Profile the next request whose path starts with `path_prefix` (and uses
+    `method`, if given). Fetch the result from GET /admin/profile/request.
+    """
+    profile = request_profiles.arm(path_prefix, method, _interval_seconds(interval_ms))
+    return {"path_prefix": profile.path_prefix, "method": profile.method, "armed_at": profile.armed_at}
+
+
+@router.delete("/profile/request", status_code=status.HTTP_204_NO_CONTENT)
+async def disarm_request_profile(
+    current_user: models.User = Depends(get_current_admin_user),
+) -> None:
+    """Cancel an armed request profile"""
+    request_profiles.disarm()
+
+
+@router.get("/profile/request", response_class=PlainTextResponse)
+async def get_request_profile(
+    current_user: models.User = Depends(get_current_admin_user),
+) -> Any:
+    """Collapsed stacks of the last profiled request"""
+    profile = request_profiles.latest
+    if profile is None:
+        detail = "The armed request has not arrived yet" if request_profiles.armed else "No request has been profiled"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return _collapsed_response(profile.profiler, "request", {
+        "X-Profile-Path": profile.path,
+        "X-Profile-Status": str(profile.status_code),
+    })
+
+
+@router.get("/jobs")
+async def get_jobs(
+    current_user: models.User = Depends(get_current_admin_user),
+) -> Any:
+    """Background job queues, journal counts and the most recent failures"""
+    if not job_runner.running:
+        return {"running": False, "types": job_runner.status()}
+    return {
+        "running": True,
+        "types": job_runner.status(),
+        "journal": await run_in_threadpool(job_runner.store.counts),
+        "failed": await run_in_threadpool(job_runner.store.failed, 20),
+    }
+
+
+@router.post("/jobs/{job_type}", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    job_type: str,
+    payload: Optional[Dict[str, Any]] = Body(None),
+    current_user: models.User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Queue a background job, e.g. rebuild_goal_stats or precompute_recommendations.
+    `deduplicated` is true when an equal job was already waiting.
+    """
+    if job_type not in job_runner.types:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown job type '{job_type}'")
+    if not job_runner.running:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Background jobs are not running")
+    try:
+        job_id = await job_runner.submit(job_type, payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors(include_url=False))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return {"job_type": job_type, "id": job_id, "deduplicated": job_id is None}
@@ -3,13 +3,15 @@ from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.concurrency import run_in_threadpool
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
 from app.core.config import settings
 from app.core.security import create_access_token, get_password_hash, verify_password
-from app.db.base import get_db
+from app.db.base import get_async_db
 from app.schemas.auth import UserCreate, UserLogin, UserProfile, Token
 from app.models.users import User, GoalProgress
 router = APIRouter(
@@ -20,8 +22,8 @@ router = APIRouter(
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme),
 ) -> models.User:
     """
@@ -48,23 +50,38 @@ def get_current_user(
         raise credentials_exception
     
     # Get user from database
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.scalar(select(models.User).where(models.User.id == user_id))
     if user is None:
         raise credentials_exception
     
     return user
 
 
+async def get_current_admin_user(
+    current_user: models.User = Depends(get_current_user),
+) -> models.User:
+    """
+    Get the current user if they are listed in ADMIN_USERNAMES.
+    Used by the operational endpoints under /api/admin.
+    """
+    if current_user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
+
+
 @router.post("/register", response_model=schemas.Token)
-def register_user(
+async def register_user(
     user_in: schemas.UserCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Register a new user and return access token.
     """
     # Check if username already exists
-    user_by_username = db.query(models.User).filter(models.User.username == user_in.username).first()
+    user_by_username = await db.scalar(select(models.User).where(models.User.username == user_in.username))
     if user_by_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -72,25 +89,26 @@ def register_user(
         )
     
     # Check if email already exists
-    user_by_email = db.query(models.User).filter(models.User.email == user_in.email).first()
+    user_by_email = await db.scalar(select(models.User).where(models.User.email == user_in.email))
     if user_by_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
     
-    # Create new user
+    # Create new user (bcrypt is CPU-bound, keep it off the event loop)
+    hashed_password = await run_in_threadpool(get_password_hash, user_in.password)
     user = models.User(
         username=user_in.username,
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         grade_level=user_in.grade_level,
         created_at=datetime.utcnow(),
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Generate access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -106,17 +124,17 @@ def register_user(
 
 
 @router.post("/login", response_model=schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
     # Try to find user by username
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
+    user = await db.scalar(select(models.User).where(models.User.username == form_data.username))
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -125,7 +143,7 @@ def login_for_access_token(
     
     # Update last login time
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Generate token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -141,18 +159,18 @@ def login_for_access_token(
 
 
 @router.post("/login-json", response_model=schemas.Token)
-def login_json(
+async def login_json(
     user_in: schemas.UserLogin,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     JSON endpoint for login (alternative to form-based OAuth2 flow).
     Used by the Streamlit frontend.
     """
     # Try to find user by username
-    user = db.query(models.User).filter(models.User.username == user_in.username).first()
+    user = await db.scalar(select(models.User).where(models.User.username == user_in.username))
     
-    if not user or not verify_password(user_in.password, user.hashed_password):
+    if not user or not await run_in_threadpool(verify_password, user_in.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -160,7 +178,7 @@ def login_json(
     
     # Update last login time
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Generate token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -176,7 +194,7 @@ def login_json(
 
 
 @router.get("/user", response_model=schemas.UserProfile)
-def get_user_profile(
+async def get_user_profile(
     current_user: models.User = Depends(get_current_user),
 ) -> Any:
     """
@@ -0,0 +1,85 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from app import models
+from app.api.auth import get_current_user
+from app.core.config import settings
+from app.db import neo4j
+from app.schemas.curriculum import ChapterBase, ChapterDetail, CurriculumStructure, GoalBase
+from app.services.curriculum_snapshot import curriculum_snapshot
+
+router = APIRouter(
+    prefix="/curriculum",
+    tags=["curriculum"],
+)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored, * matches anything"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+async def _cached_response(resource: str, if_none_match: Optional[str], missing_detail: str = "Not found") -> Response:
+    """
+    Serve a pre-serialized curriculum resource with its ETag, or an empty 304
+    when the client already holds the current version
+    """
+    try:
+        await run_in_threadpool(curriculum_snapshot.ensure_fresh, neo4j.neo4j_db)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Curriculum graph is unavailable",
+        )
+
+    etag, body = curriculum_snapshot.get(resource)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=missing_detail)
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={settings.CURRICULUM_CACHE_MAX_AGE_SECONDS}"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/structure", response_model=CurriculumStructure)
+async def get_curriculum_structure(
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(get_current_user),
+) -> Response:
+    """Get the full curriculum tree: chapters with their requirements and goals"""
+    return await _cached_response("structure", if_none_match)
+
+
+@router.get("/chapters", response_model=List[ChapterBase])
+async def list_chapters(
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(get_current_user),
+) -> Response:
+    """Get all curriculum chapters"""
+    return await _cached_response("chapters", if_none_match)
+
+
+@router.get("/chapters/{chapter_id}", response_model=ChapterDetail)
+async def get_chapter(
+    chapter_id: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(get_current_user),
+) -> Response:
+    """Get one chapter with its requirements and goals"""
+    return await _cached_response(f"chapter:{chapter_id}", if_none_match, "Chapter not found")
+
+
+@router.get("/goals", response_model=List[GoalBase])
+async def list_goals(
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(get_current_user),
+) -> Response:
+    """Get all curriculum goals"""
+    return await _cached_response("goals", if_none_match)
@@ -0,0 +1,131 @@
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.api.auth import get_current_user
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter, get_bucket_store
+from app.db.base import get_async_db
+from app.schemas.problems import GoalBase, ProblemRecommendation, TokenUsageSummary
+from app.services import progress_tracking, recommendations, usage
+from app.services.recommendations import RECOMMENDATION_LIMIT
+
+
+async def _enforce_limit(name: str, key: str, per_minute: float, burst: int) -> None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    store = get_bucket_store()
+    limiter = RateLimiter(name, per_minute, burst, store)
+    result = await run_in_threadpool(limiter.hit, key) if store.blocking else limiter.hit(key)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, slow down",
+            headers={"Retry-After": result.retry_after_header},
+        )
+
+
+async def limit_by_ip(request: Request) -> None:
+    """Per-client-IP token bucket, checked before the user is authenticated"""
+    host = request.client.host if request.client else "unknown"
+    await _enforce_limit("ip", host, settings.RATE_LIMIT_IP_PER_MINUTE, settings.RATE_LIMIT_IP_BURST)
+
+
+async def limit_by_user(current_user: models.User = Depends(get_current_user)) -> None:
+    """Per-user token bucket"""
+    await _enforce_limit(
+        "user", str(current_user.id), settings.RATE_LIMIT_USER_PER_MINUTE, settings.RATE_LIMIT_USER_BURST,
+    )
+
+
+async def require_token_budget(
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Optional[int]:
+    """
+    Refuse the request once the user has spent today's DAILY_TOKEN_BUDGET.
+    Add to endpoints that call the LLM; returns the tokens left (None if unlimited).
+    """
+    remaining = await usage.remaining_budget(db, current_user.id)
+    if remaining == 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Daily token budget exhausted",
+            headers={"Retry-After": str(int(usage.seconds_until_reset()) + 1)},
+        )
+    return remaining
+
+
+router = APIRouter(
+    prefix="/problems",
+    tags=["problems"],
+    # The IP limit runs first so unauthenticated floods never reach the user lookup
+    dependencies=[Depends(limit_by_ip), Depends(limit_by_user)],
+)
+
+
+@router.get("/recommendations", response_model=List[ProblemRecommendation])
+async def get_recommendations(
+    limit: int = Query(10, ge=1, le=RECOMMENDATION_LIMIT),
+    min_difficulty: int = Query(1, ge=1, le=5),
+    max_difficulty: int = Query(5, ge=1, le=5),
+    subject_area: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Get recommended problems for the current user, targeting their weakest goals.
+    Served from the nightly precomputed list, recomputed on the fly when it is stale.
+    Filters apply to the precomputed list; if too few of its problems match, the
+    user is rescored with the filters.
+    """
+    entries = await recommendations.get_filtered_recommendations(
+        db, current_user.id, limit, min_difficulty, max_difficulty, subject_area,
+    )
+
+    # One Neo4j round trip each for problem texts and goal descriptions, off the event loop
+    details = await run_in_threadpool(
+        progress_tracking.get_problem_details, [entry["problem_id"] for entry in entries]
+    )
+    goal_descriptions = await run_in_threadpool(
+        recommendations.get_goal_descriptions,
+        [goal_id for entry in entries for goal_id in entry["goal_ids"]],
+    )
+
+    items = []
+    for entry in entries:
+        related_goals = [
+            GoalBase(id=goal_id, description=goal_descriptions.get(goal_id) or goal_id)
+            for goal_id in entry["goal_ids"]
+        ]
+        items.append(ProblemRecommendation(
+            problem_id=entry["problem_id"],
+            problem_text=details.get(entry["problem_id"], {}).get("text") or "",
+            subject_area=entry["subject_area"],
+            difficulty=entry["difficulty"],
+            related_goals=related_goals,
+            recommendation_reason=f"Practices {related_goals[0].description}" if related_goals else "",
+        ))
+    return items
+
+
+@router.get("/usage", response_model=TokenUsageSummary)
+async def get_token_usage(
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Get the current user's LLM usage for today (UTC) and what is left of their daily token budget.
+    """
+    today = await usage.get_usage(db, current_user.id)
+    return TokenUsageSummary(
+        day=usage.usage_day(),
+        requests=today.requests if today else 0,
+        prompt_tokens=today.prompt_tokens if today else 0,
+        completion_tokens=today.completion_tokens if today else 0,
+        daily_budget=settings.DAILY_TOKEN_BUDGET or None,
+        remaining=await usage.remaining_budget(db, current_user.id),
+    )
@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.api.auth import get_current_admin_user, get_current_user
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.db import neo4j
+from app.db.base import get_async_db
+from app.schemas.pagination import Page
+from app.schemas.problems import ProblemHistoryResponse
+from app.schemas.progress import (
+    ClassGoalStats,
+    GoalPracticeCreate,
+    GoalProgressResponse,
+    KnowledgeGapResponse,
+    UserProgressSummary,
+)
+from app.services import jobs, progress_tracking, recommendations
+
+router = APIRouter(
+    prefix="/progress",
+    tags=["progress"],
+)
+
+
+def _read_cursor(scope: str, cursor: str, parse_key) -> Any:
+    """Decode a page cursor into a sort key, rejecting anything we did not sign"""
+    try:
+        return parse_key(decode_cursor(scope, cursor))
+    except (InvalidCursorError, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def _goal_key(values) -> tuple:
+    goal_id, row_id = values
+    return str(goal_id), int(row_id)
+
+
+def _history_key(values) -> tuple:
+    attempted_at, row_id = values
+    return datetime.fromisoformat(attempted_at), int(row_id)
+
+
+@router.get("/goals", response_model=Page[GoalProgressResponse])
+async def list_goal_progress(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Get the current user's progress for practiced curriculum goals, one page at a time.
+    Pass `next_cursor` from a response as `cursor` to get the following page.
+    """
+    scope = f"goals:{current_user.id}"
+    after = _read_cursor(scope, cursor, _goal_key) if cursor else None
+    rows, last_key = await progress_tracking.get_goal_progress_page(db, current_user.id, limit, after)
+
+    return {
+        "items": rows,
+        "next_cursor": encode_cursor(scope, list(last_key)) if last_key else None,
+    }
+
+
+@router.post("/goals/{goal_id}/practice", response_model=GoalProgressResponse)
+async def record_goal_practice(
+    goal_id: str,
+    practice: GoalPracticeCreate,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Record one practice of a curriculum goal by the current user and return the
+    updated progress.
+    """
+    progress = await progress_tracking.record_goal_practice(db, current_user.id, goal_id, practice.successful)
+    # Mastery changed, so rescore the user's recommendations after the response
+    await jobs.refresh_recommendations_later(current_user.id)
+    return progress
+
+
+@router.get("/class/goals", response_model=List[ClassGoalStats])
+async def get_class_goal_stats(
+    grade_level: Optional[int] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=500),
+    current_user: models.User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Get class-wide statistics per curriculum goal, weakest average mastery first,
+    optionally for one grade level (0 for users without a grade level). Admins only.
+    """
+    return await progress_tracking.get_class_goal_stats(db, grade_level, limit)
+
+
+@router.get("/history", response_model=Page[ProblemHistoryResponse])
+async def list_problem_history(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Get the current user's problem attempts, newest first, one page at a time.
+    Pass `next_cursor` from a response as `cursor` to get the following page.
+    """
+    scope = f"history:{current_user.id}"
+    before = _read_cursor(scope, cursor, _history_key) if cursor else None
+    rows, last_key = await progress_tracking.get_problem_history_page(db, current_user.id, limit, before)
+
+    # One Neo4j round trip per page for problem texts, off the event loop
+    details = await run_in_threadpool(
+        progress_tracking.get_problem_details, [row.problem_id for row in rows], current_user.id
+    )
+    items = [
+        ProblemHistoryResponse(
+            problem_id=row.problem_id,
+            problem_text=details.get(row.problem_id, {}).get("text") or "",
+            subject_area=details.get(row.problem_id, {}).get("subject_area") or "",
+            attempted_at=row.attempted_at,
+            completed=bool(row.completed),
+            time_spent_seconds=row.time_spent_seconds,
+            steps_completed=row.steps_completed or 0,
+            steps_with_hints=row.steps_with_hints or 0,
+        )
+        for row in rows
+    ]
+
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(scope, list(last_key)) if last_key else None,
+    }
+
+
+@router.get("/summary", response_model=UserProgressSummary)
+async def get_progress_summary(
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Get a summary of the current user's learning progress.
+    """
+    return await progress_tracking.get_progress_summary(db, current_user.id)
+
+
+@router.get("/gaps", response_model=List[KnowledgeGapResponse])
+async def get_knowledge_gaps(
+    limit: int = Query(5, ge=1, le=50),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Get the root causes behind the current user's weak goals: weak or never
+    practiced prerequisites whose own prerequisites are mastered, most impactful first.
+    """
+    # numpy-backed; imported on first use so it stays out of app startup
+    from app.services.knowledge_gaps import prerequisite_graph
+
+    mastery = {row.goal_id: row.mastery_level for row in await progress_tracking.get_goal_progress(db, current_user.id)}
+    try:
+        await run_in_threadpool(prerequisite_graph.ensure_loaded, neo4j.neo4j_db)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Curriculum graph is unavailable",
+        )
+
+    gaps = prerequisite_graph.root_gaps(mastery, limit=limit)
+    descriptions = await run_in_threadpool(recommendations.get_goal_descriptions, [gap.goal_id for gap in gaps])
+    return [
+        KnowledgeGapResponse(
+            goal_id=gap.goal_id,
+            goal_description=descriptions.get(gap.goal_id),
+            mastery_level=gap.mastery_level,
+            pressure=round(gap.pressure, 4),
+        )
+        for gap in gaps
+    ]
@@ -0,0 +1,301 @@
+"""
+Two-tier cache shared by the worker processes of one host.
+
+`TieredCache` keeps recently used values in process memory (L1, a bounded LRU
+with per-entry expiry) in front of a SQLite file in WAL mode (L2) that every
+worker on the host opens. A miss in L1 reads L2 before the caller falls back
+to the source (Neo4j, the LLM), so a value loaded by one worker is a cheap
+local read for all the others, and adding workers adds neither cold misses
+on the source nor copies beyond each worker's L1.
+
+Values are stored in L2 in one format for every tier: bytes as they are, any
+other value as JSON (orjson when installed). L1 holds what an L2 read would
+return, so a cached value looks the same whichever tier served it.
+
+`delete` removes a key from L2 and appends it to an invalidation log. Each
+worker checks SQLite's `data_version` (which changes when another connection
+commits) at most every `poll_seconds` and drops the logged keys from its L1,
+so an invalidation reaches every worker within that interval without any
+extra process. Writes with `set` are broadcast the same way.
+
+L2 is opened on first use; with `path=None` the cache is L1 only. Lookups are
+counted per answering tier in the /metrics registry.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import Counter, registry
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# First byte of an encoded value
+RAW_BYTES = b"b"
+JSON_VALUE = b"j"
+
+CACHE_LOOKUPS = registry.register(Counter(
+    "cache_lookups_total", "Shared cache lookups by the tier that answered (l1, l2 or miss)", ("result",),
+))
+
+# How long invalidation log entries are kept for workers that poll late
+INVALIDATION_LOG_SECONDS = 3600
+
+
+def encode(value: Any) -> bytes:
+    """Cache representation of a value: bytes as is, anything else as JSON"""
+    if isinstance(value, (bytes, bytearray)):
+        return RAW_BYTES + bytes(value)
+    if orjson is not None:
+        return JSON_VALUE + orjson.dumps(value)
+    return JSON_VALUE + json.dumps(value, separators=(",", ":")).encode()
+
+
+def decode(data: bytes) -> Any:
+    tag, payload = data[:1], data[1:]
+    if tag == RAW_BYTES:
+        return payload
+    if tag == JSON_VALUE:
+        return orjson.loads(payload) if orjson is not None else json.loads(payload)
+    raise ValueError(f"Unknown cache encoding {tag!r}")
+
+
+class SQLiteCacheStore:
+    """L2: cache entries and the invalidation log in a SQLite file, one connection behind a lock"""
+
+    def __init__(self, path: str, busy_timeout_ms: int = 1000):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=busy_timeout_ms / 1000, check_same_thread=False, isolation_level=None,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_invalidations ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, at REAL NOT NULL)"
+        )
+
+    def _fetch(self, sql: str, parameters=()) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _write(self, statements: List[Tuple[str, tuple]]) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, parameters in statements:
+                    self._connection.execute(sql, parameters)
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def get(self, key: str, now: float) -> Optional[Tuple[bytes, Optional[float]]]:
+        """(encoded value, expiry) of a live entry"""
+        rows = self._fetch(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, now),
+        )
+        return (rows[0][0], rows[0][1]) if rows else None
+
+    def set(self, key: str, data: bytes, expires_at: Optional[float], now: float) -> None:
+        self._write([
+            ("INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?) "
+             "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+             (key, data, expires_at)),
+            ("INSERT INTO cache_invalidations (key, at) VALUES (?, ?)", (key, now)),
+        ])
+
+    def delete(self, key: str, now: float) -> None:
+        self._write([
+            ("DELETE FROM cache_entries WHERE key = ?", (key,)),
+            ("INSERT INTO cache_invalidations (key, at) VALUES (?, ?)", (key, now)),
+        ])
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits to the file"""
+        return self._fetch("PRAGMA data_version")[0][0]
+
+    def last_seq(self) -> int:
+        return self._fetch("SELECT COALESCE(MAX(seq), 0) FROM cache_invalidations")[0][0]
+
+    def invalidations_since(self, seq: int) -> List[Tuple[int, str]]:
+        return self._fetch("SELECT seq, key FROM cache_invalidations WHERE seq > ? ORDER BY seq", (seq,))
+
+    def prune(self, now: float) -> None:
+        """Drop expired entries and old invalidation log rows"""
+        self._write([
+            ("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)),
+            ("DELETE FROM cache_invalidations WHERE at < ?", (now - INVALIDATION_LOG_SECONDS,)),
+        ])
+
+    def clear(self, now: float) -> None:
+        """Delete every entry, logging an invalidation for each"""
+        self._write([
+            ("INSERT INTO cache_invalidations (key, at) SELECT key, ? FROM cache_entries", (now,)),
+            ("DELETE FROM cache_entries", ()),
+        ])
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class TieredCache:
+    """In-process LRU (L1) in front of a SQLite store shared between processes (L2)"""
+
+    def __init__(
+        self,
+        path: Optional[str],
+        max_entries: int = 1024,
+        poll_seconds: float = 1.0,
+        prune_every: int = 1000,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.poll_seconds = poll_seconds
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self._l1: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._l2: Optional[SQLiteCacheStore] = None
+        self._l2_lock = threading.Lock()
+        self._seen_version: Optional[int] = None
+        self._seen_seq = 0
+        self._next_poll = 0.0
+        self._writes = 0
+
+    @property
+    def l2(self) -> Optional[SQLiteCacheStore]:
+        if self.path is None:
+            return None
+        if self._l2 is None:
+            with self._l2_lock:
+                if self._l2 is None:
+                    store = SQLiteCacheStore(self.path)
+                    # Only invalidations made from now on concern this process
+                    self._seen_seq = store.last_seq()
+                    self._seen_version = store.data_version()
+                    self._l2 = store
+        return self._l2
+
+    def _sync_invalidations(self, now: float) -> None:
+        """Drop L1 keys that other processes changed, checked at most every poll_seconds"""
+        if now < self._next_poll or self.l2 is None:
+            return
+        self._next_poll = now + self.poll_seconds
+        version = self._l2.data_version()
+        if version == self._seen_version:
+            return
+        self._seen_version = version
+        changes = self._l2.invalidations_since(self._seen_seq)
+        if not changes:
+            return
+        with self._lock:
+            for seq, key in changes:
+                self._l1.pop(key, None)
+                self._seen_seq = max(self._seen_seq, seq)
+
+    def _l1_put(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._l1[key] = (value, expires_at)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.max_entries:
+                self._l1.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """The cached value, or None when neither tier has a live entry"""
+        now = time.time()
+        self._sync_invalidations(now)
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._l1.move_to_end(key)
+                    CACHE_LOOKUPS.inc("l1")
+                    return value
+                del self._l1[key]
+
+        if self.l2 is not None:
+            try:
+                found = self._l2.get(key, now)
+            except sqlite3.Error as e:
+                logger.error(f"Shared cache read failed for {key}: {str(e)}")
+                found = None
+            if found is not None:
+                data, expires_at = found
+                value = decode(data)
+                self._l1_put(key, value, expires_at)
+                CACHE_LOOKUPS.inc("l2")
+                return value
+        CACHE_LOOKUPS.inc("miss")
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> Any:
+        """Store a value in both tiers for `ttl` seconds (None: until deleted). Returns it as cached."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        data = encode(value)
+        # L1 keeps what L2 readers get back, e.g. lists for tuples
+        cached = value if isinstance(value, bytes) else decode(data)
+        self._l1_put(key, cached, expires_at)
+        if self.l2 is not None:
+            try:
+                self._l2.set(key, data, expires_at, now)
+                self._writes += 1
+                if self._writes % self.prune_every == 0:
+                    self._l2.prune(now)
+            except sqlite3.Error as e:
+                logger.error(f"Shared cache write failed for {key}: {str(e)}")
+        return cached
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = self.set(key, loader(), ttl)
+        return value
+
+    def delete(self, key: str) -> None:
+        """Remove a key here and in L2, and tell the other processes to drop it from their L1"""
+        with self._lock:
+            self._l1.pop(key, None)
+        if self.l2 is not None:
+            self._l2.delete(key, time.time())
+
+    def clear(self) -> None:
+        """Empty both tiers; the other processes drop the cleared keys from their L1"""
+        with self._lock:
+            self._l1.clear()
+        if self.l2 is not None:
+            self._l2.clear(time.time())
+
+    def close(self) -> None:
+        if self._l2 is not None:
+            self._l2.close()
+            self._l2 = None
+
+
+@lru_cache(maxsize=None)
+def get_shared_cache() -> TieredCache:
+    """Shared cache configured by the CACHE_* settings, created on first use"""
+    return TieredCache(
+        settings.CACHE_SQLITE_PATH or None,
+        max_entries=settings.CACHE_L1_MAX_ENTRIES,
+        poll_seconds=settings.CACHE_INVALIDATION_POLL_SECONDS,
+    )
@@ -0,0 +1,188 @@
+"""
+gzip / brotli response compression.
+
+`CompressionMiddleware` compresses JSON and text responses of at least
+`minimum_size` bytes with the best encoding the client accepts (brotli when
+the brotli package is installed, then gzip). Small bodies, bodies that are
+already encoded, `Cache-Control: no-transform` responses and streamed
+responses are sent as they are.
+
+Responses that carry an ETag (the curriculum endpoints) are compressed once per
+(path, ETag, encoding) at the highest level and the compressed bytes are kept
+in a small LRU cache, since the same version is served over and over. Other
+responses are compressed on the fly at the cheaper configured level.
+
+A compressed response is a different representation, so a strong ETag is sent
+weak (`W/"..."`). The curriculum router compares If-None-Match weakly, so
+revalidation keeps working.
+"""
+import gzip
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+# Levels used for cached bodies, which are compressed once and reused
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 11
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings the server can produce, in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str, available: Optional[Tuple[str, ...]] = None) -> Optional[str]:
+    """Pick the preferred available encoding from an Accept-Encoding header, honoring q=0"""
+    available = available or supported_encodings()
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+    candidates = [
+        (weights.get(coding, weights.get("*", 0.0)), -rank, coding) for rank, coding in enumerate(available)
+    ]
+    weight, _, coding = max(candidates)
+    return coding if weight > 0 else None
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (path, ETag, encoding)"""
+
+    def __init__(self, max_entries: int = 256):
+        self._entries = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses with brotli or gzip"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache_size: int = 256,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+        self.cache = CompressedBodyCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                passthrough = not self._compressible(Headers(raw=message["headers"]))
+                if passthrough:
+                    await send(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streamed and small responses go out unchanged
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                body = await self._compress(scope, headers.get("etag"), body, encoding)
+                headers["Content-Encoding"] = encoding
+                weaken_etag(headers)
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(headers: Headers) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+
+    async def _compress(self, scope: Scope, etag: Optional[str], body: bytes, encoding: str) -> bytes:
+        if etag is None:
+            return compress(body, encoding, self.levels[encoding])
+
+        query = scope.get("query_string", b"").decode("latin-1")
+        key = (scope["path"], query, etag, encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            # Brotli at quality 11 takes ~200 ms for a 100 KB tree; keep it off the event loop
+            level = CACHED_BROTLI_QUALITY if encoding == "br" else CACHED_GZIP_LEVEL
+            compressed = await run_in_threadpool(compress, body, encoding, level)
+            self.cache.put(key, compressed)
+        return compressed
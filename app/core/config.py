@@ -12,6 +12,17 @@ class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     PROJECT_NAME: str = "AI Math Tutor"
+    # Serialize responses with orjson (when installed) instead of the stdlib json module
+    FAST_JSON_RESPONSES: bool = False
+    # Per-route request metrics, served in Prometheus text format at /metrics
+    METRICS_ENABLED: bool = True
+    # gzip/brotli response compression: bodies smaller than the minimum are sent as is
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    # Compressed bodies of responses with an ETag kept for reuse (entries, 0 disables)
+    COMPRESSION_CACHE_SIZE: int = 256
     
     # CORS Settings - default to allowing local development URLs
     BACKEND_CORS_ORIGINS: Union[str, List[str]] = ["http://localhost:8501", "http://localhost:8000"]
@@ -35,16 +46,81 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your_secret_key_change_this_in_production"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Users allowed to call the /api/admin endpoints (JSON list or comma-separated)
+    ADMIN_USERNAMES: Union[str, List[str]] = []
+
+    @field_validator("ADMIN_USERNAMES", mode="before")
+    def assemble_admin_usernames(cls, v: Union[str, List[str]]) -> List[str]:
+        if isinstance(v, str):
+            if v.startswith("["):
+                import json
+                return json.loads(v)
+            return [i.strip() for i in v.split(",") if i.strip()]
+        return v or []
+
+    # Sampling profiler behind the admin endpoints: longest run and sampling interval
+    PROFILER_MAX_SECONDS: int = 60
+    PROFILER_INTERVAL_MS: float = 5.0
     
     # Database
     # Using SQLite instead of PostgreSQL
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///./app.db"
     
+    # Shared cache: in-process LRU (L1) in front of a SQLite file shared by the
+    # workers of one host (L2; empty disables it). Workers see each other's
+    # invalidations within the poll interval
+    CACHE_SQLITE_PATH: str = "./cache.db"
+    CACHE_L1_MAX_ENTRIES: int = 1024
+    CACHE_INVALIDATION_POLL_SECONDS: float = 1.0
+
+    # Curriculum
+    # How long the in-memory curriculum snapshot is served before it is reloaded from Neo4j
+    CURRICULUM_SNAPSHOT_TTL_SECONDS: int = 300
+    # Cache-Control max-age on curriculum responses
+    CURRICULUM_CACHE_MAX_AGE_SECONDS: int = 300
+
+    # Recommendations
+    # Precomputed lists older than this are recomputed online when requested
+    RECOMMENDATION_MAX_AGE_HOURS: int = 24
+
+    # Rate limits on /api/problems: token buckets per user and per client IP
+    # (sustained requests per minute, burst), kept in "memory" per worker or
+    # in a "sqlite" file shared by the workers of one host
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_USER_PER_MINUTE: float = 30
+    RATE_LIMIT_USER_BURST: int = 10
+    RATE_LIMIT_IP_PER_MINUTE: float = 120
+    RATE_LIMIT_IP_BURST: int = 40
+    RATE_LIMIT_STORE: str = "memory"
+    RATE_LIMIT_SQLITE_PATH: str = "./rate_limits.db"
+    # LLM tokens a user may spend per UTC day (0 disables the budget)
+    DAILY_TOKEN_BUDGET: int = 200000
+
+    # Critical startup steps that fail (e.g. Neo4j not up yet) are retried in the
+    # background, first after this delay, doubling up to the maximum
+    STARTUP_RETRY_INITIAL_SECONDS: float = 1.0
+    STARTUP_RETRY_MAX_SECONDS: float = 30.0
+
+    # Background jobs: unfinished jobs are journaled in this SQLite file, shared by
+    # the API workers, and queued jobs get this long to finish on shutdown. Jobs of
+    # a worker that stops renewing its lease are taken over once the lease expires
+    JOBS_ENABLED: bool = True
+    JOBS_SQLITE_PATH: str = "./jobs.db"
+    JOBS_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+    JOBS_LEASE_SECONDS: float = 60.0
 
     # Neo4j - Explicitly use localhost and default Neo4j credentials
     NEO4J_URI: str = "bolt://localhost:7687"
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "password"
+    # Share of registered queries run under PROFILE to record db hits (0 disables)
+    NEO4J_PROFILE_SAMPLE_RATE: float = 0.0
+    # Attempts per managed transaction on transient errors, and the first backoff (doubling)
+    NEO4J_TRANSACTION_MAX_ATTEMPTS: int = 5
+    NEO4J_RETRY_INITIAL_DELAY_SECONDS: float = 0.1
+    # Per-query timing stats are written on shutdown when set, one file per worker
+    # with the pid added to the name (query_stats.json -> query_stats.<pid>.json)
+    NEO4J_QUERY_STATS_PATH: Optional[str] = None
     # OpenAI
     OPENAI_API_KEY: str = "your_openai_api_key_here"
 
@@ -0,0 +1,433 @@
+"""
+In-process background jobs.
+
+Work that does not have to finish before the response is sent (refreshing a
+user's recommendations, rebuilding aggregates, batch scoring) is submitted to
+`job_runner` as a typed job and runs on the API worker itself, without an
+external broker:
+
+- A `JobType` names a handler, the pydantic model its payload is validated
+  against, where it runs (`async` on the event loop, `thread` in the
+  threadpool, or `process` in a process pool of its own), how many jobs of
+  the type run at once and how many may wait in its bounded queue. Submitting
+  to a full queue raises `JobQueueFull` instead of buffering without limit.
+- Every submitted job is written to a SQLite journal (`JobStore`) before it is
+  queued and deleted once it succeeds. Delivery is at least once: handlers
+  must be safe to run twice.
+- Failed jobs are retried with exponential backoff up to `max_attempts`, then
+  kept in the journal as failed for inspection.
+- Queue depth, running jobs, outcomes, queue wait and run time are exported
+  through the /metrics registry.
+
+`start()` and `stop()` are called from the FastAPI lifespan. Each worker
+process runs its own runner, and all of them share one journal: a job row is
+owned by the runner that submitted it and carries a lease, which the owner
+renews every third of `lease_seconds`. `start()`, and every renewal after it,
+takes over the unfinished jobs whose lease has expired (their worker died or
+stopped) with one atomic claim, so a job is queued by one runner at a time.
+`stop()` lets go of the leases at once, so what is left runs on the next
+runner that checks.
+"""
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Type, Union
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from pydantic import BaseModel
+
+from app.core.metrics import Counter, Gauge, Histogram, registry
+
+ASYNC = "async"
+THREAD = "thread"
+PROCESS = "process"
+
+PENDING = "pending"
+RUNNING = "running"
+FAILED = "failed"
+
+JOBS = registry.register(Counter(
+    "background_jobs_total", "Background job outcomes by type", ("job_type", "outcome"),
+))
+JOB_DURATION = registry.register(Histogram(
+    "background_job_duration_seconds", "Background job run time per attempt", ("job_type",),
+    (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 1800.0),
+))
+JOB_WAIT = registry.register(Histogram(
+    "background_job_wait_seconds", "Time from submission to the first attempt", ("job_type",),
+))
+JOBS_RUNNING = registry.register(Gauge(
+    "background_jobs_running", "Background jobs being run", ("job_type",),
+))
+
+
+class JobQueueFull(Exception):
+    """The job type's queue is at its limit"""
+
+
+class EmptyPayload(BaseModel):
+    """Payload of job types that take no arguments"""
+
+
+@dataclass
+class JobType:
+    """A kind of background job and how it runs"""
+    name: str
+    # Called with the validated payload; a coroutine function for ASYNC, a
+    # picklable module-level function for PROCESS
+    handler: Callable[[Any], Any]
+    payload_model: Type[BaseModel] = EmptyPayload
+    executor: str = THREAD
+    concurrency: int = 1
+    max_queue: int = 1000
+    max_attempts: int = 3
+    # Jobs with the same key are queued once: a submit while one waits is dropped
+    dedupe_key: Optional[Callable[[Any], str]] = None
+
+
+@dataclass
+class Job:
+    """One submitted job"""
+    job_type: str
+    payload: BaseModel
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    key: Optional[str] = None
+
+
+class JobStore:
+    """
+    Journal of unfinished jobs in a SQLite file shared by every worker. One
+    connection behind a lock; every call is a single short statement or
+    transaction, run from the threadpool. Jobs added through this store are
+    owned by it (`owner`) until their lease runs out.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=busy_timeout_ms / 1000, check_same_thread=False, isolation_level=None,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS background_jobs ("
+            "id TEXT PRIMARY KEY, job_type TEXT NOT NULL, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "enqueued_at REAL NOT NULL, updated_at REAL NOT NULL, error TEXT, "
+            "owner TEXT, lease_until REAL NOT NULL DEFAULT 0)"
+        )
+
+    def _execute(self, sql: str, parameters=()) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def add(self, job: Job) -> None:
+        now = time.time()
+        self._execute(
+            "INSERT INTO background_jobs "
+            "(id, job_type, payload, status, attempts, enqueued_at, updated_at, owner, lease_until) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.job_type, job.payload.model_dump_json(), PENDING, job.attempts, job.enqueued_at, now,
+             self.owner, now + self.lease_seconds),
+        )
+
+    def set_status(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        self._execute(
+            "UPDATE background_jobs SET status = ?, attempts = ?, updated_at = ?, error = ? WHERE id = ?",
+            (status, job.attempts, time.time(), error, job.id),
+        )
+
+    def remove(self, job_id: str) -> None:
+        self._execute("DELETE FROM background_jobs WHERE id = ?", (job_id,))
+
+    def renew(self) -> None:
+        """Extend the lease of this store's unfinished jobs"""
+        self._execute(
+            "UPDATE background_jobs SET lease_until = ? WHERE owner = ? AND status IN (?, ?)",
+            (time.time() + self.lease_seconds, self.owner, PENDING, RUNNING),
+        )
+
+    def release(self) -> None:
+        """Give up this store's unfinished jobs, so the next claim takes them over"""
+        self._execute(
+            "UPDATE background_jobs SET lease_until = 0 WHERE owner = ? AND status IN (?, ?)",
+            (self.owner, PENDING, RUNNING),
+        )
+
+    def claim_expired(self) -> List[Dict[str, Any]]:
+        """
+        Take over the pending and interrupted jobs whose lease has expired, oldest
+        first. Runs in one write transaction, so concurrent claims get disjoint jobs.
+        """
+        now = time.time()
+        where = "WHERE status IN (?, ?) AND lease_until < ?"
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._connection.execute(
+                    f"SELECT id, job_type, payload, attempts, enqueued_at FROM background_jobs {where} "
+                    "ORDER BY enqueued_at",
+                    (PENDING, RUNNING, now),
+                ).fetchall()
+                self._connection.execute(
+                    f"UPDATE background_jobs SET owner = ?, lease_until = ? {where}",
+                    (self.owner, now + self.lease_seconds, PENDING, RUNNING, now),
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        return [
+            {"id": row[0], "job_type": row[1], "payload": json.loads(row[2]), "attempts": row[3], "enqueued_at": row[4]}
+            for row in rows
+        ]
+
+    def failed(self, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = self._execute(
+            "SELECT id, job_type, payload, attempts, updated_at, error FROM background_jobs "
+            "WHERE status = ? ORDER BY updated_at DESC LIMIT ?",
+            (FAILED, limit),
+        )
+        return [
+            {"id": row[0], "job_type": row[1], "payload": json.loads(row[2]), "attempts": row[3],
+             "failed_at": row[4], "error": row[5]}
+            for row in rows
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._execute("SELECT status, COUNT(*) FROM background_jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class JobRunner:
+    """Queues, workers and journal of the registered job types"""
+
+    def __init__(self, retry_delay_seconds: float = 1.0):
+        self.types: Dict[str, JobType] = {}
+        self.retry_delay_seconds = retry_delay_seconds
+        self.store: Optional[JobStore] = None
+        self.running = False
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._queued_keys: Dict[str, Set[str]] = {}
+        self._pools: Dict[str, ProcessPoolExecutor] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def register(self, job_type: JobType) -> JobType:
+        if job_type.executor not in (ASYNC, THREAD, PROCESS):
+            raise ValueError(f"Unknown executor '{job_type.executor}' for job type {job_type.name}")
+        self.types[job_type.name] = job_type
+        return job_type
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def start(self, store_path: str, lease_seconds: float = 60.0) -> None:
+        """Open the journal, start the workers and queue the jobs left over by stopped runners"""
+        self.store = await run_in_threadpool(JobStore, store_path, lease_seconds)
+        for name, job_type in self.types.items():
+            self._queues[name] = asyncio.Queue(maxsize=job_type.max_queue)
+            self._queued_keys[name] = set()
+            if job_type.executor == PROCESS:
+                self._pools[name] = ProcessPoolExecutor(max_workers=job_type.concurrency)
+            for _ in range(job_type.concurrency):
+                self._spawn(self._worker(job_type))
+        self.running = True
+        await self._claim()
+        self._spawn(self._heartbeat())
+
+    async def _claim(self) -> None:
+        leftover = await run_in_threadpool(self.store.claim_expired)
+        if leftover:
+            logger.info(f"Recovering {len(leftover)} unfinished background jobs")
+            self._spawn(self._recover(leftover))
+
+    async def _heartbeat(self) -> None:
+        """Renew this runner's leases and take over jobs whose runner stopped renewing"""
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            try:
+                await run_in_threadpool(self.store.renew)
+                await self._claim()
+            except Exception as e:
+                logger.error(f"Could not renew background job leases: {str(e)}")
+
+    async def _recover(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            job_type = self.types.get(row["job_type"])
+            if job_type is None:
+                logger.warning(f"Skipping background job {row['id']} of unknown type {row['job_type']}")
+                continue
+            payload = job_type.payload_model.model_validate(row["payload"])
+            job = Job(row["job_type"], payload, id=row["id"], attempts=row["attempts"],
+                      enqueued_at=row["enqueued_at"], key=self._key(job_type, payload))
+            if job.key is not None:
+                self._queued_keys[job_type.name].add(job.key)
+            # Waits for room, so a long backlog does not overflow the queue
+            await self._queues[job_type.name].put(job)
+
+    @staticmethod
+    def _key(job_type: JobType, payload: BaseModel) -> Optional[str]:
+        return job_type.dedupe_key(payload) if job_type.dedupe_key is not None else None
+
+    async def submit(self, name: str, payload: Union[BaseModel, Dict[str, Any], None] = None) -> Optional[str]:
+        """
+        Validate, journal and queue a job. Returns its id, or None when an equal job
+        is already waiting. Raises KeyError for unknown types and JobQueueFull.
+        """
+        if not self.running:
+            raise RuntimeError("The background job runner is not running")
+        job_type = self.types[name]
+        if not isinstance(payload, job_type.payload_model):
+            payload = job_type.payload_model.model_validate(payload or {})
+        job = Job(name, payload, key=self._key(job_type, payload))
+        queue = self._queues[name]
+        if job.key is not None and job.key in self._queued_keys[name]:
+            JOBS.inc(name, "deduplicated")
+            return None
+        if queue.full():
+            JOBS.inc(name, "rejected")
+            raise JobQueueFull(f"The {name} queue is full ({job_type.max_queue} jobs)")
+
+        if job.key is not None:
+            self._queued_keys[name].add(job.key)
+        try:
+            await run_in_threadpool(self.store.add, job)
+            queue.put_nowait(job)
+        except BaseException:
+            self._queued_keys[name].discard(job.key)
+            raise
+        return job.id
+
+    async def _worker(self, job_type: JobType) -> None:
+        queue = self._queues[job_type.name]
+        while True:
+            job = await queue.get()
+            try:
+                await self._run(job_type, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Journal errors; the job stays in the journal and is retried on restart
+                logger.error(f"Background job {job.id} ({job_type.name}) could not be recorded: {str(e)}")
+            finally:
+                queue.task_done()
+
+    async def _run(self, job_type: JobType, job: Job) -> None:
+        name = job_type.name
+        # A submit from now on queues a new run, which sees this run's changes
+        self._queued_keys[name].discard(job.key)
+        job.attempts += 1
+        if job.attempts == 1:
+            JOB_WAIT.observe(max(0.0, time.time() - job.enqueued_at), name)
+        await run_in_threadpool(self.store.set_status, job, RUNNING)
+
+        JOBS_RUNNING.inc(name)
+        started = time.perf_counter()
+        try:
+            if job_type.executor == ASYNC:
+                await job_type.handler(job.payload)
+            elif job_type.executor == THREAD:
+                await run_in_threadpool(job_type.handler, job.payload)
+            else:
+                await asyncio.get_running_loop().run_in_executor(self._pools[name], job_type.handler, job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts < job_type.max_attempts:
+                delay = self.retry_delay_seconds * 2 ** (job.attempts - 1)
+                logger.warning(f"Background job {job.id} ({name}) failed, retrying in {delay:.1f}s: {error}")
+                JOBS.inc(name, "retried")
+                await run_in_threadpool(self.store.set_status, job, PENDING, error)
+                self._spawn(self._retry_later(job, delay))
+            else:
+                logger.error(f"Background job {job.id} ({name}) failed after {job.attempts} attempts: {error}")
+                JOBS.inc(name, "failed")
+                await run_in_threadpool(self.store.set_status, job, FAILED, error)
+            return
+        finally:
+            JOB_DURATION.observe(time.perf_counter() - started, name)
+            JOBS_RUNNING.dec(name)
+        JOBS.inc(name, "succeeded")
+        await run_in_threadpool(self.store.remove, job.id)
+
+    async def _retry_later(self, job: Job, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queues[job.job_type].put(job)
+
+    async def join(self) -> None:
+        """Wait until every queued job has been run (retries scheduled later excepted)"""
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop accepting jobs, give queued ones up to `timeout` seconds to finish, then
+        cancel the workers. Whatever did not finish stays journaled for the next start.
+        """
+        if not self.running:
+            return
+        self.running = False
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Background jobs still queued at shutdown; they run on the next start")
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
+        self._queues.clear()
+        self._queued_keys.clear()
+        await run_in_threadpool(self.store.release)
+        await run_in_threadpool(self.store.close)
+
+    def status(self) -> Dict[str, Any]:
+        """Per-type queue state, for the admin endpoint"""
+        return {
+            name: {
+                "executor": job_type.executor,
+                "concurrency": job_type.concurrency,
+                "queued": self._queues[name].qsize() if name in self._queues else 0,
+                "max_queue": job_type.max_queue,
+                "running": int(JOBS_RUNNING.value(name)),
+            }
+            for name, job_type in self.types.items()
+        }
+
+
+# Shared job runner instance
+job_runner = JobRunner()
+
+
+def job_queue_lines() -> List[str]:
+    """Queue depth per job type at scrape time"""
+    depth = Gauge("background_job_queue_depth", "Background jobs waiting in the queue", ("job_type",))
+    for name, queue in list(job_runner._queues.items()):
+        depth.inc(name, amount=queue.qsize())
+    return depth.render()
+
+
+registry.add_collector(job_queue_lines)
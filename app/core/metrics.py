@@ -0,0 +1,311 @@
+"""
+In-process request metrics in the Prometheus text exposition format.
+
+`RequestMetricsMiddleware` records, per route template (`/api/progress/goals`,
+not the concrete URL): request counts by status, latency and response size
+histograms, requests in flight, and the time each request spent in SQL and in
+Neo4j. The DB and Neo4j time is collected through a context variable holding
+the current request's `RequestTimings`: SQLAlchemy engines are instrumented
+with `instrument_engine`, and `Neo4jDatabase` calls `add_neo4j_time` per
+transaction. Context variables follow the request into the threadpool, so sync
+endpoints are attributed too.
+
+`registry.render()` produces the text served at /metrics, including the
+per-query Neo4j stats from `app.db.queries.query_stats`. Metrics are kept per
+process; with several workers each worker reports its own.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.queries import LATENCY_BUCKETS_MS, query_stats
+
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Route label of requests that matched no route, so unknown URLs do not add label values
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """A named metric with one series per combination of label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _check(self, label_values: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {label_values}")
+        return tuple(str(value) for value in label_values)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_values, value in series:
+            lines.extend(self._render_series(label_values, value))
+        return lines
+
+    def _render_series(self, label_values, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        key = self._check(label_values)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._series.get(self._check(label_values), 0.0)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; each series is [bucket counts..., +Inf count, sum]"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (), buckets=LATENCY_BUCKETS_SECONDS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str) -> None:
+        key = self._check(label_values)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        with self._lock:
+            series = self._series.get(self._check(label_values))
+            return sum(series[:-1]) if series else 0
+
+    def _render_series(self, label_values, series) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+            cumulative += count
+            labels = _format_labels(self.label_names, label_values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, label_values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics plus collector callbacks that render extra lines at scrape time"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry instance
+registry = MetricsRegistry()
+
+REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"),
+))
+REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"),
+))
+RESPONSE_SIZE = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP response body size as sent", ("method", "route"), SIZE_BUCKETS_BYTES,
+))
+IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ("method",),
+))
+REQUEST_DB_TIME = registry.register(Histogram(
+    "http_request_db_seconds", "Time a request spent executing SQL statements", ("route",),
+))
+REQUEST_NEO4J_TIME = registry.register(Histogram(
+    "http_request_neo4j_seconds", "Time a request spent in Neo4j transactions", ("route",),
+))
+
+
+@dataclass
+class RequestTimings:
+    """Time spent in the databases by the current request"""
+    db_seconds: float = 0.0
+    db_statements: int = 0
+    neo4j_seconds: float = 0.0
+    neo4j_transactions: int = 0
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+def add_db_time(seconds: float) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.db_seconds += seconds
+        timings.db_statements += 1
+
+
+def add_neo4j_time(seconds: float) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.neo4j_seconds += seconds
+        timings.neo4j_transactions += 1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_statement_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("metrics_statement_started", None)
+    if started is not None:
+        add_db_time(time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    """Attribute the execution time of every statement on `engine` to the current request"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, including the prefixes of the routers it was included with"""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    # Depending on the FastAPI version the route path may be relative to its router's
+    # prefix; recover the prefix from the request path by filling in the parameters
+    try:
+        concrete = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    if concrete and path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording per-route request metrics into `registry`"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        IN_PROGRESS.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_PROGRESS.dec(method)
+            _current_timings.reset(token)
+            route = route_template(scope)
+            REQUESTS.inc(method, route, status_code)
+            REQUEST_DURATION.observe(elapsed, method, route)
+            RESPONSE_SIZE.observe(response_size, method, route)
+            REQUEST_DB_TIME.observe(timings.db_seconds, route)
+            REQUEST_NEO4J_TIME.observe(timings.neo4j_seconds, route)
+
+
+def neo4j_query_lines() -> List[str]:
+    """Per-query Neo4j stats from query_stats as Prometheus histograms and counters"""
+    snapshot = query_stats.snapshot()
+    if not snapshot:
+        return []
+    histogram = Histogram(
+        "neo4j_query_duration_seconds", "Neo4j query latency by registered query name", ("query",),
+        [bound / 1000 for bound in LATENCY_BUCKETS_MS],
+    )
+    errors = Counter("neo4j_query_errors_total", "Failed Neo4j queries", ("query",))
+    retries = Counter("neo4j_query_retries_total", "Retried Neo4j transaction attempts", ("query",))
+    for name, stats in snapshot.items():
+        histogram._series[(name,)] = list(stats["buckets"]) + [stats["total_ms"] / 1000]
+        errors.inc(name, amount=stats["errors"])
+        retries.inc(name, amount=stats["retries"])
+    return histogram.render() + errors.render() + retries.render()
+
+
+registry.add_collector(neo4j_query_lines)
@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Any, List
+
+from app.core.config import settings
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed, tampered with or used out of scope"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(scope: str, payload: bytes) -> bytes:
+    # Truncated HMAC-SHA256; the scope ties a cursor to one listing of one user
+    message = scope.encode("utf-8") + b"\x00" + payload
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), message, hashlib.sha256).digest()[:16]
+
+
+def encode_cursor(scope: str, values: List[Any]) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque, signed cursor.
+    Datetimes are stored as ISO strings; callers parse them back on decode.
+    """
+    serializable = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    payload = json.dumps(serializable, separators=(",", ":")).encode("utf-8")
+    return f"{_b64encode(payload)}.{_b64encode(_sign(scope, payload))}"
+
+
+def decode_cursor(scope: str, cursor: str) -> List[Any]:
+    """Verify and decode a cursor produced by `encode_cursor` for the same scope"""
+    try:
+        encoded_payload, encoded_signature = cursor.split(".", 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Malformed cursor")
+
+    if not hmac.compare_digest(signature, _sign(scope, payload)):
+        raise InvalidCursorError("Invalid cursor signature")
+
+    try:
+        values = json.loads(payload)
+    except ValueError:
+        raise InvalidCursorError("Malformed cursor")
+    if not isinstance(values, list):
+        raise InvalidCursorError("Malformed cursor")
+    return values
@@ -0,0 +1,183 @@
+"""
+Low-overhead sampling profiler for the live process.
+
+`SamplingProfiler` runs a daemon thread that wakes every `interval` seconds,
+reads the current frame of every other thread (`sys._current_frames`) and
+counts each call stack. Nothing is traced between samples, so the cost is one
+stack walk per thread per interval, independent of how much the application
+does. Stacks are reported in the collapsed format
+("thread;outer (file:line);...;inner (file:line) count") read by flamegraph.pl,
+speedscope and inferno.
+
+Threads parked in the event loop's selector, a lock or a queue are skipped
+unless `include_idle` is set, so an idle worker does not drown the profile.
+
+`request_profiles` profiles a single flagged request: an admin arms it for a
+path prefix and `RequestProfilerMiddleware` samples the next matching request
+from start to finish. Samples cover every thread during that request, so on a
+busy worker they include concurrent requests too.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Leaf frames of threads that are waiting rather than working
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("base_events.py", "_run_once"),
+}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    # Show app code relative to the project, libraries by module file name
+    marker = f"{os.sep}app{os.sep}"
+    short = "app/" + path.split(marker, 1)[1] if marker in path else os.path.basename(path)
+    return f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Samples the stacks of all other threads every `interval` seconds"""
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self.stacks
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(own_id)
+
+    def sample(self, skip_thread_id: Optional[int] = None) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        self.samples += 1
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread_id:
+                continue
+            leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+            if not self.include_idle and leaf in IDLE_FRAMES:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, f"thread-{thread_id}").replace(";", ":"))
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+@dataclass
+class RequestProfile:
+    """A profile armed for, and then taken of, one request"""
+    path_prefix: str
+    method: Optional[str]
+    interval: float
+    armed_at: datetime = field(default_factory=datetime.utcnow)
+    path: Optional[str] = None
+    status_code: Optional[int] = None
+    duration: Optional[float] = None
+    profiler: Optional[SamplingProfiler] = None
+
+    @property
+    def done(self) -> bool:
+        return self.duration is not None
+
+
+class RequestProfiles:
+    """The armed request profile and the last one taken"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.armed: Optional[RequestProfile] = None
+        self.latest: Optional[RequestProfile] = None
+
+    def arm(self, path_prefix: str, method: Optional[str] = None, interval: float = 0.005) -> RequestProfile:
+        with self._lock:
+            self.armed = RequestProfile(path_prefix, method.upper() if method else None, interval)
+            return self.armed
+
+    def disarm(self) -> None:
+        with self._lock:
+            self.armed = None
+
+    def claim(self, scope: Scope) -> Optional[RequestProfile]:
+        """Take the armed profile if this request matches it, so only one request is profiled"""
+        armed = self.armed
+        if armed is None or not scope["path"].startswith(armed.path_prefix):
+            return None
+        if armed.method is not None and scope["method"] != armed.method:
+            return None
+        with self._lock:
+            if self.armed is not armed:
+                return None
+            self.armed = None
+        armed.path = scope["path"]
+        return armed
+
+    def complete(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self.latest = profile
+
+
+# Shared request profile state
+request_profiles = RequestProfiles()
+
+
+class RequestProfilerMiddleware:
+    """Samples the process while the request claimed by an armed profile runs"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile = request_profiles.claim(scope) if scope["type"] == "http" else None
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_status(message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+            await send(message)
+
+        profile.profiler = SamplingProfiler(profile.interval).start()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.profiler.stop()
+            profile.duration = profile.profiler.duration
+            request_profiles.complete(profile)
@@ -0,0 +1,190 @@
+"""
+Token-bucket rate limiting.
+
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per second;
+a request takes `cost` tokens or is refused with the number of seconds until
+enough have refilled (sent as Retry-After). `capacity` is the burst a client
+may send at once, `rate` the sustained request rate.
+
+Buckets live in a `BucketStore`:
+
+- `MemoryBucketStore` keeps them in process memory (a bounded LRU). Each worker
+  process limits on its own, so with N workers a client gets up to N times the
+  configured rate.
+- `SQLiteBucketStore` keeps them in a small SQLite file shared by all workers on
+  the host. Every take is one short `BEGIN IMMEDIATE` transaction; it blocks,
+  so async callers run it in the threadpool.
+
+Only the token count and the time it was last updated are stored per key, and
+refill is computed lazily on the next take, so idle keys cost nothing.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of one take from a bucket"""
+    allowed: bool
+    remaining: float
+    # Seconds until the request would be allowed; 0 when it was
+    retry_after: float = 0.0
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value: whole seconds, at least 1"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def refill_and_take(
+    state: Optional[Tuple[float, float]],
+    capacity: float,
+    rate: float,
+    cost: float,
+    now: float,
+) -> Tuple[Tuple[float, float], RateLimitResult]:
+    """
+    Apply one take to a bucket `state` of (tokens, updated_at); a missing bucket
+    starts full. Returns the new state and the result.
+    """
+    tokens, updated_at = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= cost:
+        tokens -= cost
+        return (tokens, now), RateLimitResult(True, tokens)
+    retry_after = (cost - tokens) / rate if rate > 0 else float("inf")
+    return (tokens, now), RateLimitResult(False, tokens, retry_after)
+
+
+class BucketStore(ABC):
+    """Storage of bucket states keyed by limiter name and client key"""
+
+    # Whether take() does I/O and should be called from the threadpool
+    blocking = False
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> RateLimitResult:
+        """Refill the key's bucket and take `cost` tokens from it if it holds enough"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget every bucket"""
+
+
+class MemoryBucketStore(BucketStore):
+    """Buckets in process memory, least recently used evicted beyond `max_keys`"""
+
+    def __init__(self, max_keys: int = 100000):
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.max_keys = max_keys
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> RateLimitResult:
+        with self._lock:
+            state, result = refill_and_take(self._buckets.get(key), capacity, rate, cost, time.monotonic())
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            # An evicted bucket comes back full, which only ever favours the client
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBucketStore(BucketStore):
+    """Buckets in a SQLite file shared by the worker processes of one host"""
+
+    blocking = True
+
+    def __init__(self, path: str, busy_timeout_ms: int = 1000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread; the threadpool reuses its threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> RateLimitResult:
+        connection = self._connection()
+        # Wall clock, since monotonic clocks are not comparable across processes
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            (tokens, updated_at), result = refill_and_take(row, capacity, rate, cost, now)
+            connection.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, updated_at),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return result
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM rate_limit_buckets")
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Delete buckets untouched for `older_than_seconds` (they would be full again anyway)"""
+        cursor = self._connection().execute(
+            "DELETE FROM rate_limit_buckets WHERE updated_at < ?", (time.time() - older_than_seconds,)
+        )
+        return cursor.rowcount
+
+
+class RateLimiter:
+    """A named token-bucket limit: `burst` requests at once, `per_minute` sustained"""
+
+    def __init__(self, name: str, per_minute: float, burst: float, store: BucketStore):
+        self.name = name
+        self.capacity = float(burst)
+        self.rate = per_minute / 60.0
+        self.store = store
+
+    def hit(self, key: str, cost: float = 1.0) -> RateLimitResult:
+        return self.store.take(f"{self.name}:{key}", self.capacity, self.rate, cost)
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store() -> BucketStore:
+    """Shared bucket store selected by RATE_LIMIT_STORE, created on first use"""
+    if settings.RATE_LIMIT_STORE == "sqlite":
+        logger.info(f"Rate limit buckets are shared through {settings.RATE_LIMIT_SQLITE_PATH}")
+        return SQLiteBucketStore(settings.RATE_LIMIT_SQLITE_PATH)
+    if settings.RATE_LIMIT_STORE != "memory":
+        raise ValueError(f"Unknown rate limit store '{settings.RATE_LIMIT_STORE}'")
+    return MemoryBucketStore()
@@ -0,0 +1,55 @@
+"""
+Opt-in fast JSON responses, enabled with FAST_JSON_RESPONSES.
+
+`FastJSONResponse` renders Pydantic models with `model_dump_json` (serialized by
+pydantic-core, without building an intermediate dict) and everything else with
+orjson when it is installed, falling back to compact stdlib json.
+
+For routes with a `response_model` FastAPI validates and dumps the model to
+JSON-compatible data first, and the response class only encodes the result.
+Endpoints that build their own response can pass a model straight to
+`FastJSONResponse` to skip that step.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Types orjson and json do not serialize natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize response content to JSON bytes"""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with model_dump_json / orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
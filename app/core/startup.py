@@ -0,0 +1,170 @@
+"""
+Application startup state for the liveness and readiness endpoints.
+
+`Startup.initialize` runs the critical steps (SQLite tables, the Neo4j
+connection) concurrently in the threadpool, so neither blocks the event loop
+and a worker waits for the slower of the two rather than their sum. A critical
+failure does not stop the app from starting: it serves /health/live and
+reports 503 on /health/ready while a background task retries the failed
+steps with a doubling delay. Once every critical step has succeeded, the
+deferred steps (schema checks, the sample curriculum, sample data) run one
+after another in that task; their failures are logged and reported but do
+not stop the app.
+
+Every step records its status and timing; `report()` is what
+/health/ready returns.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class StepState:
+    """Status and timing of one startup step"""
+    critical: bool
+    status: str = PENDING
+    started_at: Optional[datetime] = None
+    elapsed_ms: Optional[float] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "critical": self.critical,
+            "attempts": self.attempts,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "elapsed_ms": round(self.elapsed_ms, 1) if self.elapsed_ms is not None else None,
+            "error": self.error,
+        }
+
+
+class Startup:
+    """Runs the startup steps and keeps their state"""
+
+    def __init__(self):
+        self.created_at = time.monotonic()
+        self.steps: Dict[str, StepState] = {}
+        self.critical_elapsed_ms: Optional[float] = None
+        self.background: Optional[asyncio.Task] = None
+
+    async def _run_step(self, name: str, step: Callable[[], Any]) -> None:
+        state = self.steps[name]
+        state.status = RUNNING
+        state.started_at = datetime.utcnow()
+        state.attempts += 1
+        started = time.perf_counter()
+        try:
+            await run_in_threadpool(step)
+        except Exception as e:
+            state.status = FAILED
+            state.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            state.elapsed_ms = (time.perf_counter() - started) * 1000
+        state.status = READY
+        state.error = None
+        logger.info(f"Startup step {name} ready in {state.elapsed_ms:.0f} ms")
+
+    async def _run_critical(self, critical: Dict[str, Callable[[], Any]]) -> List[str]:
+        """Run critical steps concurrently; the names of those that failed"""
+        results = await asyncio.gather(
+            *(self._run_step(name, step) for name, step in critical.items()), return_exceptions=True,
+        )
+        failed = []
+        for name, result in zip(critical, results):
+            if isinstance(result, Exception):
+                logger.error(f"Critical startup step {name} failed: {str(result)}")
+                failed.append(name)
+        return failed
+
+    async def initialize(
+        self,
+        critical: Dict[str, Callable[[], Any]],
+        deferred: List[Tuple[str, Callable[[], Any]]],
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+    ) -> None:
+        """
+        Run the critical steps concurrently, then continue in the background:
+        retry failed critical steps until they succeed, then run the deferred ones
+        """
+        self.steps = {name: StepState(critical=True) for name in critical}
+        self.steps.update({name: StepState(critical=False) for name, _ in deferred})
+
+        started = time.perf_counter()
+        failed = await self._run_critical(critical)
+        if not failed:
+            self.critical_elapsed_ms = (time.perf_counter() - started) * 1000
+        self.background = asyncio.create_task(
+            self._continue(critical, failed, deferred, started, retry_delay, max_retry_delay)
+        )
+
+    async def _continue(
+        self,
+        critical: Dict[str, Callable[[], Any]],
+        failed: List[str],
+        deferred: List[Tuple[str, Callable[[], Any]]],
+        started: float,
+        retry_delay: float,
+        max_retry_delay: float,
+    ) -> None:
+        delay = retry_delay
+        while failed:
+            logger.warning(f"Not ready; retrying {', '.join(failed)} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_retry_delay)
+            failed = await self._run_critical({name: critical[name] for name in failed})
+            if not failed:
+                self.critical_elapsed_ms = (time.perf_counter() - started) * 1000
+                logger.info(f"Application ready after {self.critical_elapsed_ms:.0f} ms")
+
+        for name, step in deferred:
+            try:
+                await self._run_step(name, step)
+            except Exception as e:
+                logger.error(f"Deferred startup step {name} failed: {str(e)}")
+
+    async def shutdown(self) -> None:
+        """Stop retrying and waiting for deferred steps; a step already in a thread finishes on its own"""
+        if self.background is not None and not self.background.done():
+            self.background.cancel()
+            try:
+                await self.background
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def ready(self) -> bool:
+        """Every critical step succeeded"""
+        critical = [state for state in self.steps.values() if state.critical]
+        return bool(critical) and all(state.status == READY for state in critical)
+
+    @property
+    def complete(self) -> bool:
+        """Every step, deferred included, has finished"""
+        return bool(self.steps) and all(state.status in (READY, FAILED) for state in self.steps.values())
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "startup_complete": self.complete,
+            "uptime_seconds": round(time.monotonic() - self.created_at, 1),
+            "critical_init_ms": round(self.critical_elapsed_ms, 1) if self.critical_elapsed_ms is not None else None,
+            "dependencies": {name: state.to_dict() for name, state in self.steps.items()},
+        }
+
+
+# Shared startup state
+startup = Startup()
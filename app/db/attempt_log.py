@@ -0,0 +1,354 @@
+"""
+Append-only problem attempt log, partitioned by month.
+
+Every attempt is written once and never updated. Rows are routed by `attempted_at`:
+  - PostgreSQL: `problem_attempt_log` is a native RANGE partitioned table with one
+    partition per month; the planner prunes partitions from the time predicate.
+  - SQLite: one physical table per month (`problem_attempt_log_YYYYMM`); the query
+    helpers here only touch the tables that overlap the requested range.
+Each partition carries a composite `(user_id, attempted_at)` index so "this user's
+attempts in this window" is an index range scan inside a handful of partitions.
+
+Old partitions are rolled up into `problem_attempt_rollup` (see `rollup_partitions`)
+and dropped, which keeps the hot log small.
+"""
+import re
+import weakref
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import (
+    Boolean, Column, DateTime, Index, Integer, MetaData, String, Table, event, func, inspect, select, text,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.attempts import AttemptRollup
+
+ATTEMPT_LOG_TABLE = "problem_attempt_log"
+PARTITION_PATTERN = re.compile(rf"^{ATTEMPT_LOG_TABLE}_(\d{{4}})(\d{{2}})$")
+
+# Partition tables are created on demand, so they live outside Base.metadata
+# and are never touched by create_all()
+partition_metadata = MetaData()
+
+# Partitions known to exist, per engine, so appends skip the CREATE IF NOT EXISTS.
+# A partition created in a transaction is only added once that transaction commits.
+_known_partitions: "weakref.WeakKeyDictionary[Any, set]" = weakref.WeakKeyDictionary()
+# Session.info key of the partitions created in the session's open transaction
+PENDING_PARTITIONS = "attempt_log_pending_partitions"
+
+
+def month_start(moment: datetime) -> datetime:
+    """Truncate a datetime to the first instant of its month"""
+    return datetime(moment.year, moment.month, 1)
+
+
+def next_month(month: datetime) -> datetime:
+    """Get the first instant of the following month"""
+    if month.month == 12:
+        return datetime(month.year + 1, 1, 1)
+    return datetime(month.year, month.month + 1, 1)
+
+
+def previous_month(month: datetime) -> datetime:
+    """Get the first instant of the preceding month"""
+    if month.month == 1:
+        return datetime(month.year - 1, 12, 1)
+    return datetime(month.year, month.month - 1, 1)
+
+
+def partition_name(moment: datetime) -> str:
+    """Name of the partition holding attempts made at `moment`"""
+    return f"{ATTEMPT_LOG_TABLE}_{moment:%Y%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Month covered by a partition table name, or None if it is not a partition"""
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def months_in_range(start: datetime, end: datetime) -> List[datetime]:
+    """Months overlapping the half-open range [start, end)"""
+    months = []
+    month = month_start(start)
+    while month < end:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def attempt_log_table(name: str = ATTEMPT_LOG_TABLE) -> Table:
+    """Get the Table object for the log (or one of its SQLite partitions)"""
+    if name in partition_metadata.tables:
+        return partition_metadata.tables[name]
+
+    return Table(
+        name,
+        partition_metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("user_id", Integer, nullable=False),
+        Column("problem_id", String(100), nullable=False),
+        Column("attempted_at", DateTime, nullable=False),
+        Column("completed", Boolean, default=False),
+        Column("time_spent_seconds", Integer, nullable=True),
+        Column("steps_completed", Integer, default=0),
+        Column("steps_with_hints", Integer, default=0),
+        Index(f"ix_{name}_user_attempted", "user_id", "attempted_at"),
+    )
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def init_attempt_log(db: Session) -> None:
+    """
+    Create the partitioned parent table on PostgreSQL.
+    SQLite needs no parent: partitions are created as attempts arrive.
+    """
+    if _dialect(db) != "postgresql":
+        return
+
+    db.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {ATTEMPT_LOG_TABLE} (
+            id BIGSERIAL,
+            user_id INTEGER NOT NULL,
+            problem_id VARCHAR(100) NOT NULL,
+            attempted_at TIMESTAMP NOT NULL,
+            completed BOOLEAN DEFAULT FALSE,
+            time_spent_seconds INTEGER,
+            steps_completed INTEGER DEFAULT 0,
+            steps_with_hints INTEGER DEFAULT 0,
+            PRIMARY KEY (id, attempted_at)
+        ) PARTITION BY RANGE (attempted_at)
+    """))
+    # Declared on the parent, so every partition gets its own copy
+    db.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{ATTEMPT_LOG_TABLE}_user_attempted "
+        f"ON {ATTEMPT_LOG_TABLE} (user_id, attempted_at)"
+    ))
+    db.execute(text(f"""
+        CREATE OR REPLACE FUNCTION {ATTEMPT_LOG_TABLE}_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION '{ATTEMPT_LOG_TABLE} is append-only';
+        END
+        $$ LANGUAGE plpgsql
+    """))
+    db.execute(text(
+        f"CREATE OR REPLACE TRIGGER {ATTEMPT_LOG_TABLE}_no_update BEFORE UPDATE ON {ATTEMPT_LOG_TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION {ATTEMPT_LOG_TABLE}_append_only()"
+    ))
+    db.commit()
+
+
+def ensure_partition(db: Session, moment: datetime) -> str:
+    """Create the partition for the month of `moment` if it does not exist yet"""
+    name = partition_name(moment)
+    pending = db.info.setdefault(PENDING_PARTITIONS, set())
+    if name in _known_partitions.get(db.get_bind(), ()) or name in pending:
+        return name
+
+    if _dialect(db) == "postgresql":
+        month = month_start(moment)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {ATTEMPT_LOG_TABLE} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month(month):%Y-%m-%d}')"
+        ))
+    else:
+        table = attempt_log_table(name)
+        table.create(db.connection(), checkfirst=True)
+        db.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {name}_no_update BEFORE UPDATE ON {name} "
+            f"BEGIN SELECT RAISE(ABORT, '{ATTEMPT_LOG_TABLE} is append-only'); END"
+        ))
+
+    pending.add(name)
+    return name
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_partitions(session: Session) -> None:
+    pending = session.info.pop(PENDING_PARTITIONS, None)
+    if pending:
+        _known_partitions.setdefault(session.get_bind(), set()).update(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_partitions(session: Session) -> None:
+    # The DDL was rolled back with the transaction, so the next append creates the partition again
+    session.info.pop(PENDING_PARTITIONS, None)
+
+
+def list_partitions(db: Session) -> List[str]:
+    """Names of the existing monthly partitions, oldest first"""
+    names = inspect(db.connection()).get_table_names()
+    return sorted(name for name in names if partition_month(name) is not None)
+
+
+def append_attempt(
+    db: Session,
+    user_id: int,
+    problem_id: str,
+    attempted_at: Optional[datetime] = None,
+    completed: bool = False,
+    time_spent_seconds: Optional[int] = None,
+    steps_completed: int = 0,
+    steps_with_hints: int = 0,
+) -> None:
+    """
+    Append an attempt to the log. The caller owns the transaction and commits.
+    """
+    attempted_at = attempted_at or datetime.utcnow()
+    name = ensure_partition(db, attempted_at)
+    target = attempt_log_table(ATTEMPT_LOG_TABLE if _dialect(db) == "postgresql" else name)
+    db.execute(
+        target.insert().values(
+            user_id=user_id,
+            problem_id=problem_id,
+            attempted_at=attempted_at,
+            completed=completed,
+            time_spent_seconds=time_spent_seconds,
+            steps_completed=steps_completed,
+            steps_with_hints=steps_with_hints,
+        )
+    )
+
+
+def partitions_for_range(db: Session, start: datetime, end: datetime) -> List[str]:
+    """Existing partitions overlapping [start, end); everything else is pruned"""
+    existing = set(list_partitions(db))
+    return [
+        name for name in (partition_name(month) for month in months_in_range(start, end))
+        if name in existing
+    ]
+
+
+def query_attempts(
+    db: Session,
+    user_id: int,
+    start: datetime,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> List[Any]:
+    """Get a user's attempts in [start, end), newest first, reading only the relevant partitions"""
+    end = end or datetime.utcnow()
+
+    if _dialect(db) == "postgresql":
+        sources = [attempt_log_table(ATTEMPT_LOG_TABLE)]
+    else:
+        sources = [attempt_log_table(name) for name in partitions_for_range(db, start, end)]
+        if not sources:
+            return []
+
+    selects = [
+        select(table).where(
+            table.c.user_id == user_id,
+            table.c.attempted_at >= start,
+            table.c.attempted_at < end,
+        )
+        for table in sources
+    ]
+    combined = selects[0] if len(selects) == 1 else union_all(*selects)
+    subquery = combined.subquery()
+    query = select(subquery).order_by(subquery.c.attempted_at.desc(), subquery.c.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return db.execute(query).all()
+
+
+def weekly_attempt_stats(db: Session, user_id: int, start: datetime, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Per-ISO-week attempt statistics for a user over [start, end), oldest week first"""
+    weeks: Dict[date, Dict[str, Any]] = {}
+    for attempt in query_attempts(db, user_id, start, end):
+        day = attempt.attempted_at.date()
+        week_start = date.fromordinal(day.toordinal() - day.weekday())
+        stats = weeks.setdefault(week_start, {
+            "week_start": week_start,
+            "attempts": 0,
+            "completed": 0,
+            "time_spent_seconds": 0,
+        })
+        stats["attempts"] += 1
+        stats["completed"] += int(bool(attempt.completed))
+        stats["time_spent_seconds"] += attempt.time_spent_seconds or 0
+    return [weeks[week] for week in sorted(weeks)]
+
+
+def _rollup_upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(AttemptRollup)
+    if dialect == "sqlite":
+        return sqlite.insert(AttemptRollup)
+    raise ValueError(f"Attempt rollups are not supported on {dialect}")
+
+
+def rollup_partitions(db: Session, retain_months: int = 12, now: Optional[datetime] = None) -> List[str]:
+    """
+    Aggregate every partition older than `retain_months` into problem_attempt_rollup
+    and drop it. Each partition is rolled up and dropped in its own transaction,
+    so a partition is never counted twice; rolling up a month that already has a
+    rollup adds to it.
+    """
+    cutoff = month_start(now or datetime.utcnow())
+    for _ in range(retain_months):
+        cutoff = previous_month(cutoff)
+
+    rolled_up = []
+    for name in list_partitions(db):
+        month = partition_month(name)
+        if month >= cutoff:
+            continue
+
+        table = attempt_log_table(name)
+        rows = db.execute(
+            select(
+                table.c.user_id,
+                func.count(table.c.id),
+                func.count(table.c.id).filter(table.c.completed.is_(True)),
+                func.coalesce(func.sum(table.c.time_spent_seconds), 0),
+                func.coalesce(func.sum(table.c.steps_completed), 0),
+                func.coalesce(func.sum(table.c.steps_with_hints), 0),
+            ).group_by(table.c.user_id)
+        ).all()
+        for user_id, attempts, completed, time_spent, steps, hinted in rows:
+            # A month written to again after its rollup adds to the existing totals
+            totals = {
+                "attempts_count": attempts,
+                "completed_count": completed,
+                "time_spent_seconds": time_spent,
+                "steps_completed": steps,
+                "steps_with_hints": hinted,
+            }
+            statement = _rollup_upsert(db).values(user_id=user_id, month=month.date(), **totals)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[AttemptRollup.user_id, AttemptRollup.month],
+                set_={
+                    column: func.coalesce(getattr(AttemptRollup, column), 0) + getattr(statement.excluded, column)
+                    for column in totals
+                },
+            ))
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+
+        _known_partitions.get(db.get_bind(), set()).discard(name)
+        rolled_up.append(name)
+        logger.info(f"Rolled up attempt log partition {name} ({len(rows)} users)")
+
+    return rolled_up
+
+
+def monthly_rollups(db: Session, user_id: int) -> List[AttemptRollup]:
+    """Get the rolled-up monthly aggregates for a user, oldest first"""
+    return (
+        db.query(AttemptRollup)
+        .filter(AttemptRollup.user_id == user_id)
+        .order_by(AttemptRollup.month)
+        .all()
+    )
@@ -2,8 +2,10 @@ from loguru import logger
 import os
 
 # Import database modules
-from app.db.sqlite import init_sqlite_db, SessionLocal
-from app.db.neo4j import init_neo4j_db
+from app.db.sqlite import init_sqlite_db, get_session_factory
+from app.db import neo4j
+from app.db.neo4j import connect_neo4j_db, ensure_curriculum, init_neo4j_db
+from app.db.neo4j_schema import ensure_schema
 
 
 def init_db(create_sample_data=False):
@@ -19,15 +21,7 @@ def init_db(create_sample_data=False):
         
         # Create sample data if requested
         if create_sample_data:
-            # Import here to avoid circular imports
-            from app.db.sample_data import create_all_sample_data
-            
-            # Create DB session for sample data
-            db = SessionLocal()
-            try:
-                create_all_sample_data(db)
-            finally:
-                db.close()
+            create_sample_data_in_session()
         
         logger.info("All database connections established successfully")
     except Exception as e:
@@ -35,6 +29,37 @@ def init_db(create_sample_data=False):
         raise
 
 
+def create_sample_data_in_session():
+    """Create the sample users, progress, problems and history in a fresh session"""
+    # Import here to avoid circular imports
+    from app.db.sample_data import create_all_sample_data
+    
+    db = get_session_factory()()
+    try:
+        create_all_sample_data(db)
+    finally:
+        db.close()
+
+
+def startup_steps(create_sample_data=False):
+    """
+    Startup work for the API, split into critical steps that can run concurrently
+    and must succeed before the app serves traffic, and deferred steps run in order
+    in the background once it does.
+    """
+    critical = {
+        "sqlite": init_sqlite_db,
+        "neo4j": connect_neo4j_db,
+    }
+    deferred = [
+        ("neo4j_schema", lambda: ensure_schema(neo4j.neo4j_db)),
+        ("curriculum", ensure_curriculum),
+    ]
+    if create_sample_data:
+        deferred.append(("sample_data", create_sample_data_in_session))
+    return critical, deferred
+
+
 def should_create_sample_data():
     """Check if sample data should be created"""
     # Check environment variable
@@ -43,5 +68,5 @@ def should_create_sample_data():
 
 
 # Export base models and session utilities for convenience
-from app.db.sqlite import Base, get_db
+from app.db.sqlite import Base, get_db, get_async_db
 from app.db.neo4j import neo4j_db
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""
+Bulk import of the curriculum (chapters, requirements, goals and goal
+prerequisites) into Neo4j from structured files, one per grade level.
+
+Two formats are read, both streamed record by record:
+
+  JSON  {"grade_level": 8, "chapters": [{"id", "name", "requirements": [
+            {"id", "description", "goals": [{"id", "description", "prerequisites": ["G1", ...]}]}]}]}
+  CSV   grade_level,chapter_id,chapter_name,requirement_id,requirement_description,
+        goal_id,goal_description,prerequisites   (one row per goal, prerequisites ";"-separated)
+
+Every node is stored with a `content_hash` of its properties and parent id.
+`plan_import` compares the file against the hashes already in the graph, so a
+re-import only writes nodes that are new or changed (including ones moved to
+another parent) and prerequisite links that are new. Prerequisites may refer to
+goals of the imported files or goals already in the graph. `apply_plan` writes
+the changes as batched `UNWIND ... MERGE` statements, after which
+`import_curriculum` invalidates the curriculum snapshot of every API worker. Nodes of the imported
+grade levels that the files no longer list, and links into imported goals, are
+reported, and deleted only with `prune=True`; other grades are left alone.
+"""
+import csv
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from app.db import queries
+from app.services.curriculum_snapshot import curriculum_snapshot
+
+# The sample grade 8 curriculum loaded on an empty database
+SAMPLE_CURRICULUM_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "curriculum" / "grade_8_sample.json"
+
+CSV_COLUMNS = [
+    "grade_level", "chapter_id", "chapter_name", "requirement_id", "requirement_description",
+    "goal_id", "goal_description", "prerequisites",
+]
+LABELS = ["Chapter", "Requirement", "Goal"]
+
+Link = Tuple[str, str]
+
+
+def content_hash(properties: Dict[str, Any]) -> str:
+    """Stable hash of a node's properties (and parent id)"""
+    canonical = json.dumps(properties, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _read_json(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    grade_level = int(document["grade_level"])
+    for chapter in document.get("chapters", []):
+        for requirement in chapter.get("requirements", []):
+            for goal in requirement.get("goals", []):
+                yield {
+                    "grade_level": grade_level,
+                    "chapter_id": chapter["id"],
+                    "chapter_name": chapter["name"],
+                    "requirement_id": requirement["id"],
+                    "requirement_description": requirement["description"],
+                    "goal_id": goal["id"],
+                    "goal_description": goal["description"],
+                    "prerequisites": list(goal.get("prerequisites", [])),
+                }
+
+
+def _read_csv(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {
+                **{column: row[column] for column in CSV_COLUMNS[1:7]},
+                "grade_level": int(row["grade_level"]),
+                "prerequisites": [item.strip() for item in (row.get("prerequisites") or "").split(";") if item.strip()],
+            }
+
+
+def read_curriculum_files(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Goal-level records from curriculum files; directories are expanded to the
+    .json and .csv files they contain, in name order.
+    """
+    for path in map(Path, paths):
+        files = sorted(p for p in path.iterdir() if p.suffix in (".json", ".csv")) if path.is_dir() else [path]
+        for file in files:
+            if file.suffix == ".json":
+                yield from _read_json(file)
+            elif file.suffix == ".csv":
+                yield from _read_csv(file)
+            else:
+                raise ValueError(f"Unsupported curriculum file: {file}")
+
+
+@dataclass
+class Curriculum:
+    """Nodes by id (properties include content_hash) and prerequisite links"""
+    chapters: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    requirements: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    goals: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    links: Set[Link] = field(default_factory=set)
+
+
+def _add_node(nodes: Dict[str, Dict[str, Any]], label: str, properties: Dict[str, Any]) -> None:
+    node = {**properties, "content_hash": content_hash(properties)}
+    existing = nodes.get(node["id"])
+    if existing is not None and existing["content_hash"] != node["content_hash"]:
+        raise ValueError(f"{label} {node['id']} is defined twice with different content")
+    nodes[node["id"]] = node
+
+
+def collect_curriculum(records: Iterable[Dict[str, Any]]) -> Curriculum:
+    """
+    Deduplicate goal-level records into nodes. Raises ValueError on conflicting definitions.
+    Prerequisites are checked by plan_import, as they may refer to goals already in the graph.
+    """
+    curriculum = Curriculum()
+    for record in records:
+        _add_node(curriculum.chapters, "Chapter", {
+            "id": record["chapter_id"], "name": record["chapter_name"], "grade_level": record["grade_level"],
+        })
+        _add_node(curriculum.requirements, "Requirement", {
+            "id": record["requirement_id"],
+            "description": record["requirement_description"],
+            "chapter_id": record["chapter_id"],
+        })
+        _add_node(curriculum.goals, "Goal", {
+            "id": record["goal_id"],
+            "description": record["goal_description"],
+            "requirement_id": record["requirement_id"],
+        })
+        for prerequisite_id in record["prerequisites"]:
+            curriculum.links.add((prerequisite_id, record["goal_id"]))
+    return curriculum
+
+
+def grade_levels(curriculum: Curriculum) -> Dict[str, Dict[str, Optional[int]]]:
+    """Grade level of every node by label and id, taken from its chapter"""
+    chapters = {node_id: node["grade_level"] for node_id, node in curriculum.chapters.items()}
+    requirements = {node_id: chapters.get(node["chapter_id"]) for node_id, node in curriculum.requirements.items()}
+    goals = {node_id: requirements.get(node["requirement_id"]) for node_id, node in curriculum.goals.items()}
+    return dict(zip(LABELS, (chapters, requirements, goals)))
+
+
+@dataclass
+class ExistingCurriculum:
+    """
+    content_hash and grade level (of the node's chapter, None when detached) by
+    node id for each label, and prerequisite links, as stored in the graph
+    """
+    hashes: Dict[str, Dict[str, Optional[str]]]
+    links: Set[Link]
+    grade_levels: Dict[str, Dict[str, Optional[int]]] = field(default_factory=dict)
+
+
+def load_existing(neo4j_instance) -> ExistingCurriculum:
+    hashes, grades = {}, {}
+    for label, query in zip(LABELS, (queries.CHAPTER_HASHES, queries.REQUIREMENT_HASHES, queries.GOAL_HASHES)):
+        records = neo4j_instance.run_query(query)
+        hashes[label] = {record["id"]: record["content_hash"] for record in records}
+        grades[label] = {record["id"]: record["grade_level"] for record in records}
+    links = {
+        (record["prerequisite_id"], record["goal_id"]) for record in neo4j_instance.run_query(queries.PREREQUISITES)
+    }
+    return ExistingCurriculum(hashes, links, grades)
+
+
+@dataclass
+class ImportPlan:
+    """Rows to upsert and ids to delete per label, links to add and remove, plus counts for the report"""
+    upserts: Dict[str, List[Dict[str, Any]]]
+    deletes: Dict[str, List[str]]
+    add_links: List[Link]
+    remove_links: List[Link]
+    created: Dict[str, int]
+    updated: Dict[str, int]
+    unchanged: Dict[str, int]
+    missing: Dict[str, int]
+
+    @property
+    def is_empty(self) -> bool:
+        return not any(self.upserts.values()) and not any(self.deletes.values()) and not (
+            self.add_links or self.remove_links
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "missing": self.missing,
+            "deleted": {label: len(ids) for label, ids in self.deletes.items()},
+            "links_added": len(self.add_links),
+            "links_removed": len(self.remove_links),
+        }
+
+
+def plan_import(curriculum: Curriculum, existing: ExistingCurriculum, prune: bool = False) -> ImportPlan:
+    """
+    Work out the writes that bring the graph in line with `curriculum`.
+    Raises ValueError when a prerequisite is neither imported nor kept in the graph.
+    """
+    plan = ImportPlan({}, {}, [], [], {}, {}, {}, {})
+    # Only the grade levels present in the files are owned by the import
+    imported_grades = {node["grade_level"] for node in curriculum.chapters.values()}
+    for label, nodes in zip(LABELS, (curriculum.chapters, curriculum.requirements, curriculum.goals)):
+        stored = existing.hashes.get(label, {})
+        stored_grades = existing.grade_levels.get(label, {})
+        rows = [node for node_id, node in nodes.items() if stored.get(node_id) != node["content_hash"]]
+        plan.upserts[label] = sorted(rows, key=lambda row: row["id"])
+        plan.created[label] = sum(1 for row in rows if row["id"] not in stored)
+        plan.updated[label] = len(rows) - plan.created[label]
+        plan.unchanged[label] = len(nodes) - len(rows)
+        missing = sorted(
+            node_id for node_id in set(stored) - set(nodes) if stored_grades.get(node_id) in imported_grades
+        )
+        plan.missing[label] = len(missing)
+        plan.deletes[label] = missing if prune else []
+
+    known = set(curriculum.goals) | (set(existing.hashes.get("Goal", {})) - set(plan.deletes["Goal"]))
+    unknown = sorted({prerequisite for prerequisite, _ in curriculum.links} - known)
+    if unknown:
+        raise ValueError(f"Prerequisites refer to unknown goals: {', '.join(unknown[:10])}")
+
+    plan.add_links = sorted(curriculum.links - existing.links)
+    # Only links into imported goals are owned by the import
+    stale = sorted(link for link in existing.links - curriculum.links if link[1] in curriculum.goals)
+    plan.remove_links = stale if prune else []
+    return plan
+
+
+def _batches(rows: List[Any], batch_size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+
+def apply_plan(neo4j_instance, plan: ImportPlan, batch_size: int = 1000) -> None:
+    """Write a plan: parents before children, deletions children first. Each batch is one transaction."""
+    upsert_queries = dict(zip(LABELS, (queries.UPSERT_CHAPTERS, queries.UPSERT_REQUIREMENTS, queries.UPSERT_GOALS)))
+    for label in LABELS:
+        for batch in _batches(plan.upserts[label], batch_size):
+            neo4j_instance.run_query(upsert_queries[label], {"rows": batch})
+    for batch in _batches(plan.remove_links, batch_size):
+        neo4j_instance.run_query(queries.DELETE_PREREQUISITE_LINKS, {"links": [list(link) for link in batch]})
+    for batch in _batches(plan.add_links, batch_size):
+        neo4j_instance.run_query(queries.CREATE_PREREQUISITE_LINKS, {"links": [list(link) for link in batch]})
+
+    delete_queries = dict(zip(LABELS, (queries.DELETE_CHAPTERS, queries.DELETE_REQUIREMENTS, queries.DELETE_GOALS)))
+    for label in reversed(LABELS):
+        for batch in _batches(plan.deletes[label], batch_size):
+            neo4j_instance.run_query(delete_queries[label], {"ids": batch})
+
+
+def import_curriculum(
+    neo4j_instance,
+    paths: Iterable[str],
+    batch_size: int = 1000,
+    prune: bool = False,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Import curriculum files into Neo4j, writing only what changed. Returns the plan summary and timings."""
+    started = time.perf_counter()
+    curriculum = collect_curriculum(read_curriculum_files([str(path) for path in paths]))
+    parsed = time.perf_counter()
+    plan = plan_import(curriculum, load_existing(neo4j_instance), prune)
+    planned = time.perf_counter()
+    if not dry_run and not plan.is_empty:
+        apply_plan(neo4j_instance, plan, batch_size)
+        curriculum_snapshot.invalidate()
+    finished = time.perf_counter()
+
+    report = plan.summary()
+    report["timings"] = {
+        "parse": round(parsed - started, 3),
+        "diff": round(planned - parsed, 3),
+        "write": round(finished - planned, 3),
+    }
+    logger.info(f"Curriculum import{' (dry run)' if dry_run else ''}: {report}")
+    return report
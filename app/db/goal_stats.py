@@ -0,0 +1,152 @@
+"""
+Class-wide goal statistics cube.
+
+`goal_stats` holds one row per (goal, grade level) with student, attempt and
+success counts, the sum of mastery levels and a fixed-bucket mastery histogram.
+Every change to a goal_progress row is applied to it as a delta in the same
+transaction (`apply_progress_change`), so "which goals are weakest for grade 8"
+reads O(goals) rows instead of grouping every student's progress.
+
+Bulk loaders that bypass the write path call `rebuild_goal_stats`, which
+recomputes the cube from goal_progress in one statement; `check_goal_stats`
+compares the two without writing. Changing a user's grade level is not tracked
+incrementally and needs a rebuild.
+"""
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.goal_stats import GoalStats
+from app.models.users import GoalProgress, User
+
+# Lower bounds of mastery buckets 1..4; bucket 0 is everything below 0.2
+MASTERY_BUCKET_BOUNDS = [0.2, 0.4, 0.6, 0.8]
+BUCKET_COLUMNS = [f"mastery_bucket_{i}" for i in range(len(MASTERY_BUCKET_BOUNDS) + 1)]
+COUNT_COLUMNS = ["students", "attempts_count", "successful_attempts"] + BUCKET_COLUMNS
+# Grade level recorded for users without one (e.g. teachers)
+NO_GRADE = 0
+
+# (attempts_count, successful_attempts, mastery_level) of a goal_progress row
+ProgressState = Tuple[int, int, float]
+
+
+def mastery_bucket(mastery_level: Optional[float]) -> int:
+    """Histogram bucket of a mastery level, matching the SQL used by the rebuild"""
+    return bisect_right(MASTERY_BUCKET_BOUNDS, mastery_level or 0.0)
+
+
+def _upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(GoalStats)
+    if dialect == "sqlite":
+        return sqlite.insert(GoalStats)
+    raise ValueError(f"goal_stats upsert is not supported on {dialect}")
+
+
+def apply_progress_change(
+    db: Session,
+    goal_id: str,
+    grade_level: Optional[int],
+    before: Optional[ProgressState],
+    after: Optional[ProgressState],
+) -> None:
+    """
+    Apply one goal_progress change to the cube as an atomic upsert of deltas.
+    `before` is None for a new row, `after` is None for a deleted one. The caller commits.
+    """
+    delta: Dict[str, Any] = {column: 0 for column in COUNT_COLUMNS}
+    delta["mastery_sum"] = 0.0
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None:
+            continue
+        attempts, successes, mastery_level = state
+        delta["students"] += sign
+        delta["attempts_count"] += sign * (attempts or 0)
+        delta["successful_attempts"] += sign * (successes or 0)
+        delta["mastery_sum"] += sign * (mastery_level or 0.0)
+        delta[BUCKET_COLUMNS[mastery_bucket(mastery_level)]] += sign
+
+    changed = {column: value for column, value in delta.items() if value}
+    if not changed:
+        return
+    statement = _upsert(db).values(goal_id=goal_id, grade_level=grade_level or NO_GRADE, **delta)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[GoalStats.goal_id, GoalStats.grade_level],
+        set_={column: getattr(GoalStats, column) + value for column, value in changed.items()},
+    ))
+
+
+def expected_stats_query() -> Select:
+    """The cube computed from scratch by grouping goal_progress"""
+    grade_level = func.coalesce(User.grade_level, NO_GRADE)
+    mastery_level = func.coalesce(GoalProgress.mastery_level, 0.0)
+    bucket = sum(case((mastery_level >= bound, 1), else_=0) for bound in MASTERY_BUCKET_BOUNDS)
+    return (
+        select(
+            GoalProgress.goal_id.label("goal_id"),
+            grade_level.label("grade_level"),
+            func.count().label("students"),
+            func.coalesce(func.sum(GoalProgress.attempts_count), 0).label("attempts_count"),
+            func.coalesce(func.sum(GoalProgress.successful_attempts), 0).label("successful_attempts"),
+            func.sum(mastery_level).label("mastery_sum"),
+            *[
+                func.sum(case((bucket == i, 1), else_=0)).label(column)
+                for i, column in enumerate(BUCKET_COLUMNS)
+            ],
+        )
+        .join(User, User.id == GoalProgress.user_id)
+        .group_by(GoalProgress.goal_id, grade_level)
+    )
+
+
+def rebuild_goal_stats(db: Session) -> int:
+    """Recompute the whole cube from goal_progress. Returns the row count. The caller commits."""
+    db.execute(delete(GoalStats))
+    query = expected_stats_query()
+    result = db.execute(insert(GoalStats).from_select([column.name for column in query.selected_columns], query))
+    return result.rowcount
+
+
+def check_goal_stats(db: Session, tolerance: float = 1e-6) -> List[Dict[str, Any]]:
+    """
+    Compare the maintained cube with one computed from goal_progress.
+    Returns a list of {goal_id, grade_level, column, expected, actual}; empty when consistent.
+    """
+    columns = COUNT_COLUMNS + ["mastery_sum"]
+    expected = {(row.goal_id, row.grade_level): row for row in db.execute(expected_stats_query())}
+    actual = {(row.goal_id, row.grade_level): row for row in db.scalars(select(GoalStats))}
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        for column in columns:
+            want = getattr(expected[key], column) if key in expected else 0
+            have = getattr(actual[key], column) if key in actual else 0
+            if abs((want or 0) - (have or 0)) > tolerance:
+                mismatches.append({
+                    "goal_id": key[0], "grade_level": key[1], "column": column, "expected": want, "actual": have,
+                })
+    return mismatches
+
+
+def goal_stats_query(grade_level: Optional[int] = None) -> Select:
+    """Per-goal totals for one grade level, or summed over all grades, weakest average mastery first"""
+    query = select(
+        GoalStats.goal_id,
+        func.sum(GoalStats.students).label("students"),
+        func.sum(GoalStats.attempts_count).label("attempts_count"),
+        func.sum(GoalStats.successful_attempts).label("successful_attempts"),
+        func.sum(GoalStats.mastery_sum).label("mastery_sum"),
+        *[func.sum(getattr(GoalStats, column)).label(column) for column in BUCKET_COLUMNS],
+    )
+    if grade_level is not None:
+        query = query.where(GoalStats.grade_level == grade_level)
+    average = func.sum(GoalStats.mastery_sum) / func.sum(GoalStats.students)
+    return (
+        query.group_by(GoalStats.goal_id)
+        .having(func.sum(GoalStats.students) > 0)
+        .order_by(average, GoalStats.goal_id)
+    )
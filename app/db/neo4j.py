@@ -1,8 +1,61 @@
-from neo4j import GraphDatabase
+import random
+import threading
+import time
+from collections import OrderedDict
+
 from loguru import logger
 
 # Import settings from config
+from app.core import metrics
 from app.core.config import settings
+from app.db import queries
+from app.db.queries import READ as READ_ACCESS, WRITE as WRITE_ACCESS
+from app.db.curriculum_import import SAMPLE_CURRICULUM_PATH, import_curriculum
+from app.db.neo4j_schema import ensure_schema
+
+# Upper bound of the backoff between transaction attempts
+MAX_RETRY_DELAY_SECONDS = 2.0
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient errors (deadlocks, leader switches, lost connections) worth retrying"""
+    check = getattr(error, "is_retryable", None)
+    return bool(check and check())
+
+
+class BookmarkStore:
+    """
+    Latest bookmarks per key (usually a user id), so a read that passes the same key
+    as an earlier write waits until the serving cluster member has caught up with it.
+    Bounded LRU held in process memory; each API worker keeps its own.
+    """
+    
+    def __init__(self, max_keys: int = 10000):
+        self._lock = threading.Lock()
+        self._bookmarks = OrderedDict()
+        self.max_keys = max_keys
+    
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            bookmarks = self._bookmarks.get(key)
+            if bookmarks is not None:
+                self._bookmarks.move_to_end(key)
+            return bookmarks
+    
+    def update(self, key, bookmarks):
+        if key is None or not bookmarks or not bookmarks.raw_values:
+            return
+        with self._lock:
+            self._bookmarks[key] = bookmarks
+            self._bookmarks.move_to_end(key)
+            while len(self._bookmarks) > self.max_keys:
+                self._bookmarks.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._bookmarks.clear()
 
 
 class Neo4jDatabase:
@@ -10,17 +63,21 @@ class Neo4jDatabase:
     
     def __init__(self):
         self._driver = None
-        # Log the connection details for debugging
-        logger.info(f"Neo4j will connect to: {settings.NEO4J_URI} with user '{settings.NEO4J_USER}'")
+        self.bookmarks = BookmarkStore()
 
     def get_driver(self):
         """Get or create Neo4j driver"""
         if self._driver is None:
+            # The driver package is imported on first connect, not with the app
+            from neo4j import GraphDatabase
+
             try:
-                logger.info(f"Connecting to Neo4j at {settings.NEO4J_URI}...")
+                logger.info(f"Connecting to Neo4j at {settings.NEO4J_URI} with user '{settings.NEO4J_USER}'...")
                 self._driver = GraphDatabase.driver(
                     settings.NEO4J_URI,
-                    auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+                    auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                    # Retries are made (and counted) by _transaction instead
+                    max_transaction_retry_time=0,
                 )
                 # Verify the connection
                 with self._driver.session() as session:
@@ -47,56 +104,113 @@ class Neo4jDatabase:
             self._driver = None
             logger.info("Neo4j connection closed")
     
-    def session(self):
-        """Get a Neo4j session"""
-        return self.get_driver().session()
+    def session(self, access_mode=None, bookmarks=None):
+        """Get a Neo4j session; READ sessions are routed to followers in a cluster"""
+        config = {}
+        if access_mode is not None:
+            config["default_access_mode"] = access_mode
+        if bookmarks is not None:
+            config["bookmarks"] = bookmarks
+        return self.get_driver().session(**config)
     
-    def run_query(self, query, parameters=None):
-        """Run a query and return all results"""
-        with self.session() as session:
-            result = session.run(query, parameters or {})
-            return [record for record in result]
+    def run_query(self, query, parameters=None, bookmark_key=None):
+        """
+        Run a query and return all results. Registered queries run as managed read or
+        write transactions according to their access mode; other text runs auto-commit
+        on the leader. Pass `bookmark_key` (e.g. a user id) to read that key's own writes.
+        """
+        return self._run(query, parameters, lambda result: [record for record in result], bookmark_key)
     
-    def run_query_single(self, query, parameters=None):
+    def run_query_single(self, query, parameters=None, bookmark_key=None):
         """Run a query and return a single result"""
-        with self.session() as session:
-            result = session.run(query, parameters or {})
-            return result.single()
+        return self._run(query, parameters, lambda result: result.single(), bookmark_key)
+    
+    def read_transaction(self, name, work, *args, bookmark_key=None):
+        """Run `work(tx, *args)` in one read transaction, retrying transient failures"""
+        return self._transaction(name, READ_ACCESS, lambda tx: (work(tx, *args), 0, None), bookmark_key)
+    
+    def write_transaction(self, name, work, *args, bookmark_key=None):
+        """
+        Run `work(tx, *args)` in one write transaction, so several statements commit
+        together, retrying transient failures. `work` may run more than once and must
+        not have side effects outside the transaction. Stats are recorded under `name`.
+        """
+        return self._transaction(name, WRITE_ACCESS, lambda tx: (work(tx, *args), 0, None), bookmark_key)
+    
+    def _run(self, query, parameters, fetch, bookmark_key=None):
+        """Run a single query, as a managed transaction when it is a registered one"""
+        profile = queries.query_name(query) != queries.ADHOC and random.random() < settings.NEO4J_PROFILE_SAMPLE_RATE
+        text = f"PROFILE {query}" if profile else str(query)
+        
+        def work(runner):
+            result = runner.run(text, parameters or {})
+            fetched = fetch(result)
+            db_hits = queries.plan_db_hits(result.consume().profile) if profile else None
+            rows = len(fetched) if isinstance(fetched, list) else int(fetched is not None)
+            return fetched, rows, db_hits
+        
+        return self._transaction(queries.query_name(query), getattr(query, "access", None), work, bookmark_key)
+    
+    def _transaction(self, name, access, work, bookmark_key=None):
+        """
+        Run `work` (returning value, rows, db_hits) as a READ or WRITE managed transaction,
+        or auto-commit when `access` is None. Managed transactions are retried on transient
+        errors up to NEO4J_TRANSACTION_MAX_ATTEMPTS times with jittered exponential backoff,
+        each attempt in a fresh session. Latency, retries and errors go to query_stats,
+        and the elapsed time to the current request's metrics.
+        """
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with self.session(access or WRITE_ACCESS, self.bookmarks.get(bookmark_key)) as session:
+                    if access == READ_ACCESS:
+                        value, rows, db_hits = session.execute_read(work)
+                    elif access == WRITE_ACCESS:
+                        value, rows, db_hits = session.execute_write(work)
+                    else:
+                        value, rows, db_hits = work(session)
+                    if access != READ_ACCESS:
+                        self.bookmarks.update(bookmark_key, session.last_bookmarks())
+                break
+            except Exception as e:
+                if access is None or attempt >= settings.NEO4J_TRANSACTION_MAX_ATTEMPTS or not is_retryable(e):
+                    elapsed = time.perf_counter() - started
+                    queries.query_stats.record(name, elapsed * 1000, error=True, retries=attempt - 1)
+                    metrics.add_neo4j_time(elapsed)
+                    raise
+                delay = min(MAX_RETRY_DELAY_SECONDS, settings.NEO4J_RETRY_INITIAL_DELAY_SECONDS * 2 ** (attempt - 1))
+                logger.warning(f"Retrying Neo4j transaction {name} after {type(e).__name__} (attempt {attempt})")
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        elapsed = time.perf_counter() - started
+        queries.query_stats.record(name, elapsed * 1000, rows, db_hits, retries=attempt - 1)
+        metrics.add_neo4j_time(elapsed)
+        return value
     
     def verify_curriculum_structure(self):
         """Verify that the Neo4j database has the expected curriculum structure"""
         try:
             # Check that Chapter nodes exist
-            chapter_count = self.run_query_single(
-                "MATCH (c:Chapter) RETURN count(c) as count"
-            )
+            chapter_count = self.run_query_single(queries.CHAPTER_COUNT)
             if not chapter_count or chapter_count["count"] == 0:
                 logger.warning("No Chapter nodes found in Neo4j database")
                 return False
             
             # Check that Requirement nodes exist
-            req_count = self.run_query_single(
-                "MATCH (r:Requirement) RETURN count(r) as count"
-            )
+            req_count = self.run_query_single(queries.REQUIREMENT_COUNT)
             if not req_count or req_count["count"] == 0:
                 logger.warning("No Requirement nodes found in Neo4j database")
                 return False
             
             # Check that Goal nodes exist
-            goal_count = self.run_query_single(
-                "MATCH (g:Goal) RETURN count(g) as count"
-            )
+            goal_count = self.run_query_single(queries.GOAL_COUNT)
             if not goal_count or goal_count["count"] == 0:
                 logger.warning("No Goal nodes found in Neo4j database")
                 return False
             
             # Check relationships
-            rel_check = self.run_query_single(
-                """
-                MATCH (:Chapter)-[r1:HAS_REQUIREMENT]->(:Requirement)-[r2:HAS_GOAL]->(:Goal)
-                RETURN count(r1) > 0 as has_requirements, count(r2) > 0 as has_goals
-                """
-            )
+            rel_check = self.run_query_single(queries.CURRICULUM_LINKS)
             if not rel_check or not rel_check["has_requirements"] or not rel_check["has_goals"]:
                 logger.warning("Missing required relationships in curriculum structure")
                 return False
@@ -108,71 +222,18 @@ class Neo4jDatabase:
             return False
     
     def create_curriculum_structure(self):
-        """Create basic curriculum structure if it doesn't exist"""
+        """
+        Create basic curriculum structure if it doesn't exist. Constraints and
+        indexes come from ensure_schema, which the caller runs first.
+        """
         try:
             # Check if structure already exists
             if self.verify_curriculum_structure():
                 logger.info("Curriculum structure already exists")
                 return
             
-            # Create constraints for unique IDs
-            self.run_query("CREATE CONSTRAINT chapter_id IF NOT EXISTS FOR (c:Chapter) REQUIRE c.id IS UNIQUE")
-            self.run_query("CREATE CONSTRAINT requirement_id IF NOT EXISTS FOR (r:Requirement) REQUIRE r.id IS UNIQUE")
-            self.run_query("CREATE CONSTRAINT goal_id IF NOT EXISTS FOR (g:Goal) REQUIRE g.id IS UNIQUE")
-            
-            # Create sample curriculum structure
-            self.run_query(
-                """
-                // Create Chapters
-                CREATE (c1:Chapter {id: 'C1', name: 'Numbers and Arithmetic', grade_level: 8})
-                CREATE (c2:Chapter {id: 'C2', name: 'Algebra and Equations', grade_level: 8})
-                CREATE (c3:Chapter {id: 'C3', name: 'Geometry', grade_level: 8})
-                
-                // Create Requirements for each Chapter
-                CREATE (r1:Requirement {id: 'R1', description: 'Understanding real numbers and their properties'})
-                CREATE (r2:Requirement {id: 'R2', description: 'Performing arithmetic operations'})
-                CREATE (r3:Requirement {id: 'R3', description: 'Solving linear equations'})
-                CREATE (r4:Requirement {id: 'R4', description: 'Understanding algebraic expressions'})
-                CREATE (r5:Requirement {id: 'R5', description: 'Calculating geometric measurements'})
-                CREATE (r6:Requirement {id: 'R6', description: 'Understanding geometric transformations'})
-                
-                // Create Goals for each Requirement
-                CREATE (g1:Goal {id: 'G1', description: 'Classify and compare real numbers'})
-                CREATE (g2:Goal {id: 'G2', description: 'Represent numbers on the number line'})
-                CREATE (g3:Goal {id: 'G3', description: 'Add and subtract integers'})
-                CREATE (g4:Goal {id: 'G4', description: 'Multiply and divide rational numbers'})
-                CREATE (g5:Goal {id: 'G5', description: 'Solve linear equations with one variable'})
-                CREATE (g6:Goal {id: 'G6', description: 'Solve linear equations with variables on both sides'})
-                CREATE (g7:Goal {id: 'G7', description: 'Simplify algebraic expressions'})
-                CREATE (g8:Goal {id: 'G8', description: 'Factor quadratic expressions'})
-                CREATE (g9:Goal {id: 'G9', description: 'Calculate area and perimeter of polygons'})
-                CREATE (g10:Goal {id: 'G10', description: 'Calculate volume and surface area of solids'})
-                CREATE (g11:Goal {id: 'G11', description: 'Apply translations, rotations, and reflections'})
-                CREATE (g12:Goal {id: 'G12', description: 'Identify congruent and similar shapes'})
-                
-                // Connect Chapters to Requirements
-                CREATE (c1)-[:HAS_REQUIREMENT]->(r1)
-                CREATE (c1)-[:HAS_REQUIREMENT]->(r2)
-                CREATE (c2)-[:HAS_REQUIREMENT]->(r3)
-                CREATE (c2)-[:HAS_REQUIREMENT]->(r4)
-                CREATE (c3)-[:HAS_REQUIREMENT]->(r5)
-                CREATE (c3)-[:HAS_REQUIREMENT]->(r6)
-                
-                // Connect Requirements to Goals
-                CREATE (r1)-[:HAS_GOAL]->(g1)
-                CREATE (r1)-[:HAS_GOAL]->(g2)
-                CREATE (r2)-[:HAS_GOAL]->(g3)
-                CREATE (r2)-[:HAS_GOAL]->(g4)
-                CREATE (r3)-[:HAS_GOAL]->(g5)
-                CREATE (r3)-[:HAS_GOAL]->(g6)
-                CREATE (r4)-[:HAS_GOAL]->(g7)
-                CREATE (r4)-[:HAS_GOAL]->(g8)
-                CREATE (r5)-[:HAS_GOAL]->(g9)
-                CREATE (r5)-[:HAS_GOAL]->(g10)
-                CREATE (r6)-[:HAS_GOAL]->(g11)
-                CREATE (r6)-[:HAS_GOAL]->(g12)
-                """
-            )
+            # Load the sample curriculum file
+            import_curriculum(self, [SAMPLE_CURRICULUM_PATH])
             
             logger.info("Created sample curriculum structure in Neo4j")
             
@@ -181,18 +242,37 @@ class Neo4jDatabase:
             raise
 
 
+    def create_prerequisite_links(self, links):
+        """Link goals with (prerequisite)-[:PREREQUISITE_OF]->(goal) edges; safe to re-run"""
+        self.run_query(
+            queries.CREATE_PREREQUISITE_LINKS,
+            {"links": [list(link) for link in links]}
+        )
+
+
 # Create a Neo4j database instance
 neo4j_db = Neo4jDatabase()
 
+def connect_neo4j_db():
+    """Open the driver and verify connectivity; the part of Neo4j startup requests depend on"""
+    neo4j_db.get_driver()
+
+def ensure_curriculum():
+    """Create the sample curriculum, prerequisite links included, on an empty database"""
+    if not neo4j_db.verify_curriculum_structure():
+        neo4j_db.create_curriculum_structure()
+
 def init_neo4j_db():
     """Initialize Neo4j database and verify/create curriculum structure"""
     try:
         # Test connection
-        neo4j_db.get_driver()
+        connect_neo4j_db()
+        
+        # Constraints and indexes, waiting until they are online
+        ensure_schema(neo4j_db)
         
         # Verify/create curriculum structure
-        if not neo4j_db.verify_curriculum_structure():
-            neo4j_db.create_curriculum_structure()
+        ensure_curriculum()
         
         logger.info("Neo4j database initialized successfully")
     except Exception as e:
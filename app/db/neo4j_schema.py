@@ -0,0 +1,139 @@
+"""
+Declarative Neo4j schema: constraints and indexes for every node label we query.
+
+`ensure_schema` creates whatever is missing (every statement is named and
+IF NOT EXISTS, so it is safe on each start), then blocks until all indexes are
+ONLINE so the first requests after a deploy do not fall back to label scans
+while indexes populate.
+
+`plan_operators` runs a query under PROFILE and returns the operators it used;
+tests/test_db/test_neo4j_schema.py uses it to assert the hot queries in
+HOT_QUERIES are served by index seeks.
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+# Uniqueness constraints, each backed by a range index used for `{id: $id}` lookups
+CONSTRAINTS = {
+    "chapter_id": "CREATE CONSTRAINT chapter_id IF NOT EXISTS FOR (c:Chapter) REQUIRE c.id IS UNIQUE",
+    "requirement_id": "CREATE CONSTRAINT requirement_id IF NOT EXISTS FOR (r:Requirement) REQUIRE r.id IS UNIQUE",
+    "goal_id": "CREATE CONSTRAINT goal_id IF NOT EXISTS FOR (g:Goal) REQUIRE g.id IS UNIQUE",
+    "problem_id": "CREATE CONSTRAINT problem_id IF NOT EXISTS FOR (p:Problem) REQUIRE p.id IS UNIQUE",
+    "solution_step_id": "CREATE CONSTRAINT solution_step_id IF NOT EXISTS FOR (s:SolutionStep) REQUIRE s.id IS UNIQUE",
+}
+
+# Range indexes for filtered lookups, text indexes for substring search
+INDEXES = {
+    "problem_user_id": "CREATE INDEX problem_user_id IF NOT EXISTS FOR (p:Problem) ON (p.user_id)",
+    "problem_subject_difficulty": (
+        "CREATE INDEX problem_subject_difficulty IF NOT EXISTS FOR (p:Problem) ON (p.subject_area, p.difficulty)"
+    ),
+    "problem_difficulty": "CREATE INDEX problem_difficulty IF NOT EXISTS FOR (p:Problem) ON (p.difficulty)",
+    "problem_created_at": "CREATE INDEX problem_created_at IF NOT EXISTS FOR (p:Problem) ON (p.created_at)",
+    "chapter_grade_level": "CREATE INDEX chapter_grade_level IF NOT EXISTS FOR (c:Chapter) ON (c.grade_level)",
+    "problem_text": "CREATE TEXT INDEX problem_text IF NOT EXISTS FOR (p:Problem) ON (p.text)",
+    "goal_description": "CREATE TEXT INDEX goal_description IF NOT EXISTS FOR (g:Goal) ON (g.description)",
+}
+
+# Hot lookups that must be index seeks, with sample parameters for PROFILE
+HOT_QUERIES: Dict[str, Dict[str, Any]] = {
+    "solution_step_by_id": {
+        "query": "MATCH (s:SolutionStep {id: $step_id}) RETURN s",
+        "parameters": {"step_id": "S1"},
+    },
+    "problem_by_id": {
+        "query": "MATCH (p:Problem {id: $problem_id}) RETURN p",
+        "parameters": {"problem_id": "P1"},
+    },
+    "problems_by_ids": {
+        "query": "MATCH (p:Problem) WHERE p.id IN $problem_ids RETURN p.id as id, p.text as text",
+        "parameters": {"problem_ids": ["P1", "P2"]},
+    },
+    "goal_by_id": {
+        "query": "MATCH (g:Goal {id: $goal_id}) RETURN g",
+        "parameters": {"goal_id": "G1"},
+    },
+    "problems_by_user": {
+        "query": "MATCH (p:Problem) WHERE p.user_id = $user_id RETURN p.id",
+        "parameters": {"user_id": 1},
+    },
+    "problems_by_subject_and_difficulty": {
+        "query": (
+            "MATCH (p:Problem) WHERE p.subject_area = $subject_area "
+            "AND p.difficulty >= $min_difficulty AND p.difficulty <= $max_difficulty RETURN p.id"
+        ),
+        "parameters": {"subject_area": "Algebra", "min_difficulty": 1, "max_difficulty": 3},
+    },
+    "problems_by_text": {
+        "query": "MATCH (p:Problem) WHERE p.text CONTAINS $fragment RETURN p.id",
+        "parameters": {"fragment": "equation"},
+    },
+}
+
+# Operators that read every node with a label (or every node)
+SCAN_OPERATORS = {"NodeByLabelScan", "AllNodesScan"}
+
+
+def _operator_name(operator_type: str) -> str:
+    # Operator types carry the runtime, e.g. "NodeIndexSeek@neo4j"
+    return operator_type.split("@", 1)[0]
+
+
+def ensure_schema(neo4j_instance, await_timeout_seconds: int = 300) -> None:
+    """Create missing constraints and indexes, then wait for every index to be ONLINE"""
+    for name, statement in {**CONSTRAINTS, **INDEXES}.items():
+        neo4j_instance.run_query(statement)
+    logger.info(f"Neo4j schema ensured: {len(CONSTRAINTS)} constraints, {len(INDEXES)} indexes")
+    await_indexes(neo4j_instance, await_timeout_seconds)
+
+
+def index_states(neo4j_instance) -> Dict[str, Dict[str, Any]]:
+    """Name -> {state, populationPercent} for every index"""
+    records = neo4j_instance.run_query("SHOW INDEXES YIELD name, state, populationPercent")
+    return {
+        record["name"]: {"state": record["state"], "populationPercent": record["populationPercent"]}
+        for record in records
+    }
+
+
+def await_indexes(neo4j_instance, timeout_seconds: int = 300, poll_seconds: float = 1.0) -> None:
+    """
+    Block until no index is POPULATING. Raises RuntimeError if an index FAILED or
+    population does not finish within `timeout_seconds`.
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        states = index_states(neo4j_instance)
+        failed = sorted(name for name, info in states.items() if info["state"] == "FAILED")
+        if failed:
+            raise RuntimeError(f"Neo4j indexes failed to populate: {', '.join(failed)}")
+        pending = sorted(name for name, info in states.items() if info["state"] != "ONLINE")
+        if not pending:
+            return
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"Neo4j indexes still populating after {timeout_seconds}s: {', '.join(pending)}")
+        logger.info(f"Waiting for Neo4j indexes to come online: {', '.join(pending)}")
+        time.sleep(poll_seconds)
+
+
+def flatten_plan(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """Operator names of a profiled plan, depth first"""
+    if not plan:
+        return []
+    operators = [_operator_name(plan.get("operatorType", ""))]
+    for child in plan.get("children", []):
+        operators.extend(flatten_plan(child))
+    return operators
+
+
+def plan_operators(neo4j_instance, query: str, parameters: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Run `query` under PROFILE and return the operators of its executed plan"""
+    with neo4j_instance.session() as session:
+        summary = session.run(f"PROFILE {query}", parameters or {}).consume()
+    return flatten_plan(summary.profile)
+
+
+def uses_label_scan(operators: List[str]) -> bool:
+    return any(operator in SCAN_OPERATORS for operator in operators)
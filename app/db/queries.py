@@ -0,0 +1,390 @@
+"""
+Registry of every Cypher statement the application runs, with per-query timing.
+
+Each query is declared once here under a dotted name and is a `CypherQuery`: a
+`str` carrying its name, so it can be passed anywhere query text is expected.
+Values always travel as parameters, never formatted into the text, so each
+query has one constant text and Neo4j plans it once and serves later runs from
+its plan cache. Each query also declares whether it reads or writes, which
+`Neo4jDatabase` uses to route it to a follower or the leader of a cluster.
+
+`Neo4jDatabase.run_query` records every run in `query_stats`: call count, total
+and max latency, a fixed-bucket latency histogram, rows returned, transient
+retries and errors. Multi-statement transactions (`write_transaction`) are
+recorded under the name they are given.
+With NEO4J_PROFILE_SAMPLE_RATE > 0 a share of runs executes under PROFILE and
+adds its database hits. Text that is not a registered query (schema
+statements, scripts) is grouped under "adhoc". `scripts/neo4j_query_report.py`
+ranks the dumped stats by total time.
+"""
+import json
+import os
+import textwrap
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+# Upper bounds of the latency histogram buckets in milliseconds; the last bucket is open
+LATENCY_BUCKETS_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+ADHOC = "adhoc"
+# Access modes, the same values as neo4j.READ_ACCESS and neo4j.WRITE_ACCESS
+READ = "READ"
+WRITE = "WRITE"
+
+
+class CypherQuery(str):
+    """Query text that knows its registry name and access mode"""
+
+    def __new__(cls, name: str, text: str, access: str = READ):
+        query = super().__new__(cls, text)
+        query.name = name
+        query.access = access
+        return query
+
+    def __reduce__(self):
+        return CypherQuery, (self.name, str(self), self.access)
+
+
+# Registered queries by name
+QUERIES: Dict[str, CypherQuery] = {}
+
+
+def register(name: str, text: str, access: str = READ) -> CypherQuery:
+    """Declare a named query. Raises ValueError if the name is already taken."""
+    if name in QUERIES:
+        raise ValueError(f"Cypher query {name!r} is already registered")
+    if access not in (READ, WRITE):
+        raise ValueError(f"Unknown access mode {access!r} for Cypher query {name!r}")
+    query = CypherQuery(name, textwrap.dedent(text).strip(), access)
+    QUERIES[name] = query
+    return query
+
+
+def query_name(query: str) -> str:
+    return getattr(query, "name", ADHOC)
+
+
+def plan_db_hits(plan: Optional[Dict[str, Any]]) -> int:
+    """Total database hits of a profiled plan"""
+    if not plan:
+        return 0
+    return plan.get("dbHits", 0) + sum(plan_db_hits(child) for child in plan.get("children", []))
+
+
+# Curriculum
+CHAPTER_COUNT = register("curriculum.chapter_count", "MATCH (c:Chapter) RETURN count(c) as count")
+REQUIREMENT_COUNT = register("curriculum.requirement_count", "MATCH (r:Requirement) RETURN count(r) as count")
+GOAL_COUNT = register("curriculum.goal_count", "MATCH (g:Goal) RETURN count(g) as count")
+CURRICULUM_LINKS = register("curriculum.links", """
+    MATCH (:Chapter)-[r1:HAS_REQUIREMENT]->(:Requirement)-[r2:HAS_GOAL]->(:Goal)
+    RETURN count(r1) > 0 as has_requirements, count(r2) > 0 as has_goals
+""")
+CREATE_PREREQUISITE_LINKS = register("curriculum.create_prerequisite_links", """
+    UNWIND $links AS link
+    MATCH (prerequisite:Goal {id: link[0]}), (goal:Goal {id: link[1]})
+    MERGE (prerequisite)-[:PREREQUISITE_OF]->(goal)
+""", WRITE)
+ALL_CHAPTERS = register(
+    "curriculum.chapters", "MATCH (c:Chapter) RETURN c.id as id, c.name as name, c.grade_level as grade_level"
+)
+CHAPTER_REQUIREMENTS = register("curriculum.chapter_requirements", """
+    MATCH (c:Chapter {id: $chapter_id})-[:HAS_REQUIREMENT]->(r:Requirement)
+    RETURN r.id as id, r.description as description
+""")
+REQUIREMENT_GOALS = register("curriculum.requirement_goals", """
+    MATCH (r:Requirement {id: $requirement_id})-[:HAS_GOAL]->(g:Goal)
+    RETURN g.id as id, g.description as description
+""")
+ALL_GOALS = register("curriculum.goals", "MATCH (g:Goal) RETURN g.id as id, g.description as description")
+GOAL_IDS = register("curriculum.goal_ids", "MATCH (g:Goal) RETURN g.id as id")
+GOAL_DESCRIPTIONS = register("curriculum.goal_descriptions", """
+    MATCH (g:Goal) WHERE g.id IN $goal_ids
+    RETURN g.id as id, g.description as description
+""")
+PREREQUISITES = register("curriculum.prerequisites", """
+    MATCH (prerequisite:Goal)-[:PREREQUISITE_OF]->(goal:Goal)
+    RETURN prerequisite.id as prerequisite_id, goal.id as goal_id
+""")
+CURRICULUM_TREE = register("curriculum.tree", """
+    MATCH (c:Chapter)
+    OPTIONAL MATCH (c)-[:HAS_REQUIREMENT]->(r:Requirement)
+    OPTIONAL MATCH (r)-[:HAS_GOAL]->(g:Goal)
+    RETURN c.id as chapter_id, c.name as chapter_name, c.grade_level as grade_level,
+           r.id as requirement_id, r.description as requirement_description,
+           g.id as goal_id, g.description as goal_description
+    ORDER BY chapter_id, requirement_id, goal_id
+""")
+
+# Curriculum import: content hashes for diffing, batched upserts that also re-parent moved nodes
+CHAPTER_HASHES = register("curriculum.chapter_hashes", """
+    MATCH (c:Chapter)
+    RETURN c.id as id, c.content_hash as content_hash, c.grade_level as grade_level
+""")
+REQUIREMENT_HASHES = register("curriculum.requirement_hashes", """
+    MATCH (r:Requirement)
+    OPTIONAL MATCH (c:Chapter)-[:HAS_REQUIREMENT]->(r)
+    RETURN r.id as id, r.content_hash as content_hash, c.grade_level as grade_level
+""")
+GOAL_HASHES = register("curriculum.goal_hashes", """
+    MATCH (g:Goal)
+    OPTIONAL MATCH (c:Chapter)-[:HAS_REQUIREMENT]->(:Requirement)-[:HAS_GOAL]->(g)
+    RETURN g.id as id, g.content_hash as content_hash, c.grade_level as grade_level
+""")
+UPSERT_CHAPTERS = register("curriculum.upsert_chapters", """
+    UNWIND $rows AS row
+    MERGE (c:Chapter {id: row.id})
+    SET c.name = row.name, c.grade_level = row.grade_level, c.content_hash = row.content_hash
+""", WRITE)
+UPSERT_REQUIREMENTS = register("curriculum.upsert_requirements", """
+    UNWIND $rows AS row
+    MATCH (c:Chapter {id: row.chapter_id})
+    MERGE (r:Requirement {id: row.id})
+    SET r.description = row.description, r.content_hash = row.content_hash
+    WITH c, r
+    OPTIONAL MATCH (previous:Chapter)-[moved:HAS_REQUIREMENT]->(r) WHERE previous <> c
+    DELETE moved
+    WITH DISTINCT c, r
+    MERGE (c)-[:HAS_REQUIREMENT]->(r)
+""", WRITE)
+UPSERT_GOALS = register("curriculum.upsert_goals", """
+    UNWIND $rows AS row
+    MATCH (r:Requirement {id: row.requirement_id})
+    MERGE (g:Goal {id: row.id})
+    SET g.description = row.description, g.content_hash = row.content_hash
+    WITH r, g
+    OPTIONAL MATCH (previous:Requirement)-[moved:HAS_GOAL]->(g) WHERE previous <> r
+    DELETE moved
+    WITH DISTINCT r, g
+    MERGE (r)-[:HAS_GOAL]->(g)
+""", WRITE)
+DELETE_PREREQUISITE_LINKS = register("curriculum.delete_prerequisite_links", """
+    UNWIND $links AS link
+    MATCH (:Goal {id: link[0]})-[edge:PREREQUISITE_OF]->(:Goal {id: link[1]})
+    DELETE edge
+""", WRITE)
+DELETE_CHAPTERS = register("curriculum.delete_chapters", """
+    UNWIND $ids AS id
+    MATCH (c:Chapter {id: id})
+    DETACH DELETE c
+""", WRITE)
+DELETE_REQUIREMENTS = register("curriculum.delete_requirements", """
+    UNWIND $ids AS id
+    MATCH (r:Requirement {id: id})
+    DETACH DELETE r
+""", WRITE)
+DELETE_GOALS = register("curriculum.delete_goals", """
+    UNWIND $ids AS id
+    MATCH (g:Goal {id: id})
+    DETACH DELETE g
+""", WRITE)
+
+# Problems
+PROBLEM_COUNT = register("problems.count", "MATCH (p:Problem) RETURN count(p) as count")
+PROBLEM_IDS = register("problems.ids", "MATCH (p:Problem) RETURN p.id as id")
+PROBLEM_DETAILS = register("problems.details", """
+    MATCH (p:Problem) WHERE p.id IN $problem_ids
+    RETURN p.id as id, p.text as text, p.subject_area as subject_area
+""")
+PROBLEM_GOALS = register("problems.goals", """
+    MATCH (p:Problem)-[:HAS_STEP]->(:SolutionStep)-[:RELATED_TO_GOAL]->(g:Goal)
+    RETURN p.id as problem_id, p.difficulty as difficulty, p.subject_area as subject_area,
+           collect(DISTINCT g.id) as goal_ids
+""")
+CREATE_PROBLEM = register("problems.create", """
+    CREATE (p:Problem {
+        id: $id,
+        text: $text,
+        subject_area: $subject_area,
+        difficulty: $difficulty,
+        user_id: $user_id,
+        created_at: datetime()
+    })
+""", WRITE)
+CREATE_SOLUTION_STEP = register("problems.create_step", """
+    MATCH (p:Problem {id: $problem_id})
+    CREATE (s:SolutionStep {
+        id: $id,
+        step_number: $step_number,
+        description: $description,
+        hint: $hint,
+        solution: $solution,
+        user_solved: false,
+        solved_with_hint: null
+    })
+    CREATE (p)-[:HAS_STEP]->(s)
+""", WRITE)
+LINK_STEP_TO_GOAL = register("problems.link_step_goal", """
+    MATCH (s:SolutionStep {id: $step_id})
+    MATCH (g:Goal {id: $goal_id})
+    CREATE (s)-[:RELATED_TO_GOAL]->(g)
+""", WRITE)
+BULK_CREATE_PROBLEMS = register("problems.bulk_create", """
+    UNWIND $problems AS row
+    CREATE (p:Problem {
+        id: row.id,
+        text: row.text,
+        subject_area: row.subject_area,
+        difficulty: row.difficulty,
+        user_id: row.user_id,
+        created_at: datetime()
+    })
+    WITH p, row
+    UNWIND row.steps AS step
+    CREATE (s:SolutionStep {
+        id: step.id,
+        step_number: step.step_number,
+        description: step.description,
+        hint: step.hint,
+        solution: step.solution,
+        user_solved: false
+    })
+    CREATE (p)-[:HAS_STEP]->(s)
+    WITH s, step
+    UNWIND step.goal_ids AS goal_id
+    MATCH (g:Goal {id: goal_id})
+    CREATE (s)-[:RELATED_TO_GOAL]->(g)
+""", WRITE)
+
+
+class QueryTiming:
+    """Accumulated measurements of one named query"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.profiled = 0
+        self.db_hits = 0
+
+    def add(self, elapsed_ms: float, rows: int, db_hits: Optional[int], error: bool, retries: int = 0) -> None:
+        self.calls += 1
+        self.errors += error
+        self.retries += retries
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        if db_hits is not None:
+            self.profiled += 1
+            self.db_hits += db_hits
+
+    def percentile_ms(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of calls, capped at max_ms"""
+        if not self.calls:
+            return None
+        needed = fraction * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= needed:
+                return min(LATENCY_BUCKETS_MS[i], self.max_ms) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else None,
+            "p50_ms": self.percentile_ms(0.5),
+            "p95_ms": self.percentile_ms(0.95),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "buckets": list(self.buckets),
+            "profiled": self.profiled,
+            "db_hits": self.db_hits,
+            "db_hits_per_call": round(self.db_hits / self.profiled, 1) if self.profiled else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueryTiming":
+        timing = cls()
+        for field in ("calls", "errors", "retries", "total_ms", "max_ms", "rows", "profiled", "db_hits"):
+            setattr(timing, field, data.get(field, 0))
+        timing.buckets = list(data.get("buckets") or timing.buckets)
+        return timing
+
+    def merge(self, other: "QueryTiming") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.retries += other.retries
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.rows += other.rows
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.profiled += other.profiled
+        self.db_hits += other.db_hits
+
+
+class QueryStats:
+    """Thread-safe per-query measurements"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: Dict[str, QueryTiming] = {}
+
+    def record(
+        self,
+        name: str,
+        elapsed_ms: float,
+        rows: int = 0,
+        db_hits: Optional[int] = None,
+        error: bool = False,
+        retries: int = 0,
+    ) -> None:
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = QueryTiming()
+            timing.add(elapsed_ms, rows, db_hits, error, retries)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: timing.to_dict() for name, timing in self._timings.items()}
+
+    def dump(self, path: str) -> None:
+        """Write the current stats as JSON"""
+        with open(path, "w") as f:
+            json.dump({
+                "generated_at": datetime.utcnow().isoformat(),
+                "latency_buckets_ms": LATENCY_BUCKETS_MS,
+                "queries": self.snapshot(),
+            }, f, indent=2)
+
+
+def worker_stats_path(path: str, pid: Optional[int] = None) -> str:
+    """Per-process dump path, e.g. query_stats.json -> query_stats.1234.json, so workers never overwrite each other"""
+    root, extension = os.path.splitext(path)
+    return f"{root}.{pid or os.getpid()}{extension or '.json'}"
+
+
+def load_stats(paths: Iterable[str]) -> Dict[str, QueryTiming]:
+    """Read and merge stats dumps, e.g. one per worker process"""
+    merged: Dict[str, QueryTiming] = {}
+    for path in paths:
+        with open(path) as f:
+            queries = json.load(f)["queries"]
+        for name, data in queries.items():
+            merged.setdefault(name, QueryTiming()).merge(QueryTiming.from_dict(data))
+    return merged
+
+
+def top_queries(timings: Dict[str, QueryTiming], limit: int = 10, key: str = "total_ms") -> List[Dict[str, Any]]:
+    """Queries ordered by `key` (any field of QueryTiming.to_dict), largest first"""
+    rows = [{"name": name, **timing.to_dict()} for name, timing in timings.items()]
+    rows.sort(key=lambda row: -(row[key] or 0))
+    return rows[:limit]
+
+
+# Shared stats instance
+query_stats = QueryStats()
@@ -1,14 +1,19 @@
 import os
+import random
 import uuid
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, List
 
 from loguru import logger
 from sqlalchemy.orm import Session
 
 from app.core.security import get_password_hash
+from app.db import queries
+from app.db.attempt_log import append_attempt
+from app.db.goal_stats import rebuild_goal_stats
 from app.db.neo4j import neo4j_db
 from app.models.users import User, GoalProgress, ProblemHistory, UserSettings
+from app.services.recommendation_index import goal_problem_index
 
 
 def create_sample_users(db: Session) -> List[User]:
@@ -20,12 +25,16 @@ def create_sample_users(db: Session) -> List[User]:
         logger.info(f"Found {existing_users} existing users, skipping sample user creation")
         return db.query(User).all()
     
+    # Hash each distinct sample password once
+    student_password_hash = get_password_hash("password123")
+    teacher_password_hash = get_password_hash("teacher123")
+    
     # Create sample users
     sample_users = [
         User(
             username="student1",
             email="student1@example.com",
-            hashed_password=get_password_hash("password123"),
+            hashed_password=student_password_hash,
             grade_level=8,
             created_at=datetime.now() - timedelta(days=30),
             last_login=datetime.now() - timedelta(days=2)
@@ -33,7 +42,7 @@ def create_sample_users(db: Session) -> List[User]:
         User(
             username="student2",
             email="student2@example.com",
-            hashed_password=get_password_hash("password123"),
+            hashed_password=student_password_hash,
             grade_level=9,
             created_at=datetime.now() - timedelta(days=25),
             last_login=datetime.now() - timedelta(days=1)
@@ -41,7 +50,7 @@ def create_sample_users(db: Session) -> List[User]:
         User(
             username="teacher1",
             email="teacher1@example.com",
-            hashed_password=get_password_hash("teacher123"),
+            hashed_password=teacher_password_hash,
             grade_level=None,
             created_at=datetime.now() - timedelta(days=60),
             last_login=datetime.now() - timedelta(hours=5)
@@ -49,15 +58,13 @@ def create_sample_users(db: Session) -> List[User]:
     ]
     
     # Add to database
-    for user in sample_users:
-        db.add(user)
+    db.add_all(sample_users)
     
     db.commit()
     logger.info(f"Created {len(sample_users)} sample users")
     
     # Create user settings for each user
-    for user in sample_users:
-        db.add(UserSettings(user_id=user.id))
+    db.add_all([UserSettings(user_id=user.id) for user in sample_users])
     
     db.commit()
     logger.info(f"Created user settings for sample users")
@@ -75,7 +82,7 @@ def create_sample_goal_progress(db: Session, users: List[User]) -> None:
         return
     
     # Get goals from Neo4j
-    goals = neo4j_db.run_query("MATCH (g:Goal) RETURN g.id as id, g.description as description")
+    goals = neo4j_db.run_query(queries.ALL_GOALS)
     if not goals:
         logger.warning("No goals found in Neo4j, cannot create sample goal progress")
         return
@@ -86,7 +93,6 @@ def create_sample_goal_progress(db: Session, users: List[User]) -> None:
     for user in users:
         for goal in goals:
             # Random mastery level for testing
-            import random
             mastery_level = round(random.uniform(0, 1.0), 2)
             attempts_count = random.randint(1, 10)
             successful_attempts = round(mastery_level * attempts_count)
@@ -103,20 +109,49 @@ def create_sample_goal_progress(db: Session, users: List[User]) -> None:
             )
     
     # Add to database
-    for progress in goal_progress_entries:
-        db.add(progress)
+    db.add_all(goal_progress_entries)
+    db.flush()
+    # Sample rows bypass the incremental goal_stats updates
+    rebuild_goal_stats(db)
     
     db.commit()
     logger.info(f"Created {len(goal_progress_entries)} sample goal progress entries")
 
 
+def create_problem_with_steps(tx, problem: Dict[str, Any]) -> None:
+    """Create a problem, its solution steps and their goal links inside one write transaction"""
+    tx.run(
+        queries.CREATE_PROBLEM,
+        {
+            "id": problem["id"],
+            "text": problem["text"],
+            "subject_area": problem["subject_area"],
+            "difficulty": problem["difficulty"],
+            "user_id": problem["user_id"]
+        }
+    )
+    for step in problem["steps"]:
+        tx.run(
+            queries.CREATE_SOLUTION_STEP,
+            {
+                "problem_id": problem["id"],
+                "id": step["id"],
+                "step_number": step["step_number"],
+                "description": step["description"],
+                "hint": step["hint"],
+                "solution": step["solution"]
+            }
+        )
+        # Link steps to curriculum goals
+        for goal_id in problem["related_goals"]:
+            tx.run(queries.LINK_STEP_TO_GOAL, {"step_id": step["id"], "goal_id": goal_id})
+
+
 def create_sample_problems(neo4j_instance) -> None:
     """Create sample problems in Neo4j for testing"""
     
     # Check if problems already exist
-    problem_count = neo4j_instance.run_query_single(
-        "MATCH (p:Problem) RETURN count(p) as count"
-    )
+    problem_count = neo4j_instance.run_query_single(queries.PROBLEM_COUNT)
     if problem_count and problem_count["count"] > 0:
         logger.info(f"Found {problem_count['count']} existing problems, skipping sample problem creation")
         return
@@ -204,68 +239,16 @@ def create_sample_problems(neo4j_instance) -> None:
         }
     ]
     
-    # Add problems and solution steps to Neo4j
+    # Add each problem with its solution steps and goal links in one transaction
     for problem in sample_problems:
-        # Create problem node
-        neo4j_instance.run_query(
-            """
-            CREATE (p:Problem {
-                id: $id,
-                text: $text,
-                subject_area: $subject_area,
-                difficulty: $difficulty,
-                user_id: $user_id,
-                created_at: datetime()
-            })
-            """,
-            {
-                "id": problem["id"],
-                "text": problem["text"],
-                "subject_area": problem["subject_area"],
-                "difficulty": problem["difficulty"],
-                "user_id": problem["user_id"]
-            }
+        neo4j_instance.write_transaction(
+            "problems.create_with_steps", create_problem_with_steps, problem, bookmark_key=problem["user_id"]
         )
         
-        # Create solution steps
-        for step in problem["steps"]:
-            neo4j_instance.run_query(
-                """
-                MATCH (p:Problem {id: $problem_id})
-                CREATE (s:SolutionStep {
-                    id: $id,
-                    step_number: $step_number,
-                    description: $description,
-                    hint: $hint,
-                    solution: $solution,
-                    user_solved: false,
-                    solved_with_hint: null
-                })
-                CREATE (p)-[:HAS_STEP]->(s)
-                """,
-                {
-                    "problem_id": problem["id"],
-                    "id": step["id"],
-                    "step_number": step["step_number"],
-                    "description": step["description"],
-                    "hint": step["hint"],
-                    "solution": step["solution"]
-                }
-            )
-            
-            # Link steps to curriculum goals
-            for goal_id in problem["related_goals"]:
-                neo4j_instance.run_query(
-                    """
-                    MATCH (s:SolutionStep {id: $step_id})
-                    MATCH (g:Goal {id: $goal_id})
-                    CREATE (s)-[:RELATED_TO_GOAL]->(g)
-                    """,
-                    {
-                        "step_id": step["id"],
-                        "goal_id": goal_id
-                    }
-                )
+        # Keep the goal -> problems index current
+        goal_problem_index.add_problem(
+            problem["id"], problem["related_goals"], problem["difficulty"], problem["subject_area"]
+        )
     
     logger.info(f"Created {len(sample_problems)} sample problems with solution steps")
 
@@ -280,7 +263,7 @@ def create_sample_problem_history(db: Session, users: List[User]) -> None:
         return
     
     # Get problems from Neo4j
-    problems = neo4j_db.run_query("MATCH (p:Problem) RETURN p.id as id")
+    problems = neo4j_db.run_query(queries.PROBLEM_IDS)
     if not problems:
         logger.warning("No problems found in Neo4j, cannot create sample problem history")
         return
@@ -291,26 +274,35 @@ def create_sample_problem_history(db: Session, users: List[User]) -> None:
     for user in users:
         for i, problem in enumerate(problems):
             # Create problem history with random data
-            import random
             completed = random.choice([True, False])
             steps_completed = random.randint(1, 3) if completed else random.randint(0, 2)
             steps_with_hints = random.randint(0, steps_completed)
             
-            problem_history_entries.append(
-                ProblemHistory(
-                    user_id=user.id,
-                    problem_id=problem["id"],
-                    attempted_at=datetime.now() - timedelta(days=random.randint(0, 30)),
-                    completed=completed,
-                    time_spent_seconds=random.randint(60, 600),
-                    steps_completed=steps_completed,
-                    steps_with_hints=steps_with_hints
-                )
+            entry = ProblemHistory(
+                user_id=user.id,
+                problem_id=problem["id"],
+                attempted_at=datetime.now() - timedelta(days=random.randint(0, 30)),
+                completed=completed,
+                time_spent_seconds=random.randint(60, 600),
+                steps_completed=steps_completed,
+                steps_with_hints=steps_with_hints
+            )
+            problem_history_entries.append(entry)
+            
+            # Mirror the attempt into the partitioned attempt log
+            append_attempt(
+                db,
+                user_id=entry.user_id,
+                problem_id=entry.problem_id,
+                attempted_at=entry.attempted_at,
+                completed=entry.completed,
+                time_spent_seconds=entry.time_spent_seconds,
+                steps_completed=entry.steps_completed,
+                steps_with_hints=entry.steps_with_hints
             )
     
     # Add to database
-    for history in problem_history_entries:
-        db.add(history)
+    db.add_all(problem_history_entries)
     
     db.commit()
     logger.info(f"Created {len(problem_history_entries)} sample problem history entries")
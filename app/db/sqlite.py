@@ -1,23 +1,109 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from loguru import logger
+from typing import Any, Callable, Dict
 import os
+import threading
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
-# Make sure the database directory exists
-os.makedirs(os.path.dirname(os.path.abspath("./app.db")), exist_ok=True)
+# Engines and session factories are created on first use rather than at import,
+# so importing models or the app does not touch the filesystem or build pools
+_lock = threading.Lock()
+_state: Dict[str, Any] = {}
 
-# Create SQLAlchemy engine with SQLite
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    connect_args={"check_same_thread": False},  # Needed for SQLite
-    echo=False,  # Set to True for debugging SQL queries
-)
 
-# Create sessionmaker
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_async_database_uri(database_uri: str) -> str:
+    """
+    Map a sync SQLAlchemy URI onto its asyncio driver.
+    sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg
+    """
+    scheme, sep, rest = database_uri.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    raise ValueError(f"No async driver configured for database dialect '{dialect}'")
+
+
+def _lazy(name: str, factory: Callable[[], Any]) -> Any:
+    value = _state.get(name)
+    if value is None:
+        with _lock:
+            value = _state.get(name)
+            if value is None:
+                value = _state[name] = factory()
+    return value
+
+
+def _create_engine():
+    # Make sure the database directory exists
+    os.makedirs(os.path.dirname(os.path.abspath("./app.db")), exist_ok=True)
+    engine = create_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        echo=False,  # Set to True for debugging SQL queries
+    )
+    instrument_engine(engine)
+    return engine
+
+
+def _create_async_engine():
+    # Async engine for endpoints that run their DB I/O on the event loop
+    async_engine = create_async_engine(
+        get_async_database_uri(settings.SQLALCHEMY_DATABASE_URI),
+        echo=False,
+    )
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+def get_engine():
+    """SQLAlchemy engine for SQLite, created on first use"""
+    return _lazy("engine", _create_engine)
+
+
+def get_session_factory() -> sessionmaker:
+    """Sessionmaker bound to `get_engine()`"""
+    return _lazy("SessionLocal", lambda: sessionmaker(autocommit=False, autoflush=False, bind=get_engine()))
+
+
+def get_async_engine():
+    """Async engine on the same database, created on first use"""
+    return _lazy("async_engine", _create_async_engine)
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """
+    Async sessionmaker; objects stay usable after commit so handlers
+    can return them without an extra (awaited) refresh
+    """
+    return _lazy("AsyncSessionLocal", lambda: async_sessionmaker(
+        bind=get_async_engine(),
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    ))
+
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "SessionLocal": get_session_factory,
+    "async_engine": get_async_engine,
+    "AsyncSessionLocal": get_async_session_factory,
+}
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `from app.db.sqlite import engine, SessionLocal` working
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Create base class for SQLAlchemy models
 Base = declarative_base()
@@ -27,23 +113,42 @@ def get_db():
     Dependency for FastAPI endpoints to get a database session
     Usage: `db: Session = Depends(get_db)`
     """
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db():
+    """
+    Async dependency for FastAPI endpoints to get a database session
+    Usage: `db: AsyncSession = Depends(get_async_db)`
+    """
+    async with get_async_session_factory()() as db:
+        yield db
+
 def init_sqlite_db():
     """Initialize SQLite database with all tables"""
     try:
         # Create all tables
         # Import all models here to ensure they're registered with Base
         from app.models.users import User, GoalProgress, ProblemHistory, UserSettings
+        from app.models.attempts import AttemptRollup
+        from app.models.recommendations import UserRecommendations
+        from app.models.goal_stats import GoalStats
+        from app.models.usage import TokenUsage
+        from app.db.attempt_log import init_attempt_log
         
         # Create tables
+        engine = get_engine()
+        SessionLocal = get_session_factory()
         Base.metadata.create_all(bind=engine)
         logger.info("SQLite tables created")
         
+        # Create the partitioned attempt log parent (no-op on SQLite)
+        with SessionLocal() as session:
+            init_attempt_log(session)
+        
         # Check connection
         with SessionLocal() as session:
             result = session.execute(text("SELECT 1")).fetchone()
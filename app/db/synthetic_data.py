@@ -0,0 +1,285 @@
+"""
+Seeded, reproducible synthetic data for load testing and benchmarks.
+
+Unlike sample_data.py (a handful of hand-written rows), this module generates
+arbitrary volumes: N users with settings, goal progress and problem history in the
+SQL database, and M problems with solution steps linked to curriculum goals in Neo4j.
+Everything is written in bulk:
+  - SQL: multi-row `insert().values` batches, or `COPY ... FROM STDIN` on PostgreSQL
+  - Neo4j: `UNWIND` batches creating problems, steps and goal links in one statement
+Password hashing is done once and shared by every synthetic user.
+
+The same seed always produces the same rows (given an empty database and a
+pinned `now`, which anchors every generated timestamp).
+"""
+import csv
+import io
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from loguru import logger
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.db import queries
+from app.db.attempt_log import ATTEMPT_LOG_TABLE, attempt_log_table, ensure_partition, partition_name
+from app.db.goal_stats import rebuild_goal_stats
+from app.models.users import GoalProgress, ProblemHistory, User, UserSettings
+from app.services.recommendation_index import goal_problem_index
+
+SYNTHETIC_PASSWORD = "password123"
+DEFAULT_GOAL_IDS = [f"G{i}" for i in range(1, 13)]
+
+# Problem text templates per subject area; placeholders are filled from the seeded RNG
+PROBLEM_TEMPLATES = {
+    "Algebra": [
+        "Solve the equation: {a}x + {b} = {c}",
+        "Simplify the expression: {a}({b}x - {c}) + {d}x",
+        "Factor the expression: x² + {a}x + {b}",
+    ],
+    "Geometry": [
+        "Calculate the area of a rectangle with sides {a} cm and {b} cm",
+        "Calculate the area of a circle with radius {a} cm",
+        "Find the perimeter of a triangle with sides {a} cm, {b} cm and {c} cm",
+    ],
+    "Arithmetic": [
+        "Calculate: {a} × {b} - {c}",
+        "Compare the numbers -{a}/{b} and -{c}/{d}",
+        "Calculate {a}% of {c}",
+    ],
+}
+
+
+def _batches(rows: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_rows(db: Session, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """Stream rows into PostgreSQL through COPY FROM STDIN (CSV)"""
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[column] is None else row[column] for column in columns])
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def bulk_insert(db: Session, table: Table, rows: Iterable[Dict[str, Any]], batch_size: int = 5000) -> int:
+    """
+    Insert rows in batches: COPY on PostgreSQL (psycopg2), multi-row INSERTs elsewhere.
+    Returns the number of rows written. The caller commits.
+    """
+    use_copy = db.get_bind().dialect.driver == "psycopg2"
+    count = 0
+    for batch in _batches(rows, batch_size):
+        if use_copy:
+            _copy_rows(db, table, batch)
+        else:
+            db.execute(insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def _seeded_uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_problems(
+    rng: random.Random,
+    count: int,
+    goal_ids: List[str],
+    min_steps: int = 2,
+    max_steps: int = 4,
+    goals_per_step: int = 2,
+) -> List[Dict[str, Any]]:
+    """Generate problem dicts (with nested steps and goal links) for the Neo4j UNWIND import"""
+    subject_areas = sorted(PROBLEM_TEMPLATES)
+    problems = []
+    for _ in range(count):
+        subject_area = rng.choice(subject_areas)
+        problem_text = rng.choice(PROBLEM_TEMPLATES[subject_area]).format(
+            a=rng.randint(2, 20), b=rng.randint(2, 20), c=rng.randint(2, 60), d=rng.randint(2, 20)
+        )
+        steps = []
+        for step_number in range(1, rng.randint(min_steps, max_steps) + 1):
+            steps.append({
+                "id": _seeded_uuid(rng),
+                "step_number": step_number,
+                "description": f"Step {step_number}: work towards the answer of '{problem_text}'",
+                "hint": "Think about which operation isolates the unknown.",
+                "solution": f"Intermediate result {rng.randint(1, 100)}",
+                "goal_ids": rng.sample(goal_ids, min(goals_per_step, len(goal_ids))),
+            })
+        problems.append({
+            "id": _seeded_uuid(rng),
+            "text": problem_text,
+            "subject_area": subject_area,
+            "difficulty": rng.randint(1, 5),
+            "user_id": None,
+            "steps": steps,
+        })
+    return problems
+
+
+def store_problems_in_neo4j(neo4j_instance, problems: List[Dict[str, Any]], batch_size: int = 500) -> None:
+    """Create problems, steps and goal links with one UNWIND statement per batch"""
+    for batch in _batches(problems, batch_size):
+        neo4j_instance.run_query(queries.BULK_CREATE_PROBLEMS, {"problems": batch})
+        # Keep the goal -> problems index current
+        for problem in batch:
+            goal_problem_index.add_problem(
+                problem["id"],
+                {goal_id for step in problem["steps"] for goal_id in step["goal_ids"]},
+                problem["difficulty"],
+                problem["subject_area"],
+            )
+
+
+def generate_synthetic_data(
+    db: Session,
+    users: int = 1000,
+    problems: int = 1000,
+    history_per_user: int = 50,
+    goals_per_user: int = 12,
+    goal_ids: Optional[List[str]] = None,
+    min_steps: int = 2,
+    max_steps: int = 4,
+    seed: int = 42,
+    batch_size: int = 5000,
+    neo4j_instance=None,
+    with_attempt_log: bool = True,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Generate and bulk-load a synthetic dataset. When `neo4j_instance` is None the
+    problems are generated (so history can reference them) but not stored in Neo4j.
+    Returns row counts and timings per stage.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    stats: Dict[str, Any] = {"timings": {}}
+
+    if goal_ids is None and neo4j_instance is not None:
+        goal_ids = [record["id"] for record in neo4j_instance.run_query(queries.GOAL_IDS)]
+    goal_ids = sorted(goal_ids or DEFAULT_GOAL_IDS)
+
+    # One bcrypt hash for every synthetic user
+    password_hash = get_password_hash(SYNTHETIC_PASSWORD)
+    first_user_id = (db.scalar(select(func.max(User.id))) or 0) + 1
+    user_ids = list(range(first_user_id, first_user_id + users))
+
+    started = time.perf_counter()
+    problem_rows = generate_problems(rng, problems, goal_ids, min_steps, max_steps)
+    problem_ids = [problem["id"] for problem in problem_rows]
+    if neo4j_instance is not None:
+        store_problems_in_neo4j(neo4j_instance, problem_rows)
+    stats["problems"] = len(problem_rows)
+    stats["solution_steps"] = sum(len(problem["steps"]) for problem in problem_rows)
+    stats["timings"]["problems"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    stats["users"] = bulk_insert(db, User.__table__, (
+        {
+            "id": user_id,
+            "username": f"synthetic{user_id}",
+            "email": f"synthetic{user_id}@example.com",
+            "hashed_password": password_hash,
+            "grade_level": rng.randint(4, 12),
+            "is_active": True,
+            "created_at": now - timedelta(days=rng.randint(30, 365)),
+            "last_login": now - timedelta(hours=rng.randint(1, 24 * 30)),
+        }
+        for user_id in user_ids
+    ), batch_size)
+    bulk_insert(db, UserSettings.__table__, ({"user_id": user_id} for user_id in user_ids), batch_size)
+    if db.get_bind().dialect.name == "postgresql":
+        # Ids were assigned explicitly, move the sequence past them
+        db.execute(text("SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT max(id) FROM users))"))
+    stats["timings"]["users"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+
+    def goal_progress_rows():
+        for user_id in user_ids:
+            for goal_id in rng.sample(goal_ids, min(goals_per_user, len(goal_ids))):
+                mastery_level = round(rng.random(), 2)
+                attempts_count = rng.randint(1, 20)
+                yield {
+                    "user_id": user_id,
+                    "goal_id": goal_id,
+                    "mastery_level": mastery_level,
+                    "attempts_count": attempts_count,
+                    "successful_attempts": round(mastery_level * attempts_count),
+                    "last_practiced": now - timedelta(days=rng.randint(0, 60)),
+                }
+
+    stats["goal_progress"] = bulk_insert(db, GoalProgress.__table__, goal_progress_rows(), batch_size)
+    # Bulk rows bypass the incremental cube updates
+    rebuild_goal_stats(db)
+    stats["timings"]["goal_progress"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    postgres = db.get_bind().dialect.name == "postgresql"
+
+    def history_rows():
+        for user_id in user_ids:
+            for _ in range(history_per_user):
+                completed = rng.random() < 0.6
+                steps_completed = rng.randint(1, max_steps) if completed else rng.randint(0, max_steps - 1)
+                yield {
+                    "user_id": user_id,
+                    "problem_id": rng.choice(problem_ids) if problem_ids else _seeded_uuid(rng),
+                    "attempted_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                    "completed": completed,
+                    "time_spent_seconds": rng.randint(30, 1200),
+                    "steps_completed": steps_completed,
+                    "steps_with_hints": rng.randint(0, steps_completed),
+                }
+
+    # Batch at a time, so memory stays flat however much history is requested
+    stats["problem_history"] = 0
+    if with_attempt_log:
+        stats["attempt_log"] = 0
+    for batch in _batches(history_rows(), batch_size):
+        stats["problem_history"] += bulk_insert(db, ProblemHistory.__table__, batch, batch_size)
+        if not with_attempt_log:
+            continue
+
+        # Mirror into the attempt log, routed to monthly partitions
+        by_partition = defaultdict(list)
+        for row in batch:
+            by_partition[partition_name(row["attempted_at"])].append(row)
+        for name, rows in by_partition.items():
+            ensure_partition(db, rows[0]["attempted_at"])
+            stats["attempt_log"] += bulk_insert(
+                db, attempt_log_table(ATTEMPT_LOG_TABLE if postgres else name), rows, batch_size,
+            )
+    stats["timings"]["problem_history"] = time.perf_counter() - started
+
+    db.commit()
+    logger.info(
+        f"Generated {stats['users']} users, {stats['goal_progress']} goal progress rows, "
+        f"{stats['problem_history']} history rows and {stats['problems']} problems"
+    )
+    return stats
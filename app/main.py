@@ -1,26 +1,77 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from loguru import logger
 
 from app import __version__
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.db.base import init_db, should_create_sample_data
+from app.core.jobs import job_runner
+from app.core.metrics import RequestMetricsMiddleware, registry
+from app.core.profiler import RequestProfilerMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.startup import startup
+from app.db.base import should_create_sample_data, startup_steps
+from app.db import neo4j
+from app.db.queries import query_stats, worker_stats_path
+# Register the background job types
+from app.services import jobs
 # Import API routers
-from app.api import auth
+from app.api import admin, auth, curriculum, problems, progress
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger.info(f"Starting AI Math Tutor API v{__version__}")
 
+# Startup and shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Initializing application...")
+    try:
+        # Initialize databases with sample data if needed
+        create_sample_data = should_create_sample_data()
+        if create_sample_data:
+            logger.info("Sample data creation enabled")
+        
+        critical, deferred = startup_steps(create_sample_data=create_sample_data)
+        await startup.initialize(
+            critical,
+            deferred,
+            retry_delay=settings.STARTUP_RETRY_INITIAL_SECONDS,
+            max_retry_delay=settings.STARTUP_RETRY_MAX_SECONDS,
+        )
+        if startup.ready:
+            logger.info(f"Application ready in {startup.critical_elapsed_ms:.0f} ms; deferred startup continues")
+        else:
+            logger.warning("Serving without critical dependencies; /health/ready reports 503 until they are up")
+        if settings.JOBS_ENABLED:
+            await job_runner.start(settings.JOBS_SQLITE_PATH, settings.JOBS_LEASE_SECONDS)
+    except Exception as e:
+        logger.error(f"Startup failed: {str(e)}")
+        raise
+    
+    yield
+    
+    logger.info("Shutting down application...")
+    await startup.shutdown()
+    await job_runner.stop(settings.JOBS_SHUTDOWN_TIMEOUT_SECONDS)
+    if settings.NEO4J_QUERY_STATS_PATH:
+        stats_path = worker_stats_path(settings.NEO4J_QUERY_STATS_PATH)
+        query_stats.dump(stats_path)
+        logger.info(f"Wrote Neo4j query stats to {stats_path}")
+    neo4j.neo4j_db.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Math Tutor API",
     description="API for AI Math Tutor application connecting problem-solving with curriculum",
     version=__version__,
+    lifespan=lifespan,
+    **({"default_response_class": FastJSONResponse} if settings.FAST_JSON_RESPONSES else {}),
 )
 
 # Add CORS middleware
@@ -32,6 +83,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses (curriculum trees, solutions, history pages)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        cache_size=settings.COMPRESSION_CACHE_SIZE,
+    )
+
+# Sample the process while a request flagged through /api/admin/profile/request runs
+app.add_middleware(RequestProfilerMiddleware)
+
+# Record per-route request metrics; added last so it times the whole stack and sees compressed sizes
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -49,12 +117,32 @@ async def health_check():
         "version": __version__
     }
 
+# Liveness: the process is up and its event loop responds
+@app.get("/health/live")
+async def liveness():
+    return {
+        "status": "alive",
+        "version": __version__,
+        "uptime_seconds": startup.report()["uptime_seconds"],
+    }
+
+# Readiness: critical dependencies are initialized; includes per-dependency state and timing
+@app.get("/health/ready")
+async def readiness():
+    report = startup.report()
+    return JSONResponse(status_code=200 if startup.ready else 503, content={"version": __version__, **report})
+
+# Metrics endpoint (Prometheus text exposition format)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Include API routes
 app.include_router(auth.router, prefix="/api")
-# Will uncomment as we implement these routers
-# app.include_router(curriculum.router, prefix="/api/curriculum", tags=["Curriculum"])
-# app.include_router(problems.router, prefix="/api/problems", tags=["Problems"])
-# app.include_router(progress.router, prefix="/api/progress", tags=["Progress"])
+app.include_router(progress.router, prefix="/api")
+app.include_router(problems.router, prefix="/api")
+app.include_router(curriculum.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 # Exception handlers
 @app.exception_handler(HTTPException)
@@ -62,6 +150,8 @@ async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        # Keep Retry-After, WWW-Authenticate and the like
+        headers=getattr(exc, "headers", None),
     )
 
 @app.exception_handler(Exception)
@@ -72,28 +162,6 @@ async def general_exception_handler(request, exc):
         content={"detail": "Internal server error"},
     )
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Initializing application...")
-    try:
-        # Initialize databases with sample data if needed
-        create_sample_data = should_create_sample_data()
-        if create_sample_data:
-            logger.info("Sample data creation enabled")
-        
-        init_db(create_sample_data=create_sample_data)
-        logger.info("Application startup complete")
-    except Exception as e:
-        logger.error(f"Startup failed: {str(e)}")
-        raise
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Shutting down application...")
-    # Close any open connections here
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host=settings.API_HOST, port=settings.API_PORT)
\ No newline at end of file
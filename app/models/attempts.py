@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer
+
+from app.db.sqlite import Base
+
+
+class AttemptRollup(Base):
+    """Monthly per-user aggregate of attempts rolled up from expired attempt log partitions"""
+
+    __tablename__ = "problem_attempt_rollup"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    attempts_count = Column(Integer, default=0)
+    completed_count = Column(Integer, default=0)
+    time_spent_seconds = Column(Integer, default=0)
+    steps_completed = Column(Integer, default=0)
+    steps_with_hints = Column(Integer, default=0)
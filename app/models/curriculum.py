@@ -1,6 +1,8 @@
 # Models representing Neo4j curriculum nodes
 from typing import List, Dict, Any, Optional
 
+from app.db import queries
+
 
 class Chapter:
     """
@@ -102,18 +104,13 @@ class CurriculumService:
     
     def get_all_chapters(self) -> List[Chapter]:
         """Get all chapters from the curriculum"""
-        records = self.neo4j_db.run_query(
-            "MATCH (c:Chapter) RETURN c.id as id, c.name as name, c.grade_level as grade_level"
-        )
+        records = self.neo4j_db.run_query(queries.ALL_CHAPTERS)
         return [Chapter.from_dict(record) for record in records]
     
     def get_requirements_by_chapter(self, chapter_id: str) -> List[Requirement]:
         """Get all requirements for a specific chapter"""
         records = self.neo4j_db.run_query(
-            """
-            MATCH (c:Chapter {id: $chapter_id})-[:HAS_REQUIREMENT]->(r:Requirement)
-            RETURN r.id as id, r.description as description
-            """,
+            queries.CHAPTER_REQUIREMENTS,
             {"chapter_id": chapter_id}
         )
         return [Requirement.from_dict(record) for record in records]
@@ -121,17 +118,12 @@ class CurriculumService:
     def get_goals_by_requirement(self, requirement_id: str) -> List[Goal]:
         """Get all goals for a specific requirement"""
         records = self.neo4j_db.run_query(
-            """
-            MATCH (r:Requirement {id: $requirement_id})-[:HAS_GOAL]->(g:Goal)
-            RETURN g.id as id, g.description as description
-            """,
+            queries.REQUIREMENT_GOALS,
             {"requirement_id": requirement_id}
         )
         return [Goal.from_dict(record) for record in records]
     
     def get_all_goals(self) -> List[Goal]:
         """Get all goals from the curriculum"""
-        records = self.neo4j_db.run_query(
-            "MATCH (g:Goal) RETURN g.id as id, g.description as description"
-        )
+        records = self.neo4j_db.run_query(queries.ALL_GOALS)
         return [Goal.from_dict(record) for record in records]
\ No newline at end of file
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Float, Integer, String
+
+from app.db.sqlite import Base
+
+
+class GoalStats(Base):
+    """
+    Class-wide aggregate of goal_progress per (goal, grade level), maintained
+    incrementally by the progress write path (see app/db/goal_stats.py).
+    Students without a grade level are counted under grade_level 0.
+    """
+
+    __tablename__ = "goal_stats"
+
+    goal_id = Column(String(100), primary_key=True)
+    grade_level = Column(Integer, primary_key=True)
+    students = Column(Integer, nullable=False, default=0)
+    attempts_count = Column(Integer, nullable=False, default=0)
+    successful_attempts = Column(Integer, nullable=False, default=0)
+    mastery_sum = Column(Float, nullable=False, default=0.0)
+    # Students per mastery bucket: [0, 0.2), [0.2, 0.4), [0.4, 0.6), [0.6, 0.8), [0.8, 1.0]
+    mastery_bucket_0 = Column(Integer, nullable=False, default=0)
+    mastery_bucket_1 = Column(Integer, nullable=False, default=0)
+    mastery_bucket_2 = Column(Integer, nullable=False, default=0)
+    mastery_bucket_3 = Column(Integer, nullable=False, default=0)
+    mastery_bucket_4 = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,14 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer
+
+from app.db.sqlite import Base
+
+
+class UserRecommendations(Base):
+    """Precomputed top-K problem recommendations for a user, refreshed by the nightly batch job"""
+
+    __tablename__ = "user_recommendations"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # [{"problem_id", "score", "difficulty", "subject_area", "goal_ids"}, ...], best first
+    recommendations = Column(JSON, nullable=False, default=list)
+    generated_at = Column(DateTime, nullable=False, index=True)
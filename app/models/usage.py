@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer
+
+from app.db.sqlite import Base
+
+
+class TokenUsage(Base):
+    """Daily (UTC) per-user count of LLM requests and tokens, checked against DAILY_TOKEN_BUDGET"""
+
+    __tablename__ = "token_usage"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    requests = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
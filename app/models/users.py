@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.sql import func
 
 from app.db.sqlite import Base
@@ -33,8 +33,10 @@ class GoalProgress(Base):
     last_practiced = Column(DateTime, nullable=True)
     
     # Unique constraint for user_id and goal_id
+    # Composite index covers "this user's weakest goals" (migration 0001)
     __table_args__ = (
         UniqueConstraint('user_id', 'goal_id', name='uq_user_goal'),
+        Index('ix_goal_progress_user_mastery', 'user_id', 'mastery_level', 'goal_id'),
     )
 
 
@@ -51,6 +53,11 @@ class ProblemHistory(Base):
     time_spent_seconds = Column(Integer, nullable=True)
     steps_completed = Column(Integer, default=0)
     steps_with_hints = Column(Integer, default=0)
+    
+    # Serves "last N attempts" and keyset pagination over (attempted_at, id) (migration 0001)
+    __table_args__ = (
+        Index('ix_problem_history_user_attempted', 'user_id', 'attempted_at', 'id'),
+    )
 
 
 class UserSettings(Base):
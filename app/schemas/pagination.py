@@ -0,0 +1,11 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Schema for one page of a cursor-paginated listing"""
+    items: List[T] = []
+    next_cursor: Optional[str] = None
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional, Any, Dict
 
 from pydantic import BaseModel, Field
@@ -102,4 +102,14 @@ class ProblemRecommendation(BaseModel):
     subject_area: str
     difficulty: int
     related_goals: List[GoalBase]
-    recommendation_reason: str
\ No newline at end of file
+    recommendation_reason: str
+
+
+class TokenUsageSummary(BaseModel):
+    """Schema for a user's LLM usage on one UTC day"""
+    day: date
+    requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    daily_budget: Optional[int] = None  # None when usage is not limited
+    remaining: Optional[int] = None
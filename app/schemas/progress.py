@@ -36,6 +36,22 @@ class GoalProgressResponse(GoalProgressBase):
         from_attributes = True
 
 
+class GoalPracticeCreate(BaseModel):
+    """Schema for recording one practice of a goal"""
+    successful: bool
+
+
+class ClassGoalStats(BaseModel):
+    """Schema for class-wide statistics of one curriculum goal"""
+    goal_id: str
+    students: int
+    attempts_count: int
+    successful_attempts: int
+    average_mastery: float
+    # Students per mastery bucket: [0, 0.2), [0.2, 0.4), [0.4, 0.6), [0.6, 0.8), [0.8, 1.0]
+    mastery_histogram: List[int]
+
+
 class StepProgressUpdate(BaseModel):
     """Schema for updating step progress"""
     solved_with_hint: bool
@@ -51,6 +67,14 @@ class UserProgressSummary(BaseModel):
     recent_activity: List[dict]
 
 
+class KnowledgeGapResponse(BaseModel):
+    """Schema for a root-cause knowledge gap"""
+    goal_id: str
+    goal_description: Optional[str] = None
+    mastery_level: Optional[float] = None  # None when the goal was never practiced
+    pressure: float
+
+
 class GoalProgressWithDetails(GoalProgressBase):
     """Schema for goal progress with additional details"""
     id: int
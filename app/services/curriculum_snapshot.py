@@ -0,0 +1,154 @@
+"""
+In-memory snapshot of the curriculum tree for the read-only curriculum endpoints.
+
+The whole Chapter -> Requirement -> Goal tree is loaded with one query and every
+response body the curriculum router serves is serialized once, up front. The
+snapshot `version` is a hash of the tree, so it only changes when the curriculum
+does; the router uses it as a strong ETag and answers matching `If-None-Match`
+requests with 304 before touching any body.
+
+The serialized tree is kept in the shared cache (`app.core.cache`) for
+CURRICULUM_SNAPSHOT_TTL_SECONDS, so only one worker per TTL queries Neo4j and
+the others rebuild their snapshot from the cached tree. A reload that finds the
+same tree keeps the version, so clients keep their cache. If a reload fails the
+previous snapshot keeps being served until the next TTL. `invalidate` drops the
+cached tree in every worker.
+"""
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.cache import get_shared_cache
+from app.core.config import settings
+from app.db import queries
+from app.schemas.curriculum import (
+    ChapterBase,
+    ChapterDetail,
+    CurriculumStructure,
+    GoalBase,
+    RequirementWithGoals,
+)
+
+
+def build_structure(records) -> CurriculumStructure:
+    """Group flat chapter/requirement/goal rows (ordered by chapter, requirement, goal) into the tree"""
+    chapters: Dict[str, ChapterDetail] = {}
+    requirements: Dict[tuple, RequirementWithGoals] = {}
+    for record in records:
+        chapter = chapters.get(record["chapter_id"])
+        if chapter is None:
+            chapter = chapters[record["chapter_id"]] = ChapterDetail(
+                id=record["chapter_id"], name=record["chapter_name"], grade_level=record["grade_level"] or 0,
+            )
+        if record["requirement_id"] is None:
+            continue
+        key = (record["chapter_id"], record["requirement_id"])
+        requirement = requirements.get(key)
+        if requirement is None:
+            requirement = requirements[key] = RequirementWithGoals(
+                id=record["requirement_id"], description=record["requirement_description"] or "",
+            )
+            chapter.requirements.append(requirement)
+        if record["goal_id"] is not None:
+            requirement.goals.append(GoalBase(id=record["goal_id"], description=record["goal_description"] or ""))
+    return CurriculumStructure(chapters=list(chapters.values()))
+
+
+# Shared cache key of the serialized curriculum tree
+CACHE_KEY = "curriculum:structure"
+
+
+class CurriculumSnapshot:
+    """Serialized curriculum responses keyed by resource, with a content version"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # One Neo4j load at a time per process
+        self._load_lock = threading.Lock()
+        self.version: Optional[str] = None
+        self._bodies: Dict[str, bytes] = {}
+        # The cached tree the snapshot was built from, and no reload before _retry_at after a failure
+        self._source: Optional[bytes] = None
+        self._retry_at = 0.0
+
+    def build(self, structure: CurriculumStructure) -> None:
+        """Serialize every resource of `structure`; the version is a hash of the whole tree"""
+        goals: Dict[str, GoalBase] = {}
+        for chapter in structure.chapters:
+            for requirement in chapter.requirements:
+                for goal in requirement.goals:
+                    goals.setdefault(goal.id, goal)
+
+        bodies = {
+            "structure": structure.model_dump_json().encode(),
+            "chapters": _json_list([
+                ChapterBase(id=chapter.id, name=chapter.name, grade_level=chapter.grade_level)
+                for chapter in structure.chapters
+            ]),
+            "goals": _json_list(sorted(goals.values(), key=lambda goal: goal.id)),
+        }
+        for chapter in structure.chapters:
+            bodies[f"chapter:{chapter.id}"] = chapter.model_dump_json().encode()
+        version = hashlib.sha256(bodies["structure"]).hexdigest()[:32]
+
+        with self._lock:
+            if version != self.version:
+                logger.info(f"Curriculum snapshot {version}: {len(structure.chapters)} chapters, {len(goals)} goals")
+            self._bodies = bodies
+            self.version = version
+            self._source = bodies["structure"]
+
+    def load_from_neo4j(self, neo4j_db) -> None:
+        """Build from Neo4j and share the tree with the other workers"""
+        self.build(build_structure(neo4j_db.run_query(queries.CURRICULUM_TREE)))
+        get_shared_cache().set(CACHE_KEY, self._source, settings.CURRICULUM_SNAPSHOT_TTL_SECONDS)
+
+    def _build_from_cache(self) -> bool:
+        """Rebuild if the shared cache holds a tree this snapshot was not built from; False on a miss"""
+        cached = get_shared_cache().get(CACHE_KEY)
+        if cached is None:
+            return False
+        if cached is not self._source and cached != self._source:
+            self.build(CurriculumStructure.model_validate_json(cached))
+        return True
+
+    def ensure_fresh(self, neo4j_db) -> None:
+        """
+        Build from the shared cache when another worker (or this one) cached a tree
+        this snapshot was not built from, and load from Neo4j once it has expired
+        """
+        if self._build_from_cache() or time.monotonic() < self._retry_at:
+            return
+
+        with self._load_lock:
+            # Another thread may have loaded it while this one waited
+            if self._build_from_cache():
+                return
+            try:
+                self.load_from_neo4j(neo4j_db)
+            except Exception as e:
+                if self.version is None:
+                    raise
+                logger.error(f"Curriculum snapshot reload failed, serving {self.version}: {str(e)}")
+                self._retry_at = time.monotonic() + settings.CURRICULUM_SNAPSHOT_TTL_SECONDS
+
+    def invalidate(self) -> None:
+        """Reload on the next request, in every worker"""
+        self._retry_at = 0.0
+        get_shared_cache().delete(CACHE_KEY)
+
+    def get(self, resource: str) -> Tuple[str, Optional[bytes]]:
+        """(strong ETag, serialized body) of a resource, read together so a reload cannot split them"""
+        with self._lock:
+            return f'"{self.version}"', self._bodies.get(resource)
+
+
+def _json_list(models: List) -> bytes:
+    return b"[" + b",".join(model.model_dump_json().encode() for model in models) + b"]"
+
+
+# Shared snapshot instance
+curriculum_snapshot = CurriculumSnapshot()
@@ -0,0 +1,92 @@
+"""
+Background job types of the API, run by `app.core.jobs.job_runner`.
+
+- refresh_recommendations: rescore one user after their progress changed or
+  when a stale list was served. Deduplicated per user.
+- rebuild_goal_stats: recompute the class-wide goal statistics cube, e.g. after
+  grade levels were changed or progress was bulk loaded.
+- precompute_recommendations: the nightly batch over all active users. It
+  runs from a thread because the batch spreads the scoring over its own
+  process pool.
+
+Handlers open their own sessions and import their services on first run.
+"""
+from datetime import datetime
+from typing import Optional
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.jobs import EmptyPayload, JobQueueFull, JobType, THREAD, job_runner
+
+REFRESH_RECOMMENDATIONS = "refresh_recommendations"
+REBUILD_GOAL_STATS = "rebuild_goal_stats"
+PRECOMPUTE_RECOMMENDATIONS = "precompute_recommendations"
+
+
+class UserJob(BaseModel):
+    """Payload of jobs about one user"""
+    user_id: int
+
+
+class PrecomputeJob(BaseModel):
+    """Payload of the recommendation batch; workers defaults to one per core"""
+    workers: Optional[int] = None
+
+
+def refresh_recommendations(payload: UserJob) -> None:
+    from app.db.sqlite import get_session_factory
+    from app.services.recommendations import refresh_user_recommendations
+
+    with get_session_factory()() as db:
+        refresh_user_recommendations(db, payload.user_id, datetime.utcnow())
+        db.commit()
+
+
+def rebuild_goal_stats(payload: EmptyPayload) -> None:
+    from app.db.goal_stats import rebuild_goal_stats as rebuild
+    from app.db.sqlite import get_session_factory
+
+    with get_session_factory()() as db:
+        rows = rebuild(db)
+        db.commit()
+    logger.info(f"Rebuilt goal_stats: {rows} rows")
+
+
+def precompute_recommendations(payload: PrecomputeJob) -> None:
+    from app.db import neo4j
+    from app.services.recommendation_index import goal_problem_index
+    from app.services.recommendations import precompute_recommendations as precompute
+
+    goal_problem_index.ensure_loaded(neo4j.neo4j_db)
+    precompute(settings.SQLALCHEMY_DATABASE_URI, goal_problem_index, workers=payload.workers)
+
+
+job_runner.register(JobType(
+    REFRESH_RECOMMENDATIONS, refresh_recommendations, UserJob,
+    executor=THREAD, concurrency=2, max_queue=10000,
+    dedupe_key=lambda payload: str(payload.user_id),
+))
+job_runner.register(JobType(
+    REBUILD_GOAL_STATS, rebuild_goal_stats, executor=THREAD, max_queue=10, dedupe_key=lambda payload: "all",
+))
+job_runner.register(JobType(
+    PRECOMPUTE_RECOMMENDATIONS, precompute_recommendations, PrecomputeJob,
+    executor=THREAD, max_queue=10, max_attempts=1, dedupe_key=lambda payload: "all",
+))
+
+
+async def refresh_recommendations_later(user_id: int) -> bool:
+    """
+    Queue a refresh of the user's recommendations. True if one is queued (now or
+    already), False when background jobs are not running or the queue is full.
+    """
+    if not job_runner.running:
+        return False
+    try:
+        await job_runner.submit(REFRESH_RECOMMENDATIONS, UserJob(user_id=user_id))
+    except JobQueueFull as e:
+        logger.warning(str(e))
+        return False
+    return True
@@ -0,0 +1,248 @@
+"""
+Knowledge-gap propagation over the goal prerequisite graph.
+
+Goals are linked by (prerequisite:Goal)-[:PREREQUISITE_OF]->(goal:Goal) in Neo4j.
+PrerequisiteGraph loads those edges once, topologically sorts the goals and
+relabels them so that every prerequisite has a smaller integer id than the goals
+that depend on it. Adjacency is kept in CSR form (offset and target `array`s) in
+both directions.
+
+Finding root-cause gaps for a user is two linear passes:
+  1. Dependents first (reverse topological order): a goal is *suspect* if it is
+     practiced with mastery below the threshold, or never practiced while a
+     goal depending on it is weak. Suspect goals collect gap pressure: their own
+     mastery deficit plus a decayed share of the pressure of suspect dependents.
+  2. A suspect goal none of whose prerequisites is suspect is a root cause.
+Roots are ranked by pressure, so a foundational goal that explains many weak
+goals comes first. Batch evaluation runs the same passes over a goals x users
+matrix, one vectorized step per goal.
+"""
+import threading
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.db import queries
+from app.services.progress_tracking import STRUGGLING_MASTERY_THRESHOLD
+
+# Share of a dependent's gap pressure passed on to its prerequisites
+PRESSURE_DECAY = 0.8
+
+
+@dataclass
+class KnowledgeGap:
+    """A root-cause gap: a weak or unpracticed goal whose prerequisites are all fine"""
+    goal_id: str
+    mastery_level: Optional[float]
+    pressure: float
+
+
+def _csr(lists: List[List[int]]) -> Tuple[array, array]:
+    offsets = array("i", [0])
+    targets = array("i")
+    for items in lists:
+        targets.extend(sorted(items))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+class PrerequisiteGraph:
+    """Topologically sorted goal DAG with integer adjacency arrays"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.goal_ids: List[str] = []
+        self.goal_index: Dict[str, int] = {}
+        self.prerequisite_offsets = array("i", [0])
+        self.prerequisites = array("i")
+        self.dependent_offsets = array("i", [0])
+        self.dependents = array("i")
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self.goal_ids)
+
+    def build(self, goal_ids: Iterable[str], edges: Iterable[Tuple[str, str]]) -> None:
+        """
+        Build from goal ids and (prerequisite_id, goal_id) edges. Goals only seen in
+        edges are added. Raises ValueError if the prerequisites form a cycle.
+        """
+        names = list(dict.fromkeys(goal_ids))
+        position = {goal_id: i for i, goal_id in enumerate(names)}
+        edge_list = []
+        for prerequisite_id, goal_id in edges:
+            for name in (prerequisite_id, goal_id):
+                if name not in position:
+                    position[name] = len(names)
+                    names.append(name)
+            edge_list.append((position[prerequisite_id], position[goal_id]))
+
+        # Kahn's algorithm; ties keep input order so the layout is deterministic
+        dependents: List[List[int]] = [[] for _ in names]
+        waiting = [0] * len(names)
+        for prerequisite, goal in set(edge_list):
+            dependents[prerequisite].append(goal)
+            waiting[goal] += 1
+        ready = deque(i for i in range(len(names)) if waiting[i] == 0)
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for goal in sorted(dependents[node]):
+                waiting[goal] -= 1
+                if waiting[goal] == 0:
+                    ready.append(goal)
+        if len(order) != len(names):
+            cyclic = sorted(names[i] for i in range(len(names)) if waiting[i] > 0)
+            raise ValueError(f"Prerequisite cycle among goals: {', '.join(cyclic[:10])}")
+
+        # Relabel so ids follow topological order
+        rank = [0] * len(names)
+        for new_id, node in enumerate(order):
+            rank[node] = new_id
+        prerequisite_lists: List[List[int]] = [[] for _ in names]
+        dependent_lists: List[List[int]] = [[] for _ in names]
+        for prerequisite, goal in set(edge_list):
+            prerequisite_lists[rank[goal]].append(rank[prerequisite])
+            dependent_lists[rank[prerequisite]].append(rank[goal])
+        prerequisite_offsets, prerequisites = _csr(prerequisite_lists)
+        dependent_offsets, dependents_array = _csr(dependent_lists)
+
+        with self._lock:
+            self.goal_ids = [names[node] for node in order]
+            self.goal_index = {goal_id: i for i, goal_id in enumerate(self.goal_ids)}
+            self.prerequisite_offsets, self.prerequisites = prerequisite_offsets, prerequisites
+            self.dependent_offsets, self.dependents = dependent_offsets, dependents_array
+            self.loaded = True
+        logger.info(f"Built prerequisite graph: {len(self.goal_ids)} goals, {len(self.prerequisites)} edges")
+
+    def load_from_neo4j(self, neo4j_db) -> None:
+        goal_ids = [record["id"] for record in neo4j_db.run_query(queries.GOAL_IDS)]
+        edges = [
+            (record["prerequisite_id"], record["goal_id"])
+            for record in neo4j_db.run_query(queries.PREREQUISITES)
+        ]
+        self.build(goal_ids, edges)
+
+    def ensure_loaded(self, neo4j_db) -> None:
+        """Load from Neo4j on first use"""
+        if not self.loaded:
+            self.load_from_neo4j(neo4j_db)
+
+    def prerequisites_of(self, goal_id: str) -> List[str]:
+        node = self.goal_index[goal_id]
+        start, end = self.prerequisite_offsets[node], self.prerequisite_offsets[node + 1]
+        return [self.goal_ids[i] for i in self.prerequisites[start:end]]
+
+    def root_gaps(
+        self,
+        mastery: Dict[str, float],
+        threshold: float = STRUGGLING_MASTERY_THRESHOLD,
+        limit: Optional[int] = 5,
+    ) -> List[KnowledgeGap]:
+        """Root-cause gaps for one user's {goal_id: mastery_level}, in O(goals + edges)"""
+        size = len(self.goal_ids)
+        levels: List[Optional[float]] = [None] * size
+        for goal_id, mastery_level in mastery.items():
+            node = self.goal_index.get(goal_id)
+            if node is not None:
+                levels[node] = mastery_level or 0.0
+
+        prerequisite_offsets, dependent_offsets = self.prerequisite_offsets, self.dependent_offsets
+        prerequisites, dependents = self.prerequisites, self.dependents
+        weak = [level is not None and level < threshold for level in levels]
+        suspect = [False] * size
+        pressure = [0.0] * size
+        for node in range(size - 1, -1, -1):
+            inflow = 0.0
+            weak_dependent = False
+            for dependent in dependents[dependent_offsets[node]:dependent_offsets[node + 1]]:
+                if suspect[dependent]:
+                    inflow += pressure[dependent] / (prerequisite_offsets[dependent + 1] - prerequisite_offsets[dependent])
+                    weak_dependent = weak_dependent or weak[dependent]
+            if weak[node] or (levels[node] is None and weak_dependent):
+                suspect[node] = True
+                deficit = threshold - levels[node] if weak[node] else 0.0
+                pressure[node] = deficit + PRESSURE_DECAY * inflow
+
+        gaps = [
+            KnowledgeGap(self.goal_ids[node], levels[node], pressure[node])
+            for node in range(size)
+            if suspect[node] and not any(
+                suspect[prerequisite]
+                for prerequisite in prerequisites[prerequisite_offsets[node]:prerequisite_offsets[node + 1]]
+            )
+        ]
+        gaps.sort(key=lambda gap: -gap.pressure)
+        return gaps[:limit] if limit is not None else gaps
+
+    def root_gaps_batch(
+        self,
+        masteries: Sequence[Dict[str, float]],
+        threshold: float = STRUGGLING_MASTERY_THRESHOLD,
+        limit: Optional[int] = 5,
+    ) -> List[List[KnowledgeGap]]:
+        """
+        `root_gaps` for many users at once over a goals x users matrix. Each goal costs a
+        few numpy calls whatever the batch size, so this pays off from a few hundred users.
+        """
+        size, users = len(self.goal_ids), len(masteries)
+        levels = np.full((size, users), np.nan)
+        for column, mastery in enumerate(masteries):
+            for goal_id, mastery_level in mastery.items():
+                node = self.goal_index.get(goal_id)
+                if node is not None:
+                    levels[node, column] = mastery_level or 0.0
+
+        prerequisite_offsets = np.frombuffer(self.prerequisite_offsets, dtype=np.int32)
+        dependent_offsets = np.frombuffer(self.dependent_offsets, dtype=np.int32)
+        prerequisites = np.frombuffer(self.prerequisites, dtype=np.int32)
+        dependents = np.frombuffer(self.dependents, dtype=np.int32)
+        prerequisite_counts = np.diff(prerequisite_offsets).astype(np.float64)
+
+        known = ~np.isnan(levels)
+        weak = known & (np.nan_to_num(levels, nan=1.0) < threshold)
+        deficit = np.where(weak, threshold - np.nan_to_num(levels, nan=0.0), 0.0)
+        suspect = np.zeros((size, users), dtype=bool)
+        pressure = np.zeros((size, users))
+        for node in range(size - 1, -1, -1):
+            start, end = dependent_offsets[node], dependent_offsets[node + 1]
+            if start == end:
+                suspect[node] = weak[node]
+                pressure[node] = deficit[node]
+                continue
+            nodes = dependents[start:end]
+            # Pressure is zero outside suspect goals, so every dependent can contribute
+            shares = pressure[nodes] / prerequisite_counts[nodes, np.newaxis]
+            weak_dependent = weak[nodes].any(axis=0)
+            suspect[node] = weak[node] | (~known[node] & weak_dependent)
+            pressure[node] = np.where(suspect[node], deficit[node] + PRESSURE_DECAY * shares.sum(axis=0), 0.0)
+
+        roots = suspect.copy()
+        for node in np.flatnonzero(np.diff(prerequisite_offsets)):
+            roots[node] &= ~suspect[prerequisites[prerequisite_offsets[node]:prerequisite_offsets[node + 1]]].any(axis=0)
+
+        results = []
+        for column in range(users):
+            nodes = np.flatnonzero(roots[:, column])
+            # Stable sort keeps topological order among equal pressures, as in root_gaps
+            nodes = nodes[np.argsort(-pressure[nodes, column], kind="stable")]
+            if limit is not None:
+                nodes = nodes[:limit]
+            results.append([
+                KnowledgeGap(
+                    self.goal_ids[node],
+                    None if np.isnan(levels[node, column]) else float(levels[node, column]),
+                    float(pressure[node, column]),
+                )
+                for node in nodes
+            ])
+        return results
+
+
+# Shared graph instance
+prerequisite_graph = PrerequisiteGraph()
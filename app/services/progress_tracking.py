@@ -0,0 +1,326 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import neo4j, queries
+from app.db.attempt_log import append_attempt
+from app.db.goal_stats import BUCKET_COLUMNS, ProgressState, apply_progress_change, goal_stats_query
+from app.models.users import GoalProgress, ProblemHistory, User
+
+# Mastery thresholds used to classify goals in the progress summary
+STRUGGLING_MASTERY_THRESHOLD = 0.4
+STRONG_MASTERY_THRESHOLD = 0.8
+
+
+# Query builders for the hot per-user reads. They are kept separate from the
+# async functions below so tests/test_db/test_query_plans.py can EXPLAIN them.
+
+def goal_progress_page_query(user_id: int, limit: int, after: Optional[Tuple[str, int]] = None) -> Select:
+    """One page of a user's goal progress ordered by (goal_id, id), fetching one extra row"""
+    query = select(GoalProgress).where(GoalProgress.user_id == user_id)
+    if after is not None:
+        goal_id, row_id = after
+        query = query.where(
+            GoalProgress.goal_id >= goal_id,
+            or_(GoalProgress.goal_id > goal_id, GoalProgress.id > row_id),
+        )
+    return query.order_by(GoalProgress.goal_id, GoalProgress.id).limit(limit + 1)
+
+
+def problem_history_page_query(user_id: int, limit: int, before: Optional[Tuple[datetime, int]] = None) -> Select:
+    """One page of a user's problem history, newest first, fetching one extra row"""
+    query = select(ProblemHistory).where(ProblemHistory.user_id == user_id)
+    if before is not None:
+        attempted_at, row_id = before
+        # The redundant `<=` bound keeps the predicate sargable for the index range scan
+        query = query.where(
+            ProblemHistory.attempted_at <= attempted_at,
+            or_(
+                ProblemHistory.attempted_at < attempted_at,
+                and_(ProblemHistory.attempted_at == attempted_at, ProblemHistory.id < row_id),
+            ),
+        )
+    return query.order_by(ProblemHistory.attempted_at.desc(), ProblemHistory.id.desc()).limit(limit + 1)
+
+
+def recent_problem_history_query(user_id: int, limit: int) -> Select:
+    """A user's last `limit` attempts"""
+    return (
+        select(ProblemHistory)
+        .where(ProblemHistory.user_id == user_id)
+        .order_by(ProblemHistory.attempted_at.desc(), ProblemHistory.id.desc())
+        .limit(limit)
+    )
+
+
+def weakest_goals_query(user_id: int, limit: int) -> Select:
+    """A user's `limit` lowest-mastery goals"""
+    return (
+        select(GoalProgress.goal_id, GoalProgress.mastery_level)
+        .where(GoalProgress.user_id == user_id)
+        .order_by(GoalProgress.mastery_level, GoalProgress.goal_id)
+        .limit(limit)
+    )
+
+
+def struggling_goals_query(user_id: int) -> Select:
+    """Goal ids below the struggling threshold, weakest first"""
+    return (
+        select(GoalProgress.goal_id)
+        .where(
+            GoalProgress.user_id == user_id,
+            GoalProgress.mastery_level < STRUGGLING_MASTERY_THRESHOLD,
+        )
+        .order_by(GoalProgress.mastery_level)
+    )
+
+
+def strongest_goals_query(user_id: int) -> Select:
+    """Goal ids at or above the strong threshold, strongest first"""
+    return (
+        select(GoalProgress.goal_id)
+        .where(
+            GoalProgress.user_id == user_id,
+            GoalProgress.mastery_level >= STRONG_MASTERY_THRESHOLD,
+        )
+        .order_by(GoalProgress.mastery_level.desc())
+    )
+
+
+def average_mastery_query(user_id: int) -> Select:
+    """Average mastery over a user's goals"""
+    return select(func.avg(GoalProgress.mastery_level)).where(GoalProgress.user_id == user_id)
+
+
+def history_totals_query(user_id: int) -> Select:
+    """Attempted and completed counts over a user's problem history"""
+    return select(
+        func.count(ProblemHistory.id),
+        func.count(ProblemHistory.id).filter(ProblemHistory.completed.is_(True)),
+    ).where(ProblemHistory.user_id == user_id)
+
+
+async def get_goal_progress(db: AsyncSession, user_id: int) -> List[GoalProgress]:
+    """Get all goal progress entries for a user"""
+    result = await db.scalars(
+        select(GoalProgress)
+        .where(GoalProgress.user_id == user_id)
+        .order_by(GoalProgress.goal_id)
+    )
+    return list(result)
+
+
+async def get_goal_progress_page(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    after: Optional[Tuple[str, int]] = None,
+) -> Tuple[List[GoalProgress], Optional[Tuple[str, int]]]:
+    """
+    Get one page of a user's goal progress ordered by (goal_id, id).
+    `after` is the sort key of the last row of the previous page; the returned key
+    is None once the listing is exhausted.
+    """
+    rows = list(await db.scalars(goal_progress_page_query(user_id, limit, after)))
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1].goal_id, rows[-1].id)
+
+
+async def get_problem_history_page(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    before: Optional[Tuple[datetime, int]] = None,
+) -> Tuple[List[ProblemHistory], Optional[Tuple[datetime, int]]]:
+    """
+    Get one page of a user's problem history, newest first, ordered by (attempted_at, id).
+    Keyset pagination: attempts inserted while a client is paging sort before its
+    cursor, so they never shift or duplicate rows on later pages.
+    """
+    rows = list(await db.scalars(problem_history_page_query(user_id, limit, before)))
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1].attempted_at, rows[-1].id)
+
+
+async def get_weakest_goals(db: AsyncSession, user_id: int, limit: int = 10) -> List[Tuple[str, float]]:
+    """Get (goal_id, mastery_level) for a user's lowest-mastery goals"""
+    result = await db.execute(weakest_goals_query(user_id, limit))
+    return [(row.goal_id, row.mastery_level) for row in result]
+
+
+def get_problem_details(problem_ids: List[str], user_id: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Get text and subject area for a set of problems from Neo4j in one query.
+    Problems missing from the graph (or an unreachable graph) are left out.
+    With `user_id`, the read waits for that user's own earlier Neo4j writes.
+    """
+    if not problem_ids:
+        return {}
+    try:
+        records = neo4j.neo4j_db.run_query(
+            queries.PROBLEM_DETAILS,
+            {"problem_ids": list(set(problem_ids))},
+            bookmark_key=user_id,
+        )
+    except Exception as e:
+        logger.error(f"Failed to load problem details from Neo4j: {str(e)}")
+        return {}
+    return {record["id"]: {"text": record["text"], "subject_area": record["subject_area"]} for record in records}
+
+
+async def get_recent_problem_history(db: AsyncSession, user_id: int, limit: int = 10) -> List[ProblemHistory]:
+    """Get the most recent problem attempts for a user"""
+    result = await db.scalars(recent_problem_history_query(user_id, limit))
+    return list(result)
+
+
+async def get_progress_summary(db: AsyncSession, user_id: int, recent_limit: int = 5) -> Dict[str, Any]:
+    """
+    Build the data for a user's progress summary.
+    Aggregates are computed in the database so only one row per query comes back.
+    """
+    history_totals = (await db.execute(history_totals_query(user_id))).one()
+    average_mastery = await db.scalar(average_mastery_query(user_id))
+    struggling = await db.scalars(struggling_goals_query(user_id))
+    strongest = await db.scalars(strongest_goals_query(user_id))
+    recent = await get_recent_problem_history(db, user_id, limit=recent_limit)
+
+    return {
+        "total_problems_attempted": history_totals[0],
+        "problems_completed": history_totals[1],
+        "average_mastery": round(average_mastery or 0.0, 2),
+        "struggling_areas": list(struggling),
+        "strongest_areas": list(strongest),
+        "recent_activity": [
+            {
+                "problem_id": entry.problem_id,
+                "attempted_at": entry.attempted_at,
+                "completed": entry.completed,
+            }
+            for entry in recent
+        ],
+    }
+
+
+async def record_problem_attempt(
+    db: AsyncSession,
+    user_id: int,
+    problem_id: str,
+    completed: bool = False,
+    time_spent_seconds: Optional[int] = None,
+    steps_completed: int = 0,
+    steps_with_hints: int = 0,
+) -> ProblemHistory:
+    """
+    Record a problem attempt in the user's history and the append-only attempt log.
+    Both writes commit together.
+    """
+    attempted_at = datetime.utcnow()
+    entry = ProblemHistory(
+        user_id=user_id,
+        problem_id=problem_id,
+        attempted_at=attempted_at,
+        completed=completed,
+        time_spent_seconds=time_spent_seconds,
+        steps_completed=steps_completed,
+        steps_with_hints=steps_with_hints,
+    )
+    db.add(entry)
+    await db.run_sync(
+        append_attempt,
+        user_id=user_id,
+        problem_id=problem_id,
+        attempted_at=attempted_at,
+        completed=completed,
+        time_spent_seconds=time_spent_seconds,
+        steps_completed=steps_completed,
+        steps_with_hints=steps_with_hints,
+    )
+    await db.commit()
+    return entry
+
+
+async def get_class_goal_stats(
+    db: AsyncSession,
+    grade_level: Optional[int] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Class-wide goal statistics from the goal_stats cube, weakest average mastery first"""
+    result = await db.execute(goal_stats_query(grade_level).limit(limit))
+    return [
+        {
+            "goal_id": row.goal_id,
+            "students": row.students,
+            "attempts_count": row.attempts_count,
+            "successful_attempts": row.successful_attempts,
+            "average_mastery": round(row.mastery_sum / row.students, 4),
+            "mastery_histogram": [getattr(row, column) for column in BUCKET_COLUMNS],
+        }
+        for row in result
+    ]
+
+
+def _locked_goal_progress(db: Session, user_id: int, goal_id: str) -> Optional[GoalProgress]:
+    return db.scalar(
+        select(GoalProgress)
+        .where(GoalProgress.user_id == user_id, GoalProgress.goal_id == goal_id)
+        .with_for_update()
+    )
+
+
+def _progress_state(progress: GoalProgress) -> ProgressState:
+    return progress.attempts_count, progress.successful_attempts, progress.mastery_level
+
+
+def update_goal_progress(
+    db: Session,
+    user_id: int,
+    goal_id: str,
+    successful: bool,
+    practiced_at: Optional[datetime] = None,
+) -> GoalProgress:
+    """
+    Count one practice of a goal: bump attempts (and successes), set mastery to the
+    success rate and apply the change to the goal_stats cube. The caller commits.
+    """
+    before = None
+    progress = _locked_goal_progress(db, user_id, goal_id)
+    if progress is None:
+        try:
+            with db.begin_nested():
+                progress = GoalProgress(user_id=user_id, goal_id=goal_id, attempts_count=0, successful_attempts=0)
+                db.add(progress)
+        except IntegrityError:
+            # A concurrent first practice of the same goal inserted the row; count this one on top of it
+            progress = _locked_goal_progress(db, user_id, goal_id)
+            before = _progress_state(progress)
+    else:
+        before = _progress_state(progress)
+
+    progress.attempts_count = (progress.attempts_count or 0) + 1
+    progress.successful_attempts = (progress.successful_attempts or 0) + int(successful)
+    progress.mastery_level = round(progress.successful_attempts / progress.attempts_count, 4)
+    progress.last_practiced = practiced_at or datetime.utcnow()
+
+    grade_level = db.scalar(select(User.grade_level).where(User.id == user_id))
+    apply_progress_change(db, goal_id, grade_level, before, _progress_state(progress))
+    db.flush()
+    return progress
+
+
+async def record_goal_practice(db: AsyncSession, user_id: int, goal_id: str, successful: bool) -> GoalProgress:
+    """Record a practice of a goal; the progress row and the goal_stats cube commit together"""
+    progress = await db.run_sync(update_goal_progress, user_id, goal_id, successful)
+    await db.commit()
+    return progress
@@ -0,0 +1,242 @@
+"""
+Precomputed inverted index from curriculum goal to the problems that exercise it.
+
+On the graph, "problems relevant to goal G" is the traversal
+(:Goal)<-[:RELATED_TO_GOAL]-(:SolutionStep)<-[:HAS_STEP]-(:Problem), run per request.
+This index flattens it once: problem ids are interned to dense integer keys and
+each goal keeps a posting list, a sorted `array` of keys with parallel arrays of
+difficulty and subject area code. Candidate generation for a user then only counts
+keys across the posting lists of their weakest goals.
+
+The index is loaded from Neo4j on first use and kept current by `add_problem`,
+which the code paths that store problems call after writing them.
+"""
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from app.db import queries
+
+# Problem difficulty levels; stored difficulties outside them are clamped
+MIN_DIFFICULTY, MAX_DIFFICULTY = 1, 5
+
+
+def clamp_difficulty(difficulty) -> int:
+    """Difficulty as an int in MIN_DIFFICULTY..MAX_DIFFICULTY; missing counts as the easiest"""
+    if difficulty is None:
+        return MIN_DIFFICULTY
+    return min(MAX_DIFFICULTY, max(MIN_DIFFICULTY, int(difficulty)))
+
+
+class GoalPostings:
+    """Sorted problem keys for one goal, with difficulty and subject code in parallel arrays"""
+
+    __slots__ = ("keys", "difficulties", "subject_codes")
+
+    def __init__(self):
+        self.keys = array("i")
+        self.difficulties = array("b")
+        self.subject_codes = array("H")
+
+    def add(self, key: int, difficulty: int, subject_code: int) -> None:
+        """Insert keeping `keys` sorted; new problems get the largest key, so this is an append"""
+        if not self.keys or key > self.keys[-1]:
+            self.keys.append(key)
+            self.difficulties.append(difficulty)
+            self.subject_codes.append(subject_code)
+            return
+
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            self.difficulties[position] = difficulty
+            self.subject_codes[position] = subject_code
+            return
+        self.keys.insert(position, key)
+        self.difficulties.insert(position, difficulty)
+        self.subject_codes.insert(position, subject_code)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class GoalProblemIndex:
+    """In-memory goal -> problems inverted index used for recommendation candidate generation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._problem_ids: List[str] = []
+        self._problem_keys: Dict[str, int] = {}
+        self._subject_areas: List[str] = []
+        self._subject_codes: Dict[str, int] = {}
+        self._postings: Dict[str, GoalPostings] = {}
+        self.built_at: Optional[datetime] = None
+        # Bumped on every change, so derived structures know when to rebuild
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._problem_ids)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.built_at is not None
+
+    def _subject_code(self, subject_area: Optional[str]) -> int:
+        subject_area = subject_area or ""
+        code = self._subject_codes.get(subject_area)
+        if code is None:
+            code = len(self._subject_areas)
+            self._subject_areas.append(subject_area)
+            self._subject_codes[subject_area] = code
+        return code
+
+    def _add(self, problem_id: str, goal_ids: Iterable[str], difficulty: Optional[int], subject_area: Optional[str]) -> None:
+        key = self._problem_keys.get(problem_id)
+        if key is None:
+            key = len(self._problem_ids)
+            self._problem_ids.append(problem_id)
+            self._problem_keys[problem_id] = key
+        subject_code = self._subject_code(subject_area)
+        for goal_id in set(goal_ids):
+            postings = self._postings.get(goal_id)
+            if postings is None:
+                postings = self._postings[goal_id] = GoalPostings()
+            postings.add(key, clamp_difficulty(difficulty), subject_code)
+
+    def add_problem(
+        self,
+        problem_id: str,
+        goal_ids: Iterable[str],
+        difficulty: Optional[int] = 1,
+        subject_area: Optional[str] = None,
+    ) -> None:
+        """Index a newly stored problem (or new goal links of an existing one)"""
+        with self._lock:
+            self._add(problem_id, goal_ids, difficulty, subject_area)
+            self.version += 1
+
+    def build(self, records: Iterable[Tuple[str, Sequence[str], Optional[int], Optional[str]]]) -> None:
+        """Rebuild the whole index from (problem_id, goal_ids, difficulty, subject_area) records"""
+        fresh = GoalProblemIndex()
+        for problem_id, goal_ids, difficulty, subject_area in records:
+            fresh._add(problem_id, goal_ids, difficulty, subject_area)
+
+        with self._lock:
+            self._problem_ids = fresh._problem_ids
+            self._problem_keys = fresh._problem_keys
+            self._subject_areas = fresh._subject_areas
+            self._subject_codes = fresh._subject_codes
+            self._postings = fresh._postings
+            self.built_at = datetime.utcnow()
+            self.version += 1
+        logger.info(f"Built goal-problem index: {len(self._problem_ids)} problems, {len(self._postings)} goals")
+
+    def load_from_neo4j(self, neo4j_db) -> None:
+        """Rebuild the index with one traversal over the problem graph"""
+        records = neo4j_db.run_query(queries.PROBLEM_GOALS)
+        self.build(
+            (record["problem_id"], record["goal_ids"], record["difficulty"], record["subject_area"])
+            for record in records
+        )
+
+    def ensure_loaded(self, neo4j_db) -> None:
+        """Load from Neo4j on first use"""
+        if not self.is_loaded:
+            self.load_from_neo4j(neo4j_db)
+
+    def records(self) -> List[Tuple[str, List[str], int, str]]:
+        """The index as `build` records, e.g. to rebuild it in another process"""
+        with self._lock:
+            goals: List[List[str]] = [[] for _ in self._problem_ids]
+            details: List[Tuple[int, int]] = [(1, 0)] * len(self._problem_ids)
+            for goal_id, postings in self._postings.items():
+                for key, difficulty, code in zip(postings.keys, postings.difficulties, postings.subject_codes):
+                    goals[key].append(goal_id)
+                    details[key] = (difficulty, code)
+            return [
+                (problem_id, sorted(goals[key]), details[key][0], self._subject_areas[details[key][1]])
+                for key, problem_id in enumerate(self._problem_ids)
+            ]
+
+    def problem_id(self, key: int) -> str:
+        return self._problem_ids[key]
+
+    def problem_key(self, problem_id: str) -> Optional[int]:
+        return self._problem_keys.get(problem_id)
+
+    def goal_ids(self) -> List[str]:
+        return sorted(self._postings)
+
+    def postings(self, goal_id: str) -> Optional[GoalPostings]:
+        return self._postings.get(goal_id)
+
+    def subject_area(self, code: int) -> str:
+        return self._subject_areas[code]
+
+    def subject_code(self, subject_area: str) -> Optional[int]:
+        return self._subject_codes.get(subject_area)
+
+    def _filtered_keys(
+        self,
+        postings: GoalPostings,
+        min_difficulty: int,
+        max_difficulty: int,
+        subject_code: Optional[int],
+    ) -> Iterable[int]:
+        if min_difficulty <= 1 and max_difficulty >= 5 and subject_code is None:
+            return postings.keys
+        return [
+            key
+            for key, difficulty, code in zip(postings.keys, postings.difficulties, postings.subject_codes)
+            if min_difficulty <= difficulty <= max_difficulty and (subject_code is None or code == subject_code)
+        ]
+
+    def candidates(
+        self,
+        goal_ids: Iterable[str],
+        min_difficulty: int = 1,
+        max_difficulty: int = 5,
+        subject_area: Optional[str] = None,
+        exclude: Iterable[str] = (),
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Problems related to any of `goal_ids`, as (problem_id, matched goal count),
+        most matched goals first, ties broken by problem age (oldest first).
+        """
+        with self._lock:
+            subject_code = None
+            if subject_area is not None:
+                subject_code = self._subject_codes.get(subject_area)
+                if subject_code is None:
+                    return []
+
+            streams = []
+            for goal_id in set(goal_ids):
+                postings = self._postings.get(goal_id)
+                if postings is not None:
+                    streams.append(self._filtered_keys(postings, min_difficulty, max_difficulty, subject_code))
+            excluded = {self._problem_keys[pid] for pid in exclude if pid in self._problem_keys}
+
+            # Count goal hits per problem across the posting lists (C-level counting
+            # beats a heap merge; the ranking below restores a deterministic order)
+            hits = Counter(chain.from_iterable(streams))
+            for key in excluded:
+                hits.pop(key, None)
+            matches = [(count, key) for key, count in hits.items()]
+
+            if limit is not None:
+                top = heapq.nsmallest(limit, matches, key=lambda match: (-match[0], match[1]))
+            else:
+                top = sorted(matches, key=lambda match: (-match[0], match[1]))
+            return [(self._problem_ids[key], count) for count, key in top]
+
+
+# Shared index instance
+goal_problem_index = GoalProblemIndex()
@@ -0,0 +1,198 @@
+"""
+Vectorized problem scoring over user mastery vectors.
+
+Each user is a dense "need" vector over the curriculum goal vocabulary
+(1 - mastery_level per goal) and each problem is a sparse goal-incidence row,
+both laid out from the goal -> problem index in recommendation_index.py.
+Scoring a batch of users is then one sparse-dense product
+
+    scores = need (users x goals) @ incidence.T (goals x problems)
+
+minus a penalty for the distance between a problem's difficulty and the user's
+target difficulty, with filtered-out and already-attempted problems masked.
+The nightly precomputation scores users in chunks so memory stays bounded.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.users import GoalProgress, ProblemHistory, UserSettings
+from app.services.recommendation_index import MAX_DIFFICULTY, GoalProblemIndex
+
+# Need assumed for goals a user has not practiced yet (mastery 0.5)
+UNPRACTICED_NEED = 0.5
+# Score lost per difficulty level away from the user's target difficulty
+DIFFICULTY_PENALTY = 0.25
+# Target difficulty for an explicit UserSettings.difficulty_preference; "adaptive" follows mastery
+PREFERENCE_DIFFICULTY = {"easy": 2.0, "medium": 3.0, "hard": 4.0}
+
+
+@dataclass
+class UserProfile:
+    """What the scorer needs to know about one user"""
+    user_id: int
+    mastery: Dict[str, float] = field(default_factory=dict)
+    attempted: Iterable[str] = ()
+    difficulty_preference: str = "adaptive"
+
+    def target_difficulty(self) -> float:
+        """Preferred difficulty, or 1-5 scaled from average mastery when adaptive"""
+        if self.difficulty_preference in PREFERENCE_DIFFICULTY:
+            return PREFERENCE_DIFFICULTY[self.difficulty_preference]
+        if not self.mastery:
+            return 1.0
+        return 1.0 + 4.0 * sum(self.mastery.values()) / len(self.mastery)
+
+
+class ProblemMatrix:
+    """Problems x goals incidence matrix with per-problem difficulty and subject code"""
+
+    def __init__(self, index: GoalProblemIndex):
+        self.index = index
+        self.goal_ids = index.goal_ids()
+        self.goal_columns = {goal_id: column for column, goal_id in enumerate(self.goal_ids)}
+        self.problem_count = len(index)
+
+        rows, columns = [], []
+        self.difficulties = np.ones(self.problem_count, dtype=np.int8)
+        self.subject_codes = np.zeros(self.problem_count, dtype=np.uint16)
+        for column, goal_id in enumerate(self.goal_ids):
+            postings = index.postings(goal_id)
+            keys = np.frombuffer(postings.keys, dtype=np.int32)
+            rows.append(keys)
+            columns.append(np.full(len(keys), column, dtype=np.int32))
+            self.difficulties[keys] = np.frombuffer(postings.difficulties, dtype=np.int8)
+            self.subject_codes[keys] = np.frombuffer(postings.subject_codes, dtype=np.uint16)
+
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+        columns = np.concatenate(columns) if columns else np.empty(0, dtype=np.int32)
+        self.incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+            shape=(self.problem_count, len(self.goal_ids)),
+        )
+        # Problems sharing no goal with the curriculum vocabulary are never candidates
+        self.unlinked = np.diff(self.incidence.indptr) == 0
+
+    def problem_goals(self, key: int) -> List[str]:
+        """Goal ids linked to the problem with index key `key`"""
+        start, end = self.incidence.indptr[key], self.incidence.indptr[key + 1]
+        return [self.goal_ids[column] for column in self.incidence.indices[start:end]]
+
+    def need_matrix(self, profiles: Sequence[UserProfile]) -> np.ndarray:
+        """Dense users x goals matrix of 1 - mastery, UNPRACTICED_NEED where never practiced"""
+        need = np.full((len(profiles), len(self.goal_ids)), UNPRACTICED_NEED, dtype=np.float32)
+        for row, profile in enumerate(profiles):
+            for goal_id, mastery_level in profile.mastery.items():
+                column = self.goal_columns.get(goal_id)
+                if column is not None:
+                    need[row, column] = 1.0 - (mastery_level or 0.0)
+        return need
+
+    def problem_mask(
+        self,
+        min_difficulty: int = 1,
+        max_difficulty: int = 5,
+        subject_area: Optional[str] = None,
+    ) -> np.ndarray:
+        """Boolean mask of problems passing the difficulty/subject filters"""
+        mask = (self.difficulties >= min_difficulty) & (self.difficulties <= max_difficulty)
+        if subject_area is not None:
+            subject_code = self.index.subject_code(subject_area)
+            if subject_code is None:
+                return np.zeros(self.problem_count, dtype=bool)
+            mask &= self.subject_codes == subject_code
+        return mask
+
+    def score(self, profiles: Sequence[UserProfile], mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Users x problems score matrix; excluded problems score -inf"""
+        need = self.need_matrix(profiles)
+        # (problems x goals) @ (goals x users), transposed back to a C-ordered users x problems block
+        scores = np.ascontiguousarray((self.incidence @ need.T).T)
+
+        # The index clamps difficulty to 1-5, so the penalty is a users x levels table gathered per problem
+        targets = np.array([profile.target_difficulty() for profile in profiles], dtype=np.float32)
+        levels = np.arange(MAX_DIFFICULTY + 1, dtype=np.float32)
+        penalties = DIFFICULTY_PENALTY * np.abs(levels[np.newaxis, :] - targets[:, np.newaxis])
+        scores -= penalties[:, self.difficulties]
+
+        excluded = self.unlinked if mask is None else (self.unlinked | ~mask)
+        scores += np.where(excluded, -np.inf, 0.0).astype(np.float32)[np.newaxis, :]
+        for row, profile in enumerate(profiles):
+            keys = [key for key in map(self.index.problem_key, profile.attempted) if key is not None]
+            if keys:
+                scores[row, keys] = -np.inf
+        return scores
+
+    def top_k(self, scores: np.ndarray, limit: int) -> List[List[Tuple[str, float]]]:
+        """Best `limit` (problem_id, score) per row, highest score first, ties by problem key"""
+        limit = min(limit, scores.shape[1])
+        if limit <= 0:
+            return [[] for _ in range(scores.shape[0])]
+
+        best = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        results = []
+        for row, keys in zip(scores, best):
+            keys = keys[np.lexsort((keys, -row[keys]))]
+            results.append([
+                (self.index.problem_id(int(key)), float(row[key]))
+                for key in keys
+                if np.isfinite(row[key])
+            ])
+        return results
+
+
+def score_users(
+    matrix: ProblemMatrix,
+    profiles: Sequence[UserProfile],
+    limit: int = 20,
+    min_difficulty: int = 1,
+    max_difficulty: int = 5,
+    subject_area: Optional[str] = None,
+    chunk_size: int = 16,
+) -> Dict[int, List[Tuple[str, float]]]:
+    """
+    Rank problems for many users at once. Users are scored `chunk_size` at a time,
+    so the dense score block is at most chunk_size x problems float32s.
+    """
+    mask = matrix.problem_mask(min_difficulty, max_difficulty, subject_area)
+    ranked: Dict[int, List[Tuple[str, float]]] = {}
+    for start in range(0, len(profiles), chunk_size):
+        chunk = profiles[start:start + chunk_size]
+        for profile, recommendations in zip(chunk, matrix.top_k(matrix.score(chunk, mask), limit)):
+            ranked[profile.user_id] = recommendations
+    return ranked
+
+
+def load_user_profiles(db: Session, user_ids: Sequence[int]) -> List[UserProfile]:
+    """Load mastery, attempted problems and difficulty preference for users, three queries total"""
+    profiles = {user_id: UserProfile(user_id=user_id, attempted=set()) for user_id in user_ids}
+    if not profiles:
+        return []
+
+    progress = db.execute(
+        select(GoalProgress.user_id, GoalProgress.goal_id, GoalProgress.mastery_level)
+        .where(GoalProgress.user_id.in_(user_ids))
+    )
+    for user_id, goal_id, mastery_level in progress:
+        profiles[user_id].mastery[goal_id] = mastery_level or 0.0
+
+    attempted = db.execute(
+        select(ProblemHistory.user_id, ProblemHistory.problem_id)
+        .where(ProblemHistory.user_id.in_(user_ids))
+        .distinct()
+    )
+    for user_id, problem_id in attempted:
+        profiles[user_id].attempted.add(problem_id)
+
+    preferences = db.execute(
+        select(UserSettings.user_id, UserSettings.difficulty_preference)
+        .where(UserSettings.user_id.in_(user_ids))
+    )
+    for user_id, difficulty_preference in preferences:
+        profiles[user_id].difficulty_preference = difficulty_preference or "adaptive"
+
+    return [profiles[user_id] for user_id in user_ids]
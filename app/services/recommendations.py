@@ -0,0 +1,303 @@
+"""
+Precomputed problem recommendations.
+
+A nightly batch job (scripts/precompute_recommendations.py) splits active users
+into shards and scores them in a ProcessPoolExecutor, one worker per core. Each
+worker rebuilds the goal -> problem index from a snapshot passed at start-up,
+opens its own database connection to load user profiles, and returns the top-K
+list per user; the parent process is the only writer of the
+user_recommendations table.
+
+Serving reads the stored list. When it is missing or older than
+RECOMMENDATION_MAX_AGE_HOURS, the user is scored online with the same scorer
+and the fresh list is stored.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db import neo4j, queries
+from app.models.recommendations import UserRecommendations
+from app.models.users import User
+from app.services import jobs
+from app.services.recommendation_index import GoalProblemIndex, goal_problem_index
+
+if TYPE_CHECKING:
+    # The scorer pulls in numpy and scipy; it is imported where scoring runs
+    from app.services.recommendation_scorer import ProblemMatrix, UserProfile
+
+# Recommendations stored per user; endpoints serve a prefix of this list
+RECOMMENDATION_LIMIT = 20
+
+# Problem matrix for online scoring, rebuilt when the shared index changes
+_online_matrix: Dict[str, Any] = {"version": None, "matrix": None}
+# One rebuild at a time; requests score in the threadpool
+_online_matrix_lock = threading.Lock()
+
+# Per-process state of batch workers, set up by _init_worker
+_worker_matrix: Optional["ProblemMatrix"] = None
+_worker_sessionmaker: Optional[sessionmaker] = None
+
+
+def build_recommendations(
+    matrix: "ProblemMatrix",
+    profiles: Sequence["UserProfile"],
+    limit: int = RECOMMENDATION_LIMIT,
+    **filters: Any,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Score users and shape each top-K list as stored in user_recommendations.
+    `filters` (min_difficulty, max_difficulty, subject_area) are passed to score_users.
+    """
+    from app.services.recommendation_scorer import UNPRACTICED_NEED, score_users
+
+    ranked = score_users(matrix, profiles, limit=limit, **filters)
+    results = {}
+    for profile in profiles:
+        entries = []
+        for problem_id, score in ranked[profile.user_id]:
+            key = matrix.index.problem_key(problem_id)
+            # Goals the user most needs first, so callers can explain the pick
+            goal_ids = sorted(
+                matrix.problem_goals(key),
+                key=lambda goal_id: profile.mastery.get(goal_id, 1.0 - UNPRACTICED_NEED),
+            )
+            entries.append({
+                "problem_id": problem_id,
+                "score": round(score, 4),
+                "difficulty": int(matrix.difficulties[key]),
+                "subject_area": matrix.index.subject_area(int(matrix.subject_codes[key])),
+                "goal_ids": goal_ids,
+            })
+        results[profile.user_id] = entries
+    return results
+
+
+def _upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(UserRecommendations)
+    if dialect == "sqlite":
+        return sqlite.insert(UserRecommendations)
+    raise ValueError(f"user_recommendations upsert is not supported on {dialect}")
+
+
+def save_recommendations(db: Session, results: Dict[int, List[Dict[str, Any]]], generated_at: datetime) -> None:
+    """
+    Replace the stored lists of the given users with one upsert, so concurrent
+    saves for the same user never conflict. The caller commits.
+    """
+    if not results:
+        return
+    statement = _upsert(db)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserRecommendations.user_id],
+            set_={
+                "recommendations": statement.excluded.recommendations,
+                "generated_at": statement.excluded.generated_at,
+            },
+        ),
+        [
+            {"user_id": user_id, "recommendations": entries, "generated_at": generated_at}
+            for user_id, entries in results.items()
+        ],
+    )
+
+
+def _init_worker(database_uri: str, records: List[Tuple[str, List[str], int, str]]) -> None:
+    """Process pool initializer: rebuild the index and open a connection pool once per worker"""
+    from app.services.recommendation_scorer import ProblemMatrix
+
+    global _worker_matrix, _worker_sessionmaker
+    index = GoalProblemIndex()
+    index.build(records)
+    _worker_matrix = ProblemMatrix(index)
+    _worker_sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=create_engine(database_uri))
+
+
+def _score_shard(user_ids: List[int], limit: int) -> Dict[int, List[Dict[str, Any]]]:
+    from app.services.recommendation_scorer import load_user_profiles
+
+    with _worker_sessionmaker() as db:
+        profiles = load_user_profiles(db, user_ids)
+    return build_recommendations(_worker_matrix, profiles, limit)
+
+
+def shard_user_ids(user_ids: Sequence[int], shard_size: int) -> List[List[int]]:
+    return [list(user_ids[start:start + shard_size]) for start in range(0, len(user_ids), shard_size)]
+
+
+def precompute_recommendations(
+    database_uri: str,
+    index: GoalProblemIndex,
+    workers: Optional[int] = None,
+    shard_size: int = 500,
+    limit: int = RECOMMENDATION_LIMIT,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Recompute and store recommendations for every active user.
+    `workers` defaults to one per core; with 1 worker everything runs in-process.
+    Returns user/shard counts and throughput.
+    """
+    workers = workers or os.cpu_count() or 1
+    generated_at = now or datetime.utcnow()
+    engine = create_engine(database_uri)
+    SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with SessionFactory() as db:
+        user_ids = list(db.scalars(select(User.id).where(User.is_active.is_not(False)).order_by(User.id)))
+    shards = shard_user_ids(user_ids, shard_size)
+    records = index.records()
+
+    started = time.perf_counter()
+    with SessionFactory() as db:
+        if workers == 1:
+            _init_worker(database_uri, records)
+            for shard in shards:
+                save_recommendations(db, _score_shard(shard, limit), generated_at)
+                db.commit()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(database_uri, records)) as pool:
+                futures = [pool.submit(_score_shard, shard, limit) for shard in shards]
+                # Workers only read; results are written here as shards finish
+                for future in as_completed(futures):
+                    save_recommendations(db, future.result(), generated_at)
+                    db.commit()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    logger.info(f"Precomputed recommendations for {len(user_ids)} users in {elapsed:.1f}s with {workers} workers")
+    return {
+        "users": len(user_ids),
+        "shards": len(shards),
+        "workers": workers,
+        "seconds": elapsed,
+        "users_per_second": len(user_ids) / elapsed if elapsed else 0.0,
+    }
+
+
+def _current_matrix() -> "ProblemMatrix":
+    from app.services.recommendation_scorer import ProblemMatrix
+
+    with _online_matrix_lock:
+        version = goal_problem_index.version
+        if _online_matrix["version"] != version:
+            _online_matrix.update(version=version, matrix=ProblemMatrix(goal_problem_index))
+        return _online_matrix["matrix"]
+
+
+def _score_online(user_profiles: List["UserProfile"], **filters: Any) -> Dict[int, List[Dict[str, Any]]]:
+    goal_problem_index.ensure_loaded(neo4j.neo4j_db)
+    return build_recommendations(_current_matrix(), user_profiles, **filters)
+
+
+def refresh_user_recommendations(db: Session, user_id: int, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Rescore one user and store the list. The caller commits."""
+    from app.services.recommendation_scorer import load_user_profiles
+
+    results = _score_online(load_user_profiles(db, [user_id]))
+    save_recommendations(db, results, now or datetime.utcnow())
+    return results[user_id]
+
+
+async def get_user_recommendations(
+    db: AsyncSession,
+    user_id: int,
+    max_age: Optional[timedelta] = None,
+    now: Optional[datetime] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[datetime]]:
+    """
+    Get a user's stored recommendations and when they were generated. A stale list
+    is served as is while a background job refreshes it; a missing list (or a stale
+    one when background jobs are not running) is computed online first. If
+    recomputing fails (e.g. Neo4j is unreachable) the stale list is served as is.
+    """
+    now = now or datetime.utcnow()
+    max_age = max_age or timedelta(hours=settings.RECOMMENDATION_MAX_AGE_HOURS)
+    stored = await db.get(UserRecommendations, user_id)
+    if stored is not None and stored.generated_at >= now - max_age:
+        return stored.recommendations, stored.generated_at
+    if stored is not None and await jobs.refresh_recommendations_later(user_id):
+        return stored.recommendations, stored.generated_at
+
+    from app.services.recommendation_scorer import load_user_profiles
+
+    try:
+        profiles = await db.run_sync(load_user_profiles, [user_id])
+        results = await run_in_threadpool(_score_online, profiles)
+    except Exception as e:
+        logger.error(f"Online recommendation scoring failed for user {user_id}: {str(e)}")
+        if stored is None:
+            return [], None
+        return stored.recommendations, stored.generated_at
+
+    await db.run_sync(save_recommendations, results, now)
+    await db.commit()
+    return results[user_id], now
+
+
+async def get_filtered_recommendations(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    min_difficulty: int = 1,
+    max_difficulty: int = 5,
+    subject_area: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Up to `limit` of the user's recommendations within the difficulty range and
+    subject. Filtered from the stored list; when that comes up short although it
+    was cut at RECOMMENDATION_LIMIT, the user is rescored online with the filter
+    (not stored). If rescoring fails the filtered stored list is served.
+    """
+    entries, _ = await get_user_recommendations(db, user_id)
+    matching = [
+        entry for entry in entries
+        if min_difficulty <= entry["difficulty"] <= max_difficulty
+        and (subject_area is None or entry["subject_area"] == subject_area)
+    ]
+    # A stored list shorter than RECOMMENDATION_LIMIT already holds every candidate
+    if len(matching) >= limit or len(entries) < RECOMMENDATION_LIMIT:
+        return matching[:limit]
+
+    from app.services.recommendation_scorer import load_user_profiles
+
+    try:
+        profiles = await db.run_sync(load_user_profiles, [user_id])
+        results = await run_in_threadpool(
+            _score_online, profiles, limit=limit,
+            min_difficulty=min_difficulty, max_difficulty=max_difficulty, subject_area=subject_area,
+        )
+    except Exception as e:
+        logger.error(f"Filtered recommendation scoring failed for user {user_id}: {str(e)}")
+        return matching[:limit]
+    return results[user_id]
+
+
+def get_goal_descriptions(goal_ids: List[str]) -> Dict[str, str]:
+    """Get descriptions for a set of curriculum goals from Neo4j in one query"""
+    if not goal_ids:
+        return {}
+    try:
+        records = neo4j.neo4j_db.run_query(
+            queries.GOAL_DESCRIPTIONS,
+            {"goal_ids": list(set(goal_ids))}
+        )
+    except Exception as e:
+        logger.error(f"Failed to load goal descriptions from Neo4j: {str(e)}")
+        return {}
+    return {record["id"]: record["description"] for record in records}
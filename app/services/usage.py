@@ -0,0 +1,80 @@
+"""
+Per-user daily LLM token ledger.
+
+Every LLM call made for a user is recorded with `record_usage`, an atomic
+upsert of deltas into that user's `token_usage` row for the current UTC day, so
+concurrent requests from several workers add up correctly. Before dispatching
+a call, `remaining_budget` tells how many of the user's DAILY_TOKEN_BUDGET
+tokens are left; the problems router refuses requests with 429 once it is
+spent, until the next UTC midnight.
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.usage import TokenUsage
+
+
+def usage_day(now: Optional[datetime] = None) -> date:
+    """Ledger day of a UTC timestamp"""
+    return (now or datetime.utcnow()).date()
+
+
+def seconds_until_reset(now: Optional[datetime] = None) -> float:
+    """Seconds until the next ledger day starts"""
+    now = now or datetime.utcnow()
+    return (datetime.combine(now.date() + timedelta(days=1), datetime.min.time()) - now).total_seconds()
+
+
+def _upsert(db: AsyncSession):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(TokenUsage)
+    if dialect == "sqlite":
+        return sqlite.insert(TokenUsage)
+    raise ValueError(f"token_usage upsert is not supported on {dialect}")
+
+
+async def record_usage(
+    db: AsyncSession,
+    user_id: int,
+    prompt_tokens: int,
+    completion_tokens: int,
+    now: Optional[datetime] = None,
+) -> None:
+    """Add one LLM request and its tokens to the user's row for today. The caller commits."""
+    statement = _upsert(db).values(
+        user_id=user_id,
+        day=usage_day(now),
+        requests=1,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+    )
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[TokenUsage.user_id, TokenUsage.day],
+        set_={
+            "requests": TokenUsage.requests + 1,
+            "prompt_tokens": TokenUsage.prompt_tokens + prompt_tokens,
+            "completion_tokens": TokenUsage.completion_tokens + completion_tokens,
+        },
+    ))
+
+
+async def get_usage(db: AsyncSession, user_id: int, now: Optional[datetime] = None) -> Optional[TokenUsage]:
+    """The user's ledger row for today, if they made any LLM request"""
+    return await db.scalar(
+        select(TokenUsage).where(TokenUsage.user_id == user_id, TokenUsage.day == usage_day(now))
+    )
+
+
+async def remaining_budget(db: AsyncSession, user_id: int, now: Optional[datetime] = None) -> Optional[int]:
+    """Tokens the user may still spend today; None when DAILY_TOKEN_BUDGET is 0 (unlimited)"""
+    if settings.DAILY_TOKEN_BUDGET <= 0:
+        return None
+    usage = await get_usage(db, user_id, now)
+    used = (usage.prompt_tokens + usage.completion_tokens) if usage is not None else 0
+    return max(0, settings.DAILY_TOKEN_BUDGET - used)
@@ -42,14 +42,32 @@ def api_post(endpoint, data):
         return {"error": str(e)}, 500
 
 def api_get(endpoint, params=None):
-    """Make a GET request to the API with authentication"""
+    """
+    Make a GET request to the API with authentication.
+
+    Responses that carry an ETag are kept in the session; the next request for
+    the same URL sends If-None-Match and reuses the kept body on a 304.
+    """
     try:
+        cache = st.session_state.setdefault("etag_cache", {})
+        cache_key = (endpoint, json.dumps(params, sort_keys=True))
+        headers = get_auth_header()
+        cached = cache.get(cache_key)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+
         response = requests.get(
             f"{get_api_url()}{endpoint}",
             params=params,
-            headers=get_auth_header()
+            headers=headers
         )
-        return response.json(), response.status_code
+        if response.status_code == 304 and cached:
+            return cached["data"], 200
+
+        data = response.json()
+        if response.status_code == 200 and "ETag" in response.headers:
+            cache[cache_key] = {"etag": response.headers["ETag"], "data": data}
+        return data, response.status_code
     except Exception as e:
         st.error(f"API error: {str(e)}")
         return {"error": str(e)}, 500
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Composite indexes for per-user goal progress and problem history queries
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # "This user's weakest goals": seek on user_id, read in mastery order,
+    # goal_id included so the index covers the query
+    op.create_index(
+        "ix_goal_progress_user_mastery",
+        "goal_progress",
+        ["user_id", "mastery_level", "goal_id"],
+        if_not_exists=True,
+    )
+    # "This user's last N attempts" and keyset pages over (attempted_at, id);
+    # read backwards for newest-first order
+    op.create_index(
+        "ix_problem_history_user_attempted",
+        "problem_history",
+        ["user_id", "attempted_at", "id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_problem_history_user_attempted", table_name="problem_history", if_exists=True)
+    op.drop_index("ix_goal_progress_user_mastery", table_name="goal_progress", if_exists=True)
@@ -0,0 +1,44 @@
+"""Class-wide goal statistics cube
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.orm import Session
+
+from app.db.goal_stats import rebuild_goal_stats
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "goal_stats",
+        sa.Column("goal_id", sa.String(100), primary_key=True),
+        sa.Column("grade_level", sa.Integer(), primary_key=True),
+        sa.Column("students", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("attempts_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("successful_attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("mastery_sum", sa.Float(), nullable=False, server_default="0"),
+        *[
+            sa.Column(f"mastery_bucket_{i}", sa.Integer(), nullable=False, server_default="0")
+            for i in range(5)
+        ],
+        if_not_exists=True,
+    )
+    # Backfill from the existing goal progress
+    rebuild_goal_stats(Session(bind=op.get_bind()))
+
+
+def downgrade() -> None:
+    op.drop_table("goal_stats", if_exists=True)
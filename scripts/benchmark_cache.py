@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Measure get/set latency of both tiers of the shared cache.
+
+For each value size, times TieredCache.set (L1 plus a SQLite WAL write), a get
+answered by L1, and a get answered by L2 as seen by a second cache instance on
+the same file with an empty L1 (what another worker pays for a value it did
+not load), then the latency of a delete reaching the other instance's L1.
+
+Usage:
+    python scripts/benchmark_cache.py --calls 5000 --sizes 100 10000 200000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from app.core.cache import TieredCache
+
+
+def per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main(calls: int, sizes, keys: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = str(Path(tmp_dir) / "cache.db")
+        writer = TieredCache(path, max_entries=keys, poll_seconds=1.0)
+        print(f"TieredCache, {calls} calls over {keys} keys, SQLite WAL at {path}")
+        print(f"{'value':<14} {'bytes':>8} {'set us':>8} {'L1 get us':>10} {'L2 get us':>10}")
+        for size in sizes:
+            for name, value in (("bytes", b"x" * size), ("json", {"text": "x" * size, "ids": list(range(10))})):
+                set_us = per_call_us(lambda i: writer.set(f"{name}:{size}:{i % keys}", value, ttl=600), calls)
+                l1_us = per_call_us(lambda i: writer.get(f"{name}:{size}:{i % keys}"), calls)
+                # A fresh L1 per pass so every get falls through to SQLite
+                reader = TieredCache(path, max_entries=1, poll_seconds=1.0)
+                l2_us = per_call_us(lambda i: reader.get(f"{name}:{size}:{i % keys}"), calls)
+                reader.close()
+                print(f"{name:<14} {size:>8} {set_us:>8.1f} {l1_us:>10.2f} {l2_us:>10.1f}")
+            writer.clear()
+
+        # Invalidation: delete in one instance, poll the other's L1 until it drops the key
+        other = TieredCache(path, poll_seconds=0)
+        timings = []
+        for i in range(200):
+            writer.set("shared", i)
+            other.get("shared")
+            start = time.perf_counter()
+            writer.delete("shared")
+            while other.get("shared") is not None:
+                pass
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+        print(f"\ndelete visible to another instance: median {timings[len(timings) // 2]:.0f} us "
+              f"(plus up to poll_seconds when polling is throttled)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 200000])
+    parser.add_argument("--keys", type=int, default=100)
+    args = parser.parse_args()
+    main(args.calls, args.sizes, args.keys)
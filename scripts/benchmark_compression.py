@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Measure the CPU cost of response compression against the bytes it saves.
+
+Builds a curriculum tree and a problem solution with Polish text from the API
+schemas and, for each gzip level and brotli quality, reports the compressed
+size, the ratio and the median compression time. The last table plays
+--requests curriculum fetches through CompressionMiddleware in-process and
+compares the first request of a version (compressed at the cached level) with
+the following ones (served from the compressed-body cache).
+
+Usage:
+    python scripts/benchmark_compression.py --repeats 20
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, brotli, compress
+from app.schemas.curriculum import ChapterDetail, CurriculumStructure, GoalBase, RequirementWithGoals
+from app.schemas.problems import CurriculumGoal, ProblemSolution, RequirementBase, SolutionStep
+
+WORDS = [
+    "rozwiązuje", "równania", "pierwszego", "stopnia", "z", "jedną", "niewiadomą", "porównuje", "liczby",
+    "wymierne", "oblicza", "pole", "trójkąta", "prostokątnego", "stosuje", "twierdzenie", "Pitagorasa",
+    "wyrażenia", "algebraiczne", "procenty", "potęgi", "o", "wykładniku", "naturalnym", "i", "całkowitym",
+]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def payloads(rng: random.Random):
+    curriculum = CurriculumStructure(chapters=[
+        ChapterDetail(id=f"C{c}", name=sentence(rng, 4), grade_level=8, requirements=[
+            RequirementWithGoals(id=f"R{c}.{r}", description=sentence(rng, 10), goals=[
+                GoalBase(id=f"G{c}.{r}.{g}", description=sentence(rng, 14)) for g in range(8)
+            ])
+            for r in range(6)
+        ])
+        for c in range(12)
+    ])
+    solution = ProblemSolution(problem_id="P1", problem_text=sentence(rng, 60), subject_area="algebra", solution_steps=[
+        SolutionStep(
+            id=f"S{s}", step_number=s, description=sentence(rng, 20), hint=sentence(rng, 15),
+            solution=sentence(rng, 25),
+            curriculum_goals=[
+                CurriculumGoal(id=f"G{g}", description=sentence(rng, 14), requirements=[
+                    RequirementBase(id=f"R{g}", description=sentence(rng, 10))
+                ])
+                for g in range(3)
+            ],
+        )
+        for s in range(8)
+    ])
+    return {
+        "curriculum": curriculum.model_dump_json().encode("utf-8"),
+        "solution": solution.model_dump_json().encode("utf-8"),
+    }
+
+
+def median_ms(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def compare_levels(bodies, repeats: int):
+    settings = [("gzip", level) for level in (1, 6, 9)]
+    if brotli is not None:
+        settings += [("br", quality) for quality in (1, 4, 9, 11)]
+    print(f"{'payload':<11} {'bytes':>8}  {'encoding':<8} {'out':>7} {'ratio':>6} {'ms':>7} {'MB/s':>7}")
+    for name, body in bodies.items():
+        for encoding, level in settings:
+            size = len(compress(body, encoding, level))
+            ms = median_ms(lambda: compress(body, encoding, level), repeats)
+            print(f"{name:<11} {len(body):>8}  {encoding + '-' + str(level):<8} {size:>7} "
+                  f"{len(body) / size:>5.1f}x {ms:>7.2f} {len(body) / 1e3 / ms:>7.1f}")
+
+
+def middleware_session(body: bytes, requests: int):
+    app = FastAPI()
+
+    @app.get("/curriculum")
+    def curriculum():
+        return Response(content=body, media_type="application/json", headers={"ETag": '"v1"'})
+
+    middleware = CompressionMiddleware(app)
+    client = TestClient(middleware)
+    print(f"\n{requests} curriculum requests through CompressionMiddleware ({len(body)} bytes)")
+    print(f"{'accept-encoding':<16} {'wire bytes':>10} {'first ms':>9} {'repeat ms':>10}")
+    for accept in ("identity", "gzip", "br") if brotli is not None else ("identity", "gzip"):
+        middleware.cache.clear()
+        headers = {"Accept-Encoding": accept}
+        start = time.perf_counter()
+        first = client.get("/curriculum", headers=headers)
+        first_ms = (time.perf_counter() - start) * 1000
+        wire = int(first.headers["content-length"])
+        repeat_ms = median_ms(lambda: client.get("/curriculum", headers=headers), requests)
+        print(f"{accept:<16} {wire:>10} {first_ms:>9.2f} {repeat_ms:>10.2f}")
+
+
+def main(repeats: int, requests: int):
+    bodies = payloads(random.Random(42))
+    compare_levels(bodies, repeats)
+    middleware_session(bodies["curriculum"], requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    main(args.repeats, args.requests)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark conditional GETs on the curriculum endpoints over a simulated
+Streamlit session.
+
+Every Streamlit rerun refetches the curriculum pages the user has open. The
+session here is --reruns reruns, each fetching /structure, /chapters, /goals and
+one chapter. It is played twice against the app in-process: once as a plain
+client, and once as the frontend's `api_get` does it, sending the last ETag in
+If-None-Match. Bytes on the wire and the median latency per request are
+reported for both. The curriculum is synthetic (--chapters x --requirements x
+--goals) and is loaded into the snapshot directly, so Neo4j is not needed.
+
+Usage:
+    python scripts/benchmark_curriculum_etag.py --reruns 200
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.api.auth import get_current_user
+from app.main import app
+from app.services.curriculum_snapshot import build_structure, curriculum_snapshot
+
+WORDS = ["solve", "compare", "represent", "calculate", "estimate", "equation", "fraction", "angle", "function"]
+
+
+def synthetic_rows(chapters: int, requirements: int, goals: int, seed: int = 42):
+    """Rows in the shape of the curriculum tree query"""
+    rng = random.Random(seed)
+    rows = []
+    for c in range(chapters):
+        for r in range(requirements):
+            for g in range(goals):
+                rows.append({
+                    "chapter_id": f"C{c}",
+                    "chapter_name": f"Chapter {c}",
+                    "grade_level": 8,
+                    "requirement_id": f"R{c}.{r}",
+                    "requirement_description": f"Requirement {c}.{r}",
+                    "goal_id": f"G{c}.{r}.{g}",
+                    "goal_description": " ".join(rng.choice(WORDS) for _ in range(12)),
+                })
+    return rows
+
+
+def play_session(client: TestClient, paths, reruns: int, conditional: bool):
+    """(total response bytes, per-request latencies in ms, status counts)"""
+    etags = {}
+    total_bytes = 0
+    latencies = []
+    statuses = {}
+    for _ in range(reruns):
+        for path in paths:
+            headers = {"If-None-Match": etags[path]} if conditional and path in etags else {}
+            start = time.perf_counter()
+            response = client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            etags[path] = response.headers["etag"]
+            total_bytes += len(response.content)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return total_bytes, latencies, statuses
+
+
+def main(chapters: int, requirements: int, goals: int, reruns: int):
+    curriculum_snapshot.build(build_structure(synthetic_rows(chapters, requirements, goals)))
+    app.dependency_overrides[get_current_user] = lambda: models.User(id=1, username="benchmark")
+    client = TestClient(app)
+    paths = ["/api/curriculum/structure", "/api/curriculum/chapters", "/api/curriculum/goals",
+             "/api/curriculum/chapters/C0"]
+
+    print(f"{chapters * requirements * goals} goals, {reruns} reruns x {len(paths)} requests")
+    print(f"{'mode':<12} {'bytes':>12} {'median ms':>10} {'p95 ms':>8}  statuses")
+    results = {}
+    for mode, conditional in (("plain", False), ("if-none-match", True)):
+        total_bytes, latencies, statuses = play_session(client, paths, reruns, conditional)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{mode:<12} {total_bytes:>12} {statistics.median(latencies):>10.2f} {p95:>8.2f}  {statuses}")
+        results[mode] = (total_bytes, sum(latencies))
+
+    (plain_bytes, plain_ms), (etag_bytes, etag_ms) = results["plain"], results["if-none-match"]
+    print(f"saved {plain_bytes - etag_bytes} bytes ({1 - etag_bytes / plain_bytes:.1%}) "
+          f"and {plain_ms - etag_ms:.0f} ms of request time over the session")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, default=12)
+    parser.add_argument("--requirements", type=int, default=6)
+    parser.add_argument("--goals", type=int, default=8)
+    parser.add_argument("--reruns", type=int, default=200)
+    args = parser.parse_args()
+    main(args.chapters, args.requirements, args.goals, args.reruns)
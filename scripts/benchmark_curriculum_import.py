@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark the curriculum importer on a synthetic curriculum the size of the
+full primary + secondary core curriculum (grades 1-12).
+
+Each grade gets --chapters chapters x --requirements requirements x --goals goals,
+with 0-3 prerequisites per goal drawn from the same and the previous grade. The
+files are written as JSON (one per grade) to a temporary directory.
+
+Three imports are timed: into an empty graph, an unchanged re-import, and a
+re-import with --changed of the goals edited. Without --neo4j only parsing and
+diffing are timed, against an in-memory copy of the graph; with --neo4j the
+imports run against the configured database (ids are prefixed "BENCH-" and
+removed afterwards).
+
+Usage:
+    python scripts/benchmark_curriculum_import.py
+    python scripts/benchmark_curriculum_import.py --neo4j --batch-size 2000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from app.db.curriculum_import import (
+    LABELS, ExistingCurriculum, collect_curriculum, grade_levels, import_curriculum, plan_import,
+    read_curriculum_files,
+)
+
+GRADES = range(1, 13)
+WORDS = [
+    "solve", "compare", "represent", "calculate", "estimate", "equation", "fraction", "percent", "angle",
+    "triangle", "function", "graph", "sequence", "probability", "area", "volume", "inequality", "power",
+]
+
+
+def synthetic_curriculum(chapters: int, requirements: int, goals: int, seed: int, changed: float = 0.0):
+    """{grade_level: document} in the importer's JSON format"""
+    rng = random.Random(seed)
+    edit_rng = random.Random(seed + 1)
+    documents = {}
+    previous_goals = []
+    for grade in GRADES:
+        grade_goals = []
+        document = {"grade_level": grade, "chapters": []}
+        for c in range(chapters):
+            chapter = {"id": f"BENCH-C{grade}.{c}", "name": f"Grade {grade} chapter {c}", "requirements": []}
+            for r in range(requirements):
+                requirement_id = f"BENCH-R{grade}.{c}.{r}"
+                requirement = {"id": requirement_id, "description": f"Requirement {requirement_id}", "goals": []}
+                for g in range(goals):
+                    goal_id = f"BENCH-G{grade}.{c}.{r}.{g}"
+                    pool = previous_goals + grade_goals
+                    description = f"Goal {goal_id}: " + " ".join(rng.choice(WORDS) for _ in range(12))
+                    if changed and edit_rng.random() < changed:
+                        description += " (revised)"
+                    requirement["goals"].append({
+                        "id": goal_id,
+                        "description": description,
+                        "prerequisites": rng.sample(pool, min(len(pool), rng.randint(0, 3))),
+                    })
+                    grade_goals.append(goal_id)
+                chapter["requirements"].append(requirement)
+            document["chapters"].append(chapter)
+        documents[grade] = document
+        previous_goals = grade_goals
+    return documents
+
+
+def write_files(directory: Path, documents) -> int:
+    size = 0
+    for grade, document in documents.items():
+        path = directory / f"grade_{grade:02d}.json"
+        path.write_text(json.dumps(document, ensure_ascii=False))
+        size += path.stat().st_size
+    return size
+
+
+def as_existing(curriculum) -> ExistingCurriculum:
+    """The graph state after importing `curriculum`"""
+    nodes = (curriculum.chapters, curriculum.requirements, curriculum.goals)
+    hashes = {
+        label: {node_id: node["content_hash"] for node_id, node in items.items()}
+        for label, items in zip(LABELS, nodes)
+    }
+    return ExistingCurriculum(hashes, set(curriculum.links), grade_levels(curriculum))
+
+
+def offline(directory: Path, changed_directory: Path):
+    empty = ExistingCurriculum({label: {} for label in LABELS}, set())
+    started = time.perf_counter()
+    curriculum = collect_curriculum(read_curriculum_files([str(directory)]))
+    parse_seconds = time.perf_counter() - started
+
+    for name, source, existing in (
+        ("initial", curriculum, empty),
+        ("unchanged", curriculum, as_existing(curriculum)),
+        ("changed", None, as_existing(curriculum)),
+    ):
+        started = time.perf_counter()
+        if source is None:
+            source = collect_curriculum(read_curriculum_files([str(changed_directory)]))
+        plan = plan_import(source, existing)
+        seconds = time.perf_counter() - started + (parse_seconds if name != "changed" else 0.0)
+        writes = sum(len(rows) for rows in plan.upserts.values())
+        print(f"{name:>10} {seconds:>8.2f} {writes:>8} {len(plan.add_links):>8}")
+
+
+def live(directory: Path, changed_directory: Path, batch_size: int):
+    from app.db import queries
+    from app.db.neo4j import neo4j_db
+    from app.db.neo4j_schema import ensure_schema
+
+    ensure_schema(neo4j_db)
+    try:
+        for name, source in (("initial", directory), ("unchanged", directory), ("changed", changed_directory)):
+            started = time.perf_counter()
+            report = import_curriculum(neo4j_db, [str(source)], batch_size)
+            seconds = time.perf_counter() - started
+            writes = sum(report["created"].values()) + sum(report["updated"].values())
+            print(f"{name:>10} {seconds:>8.2f} {writes:>8} {report['links_added']:>8}")
+    finally:
+        for label, query in zip(LABELS, (queries.DELETE_CHAPTERS, queries.DELETE_REQUIREMENTS, queries.DELETE_GOALS)):
+            prefix = {"Chapter": "BENCH-C", "Requirement": "BENCH-R", "Goal": "BENCH-G"}[label]
+            ids = [record["id"] for record in neo4j_db.run_query(
+                f"MATCH (n:{label}) WHERE n.id STARTS WITH '{prefix}' RETURN n.id as id"
+            )]
+            for start in range(0, len(ids), batch_size):
+                neo4j_db.run_query(query, {"ids": ids[start:start + batch_size]})
+        neo4j_db.close()
+
+
+def main(args):
+    documents = synthetic_curriculum(args.chapters, args.requirements, args.goals, args.seed)
+    changed = synthetic_curriculum(args.chapters, args.requirements, args.goals, args.seed, args.changed)
+    with tempfile.TemporaryDirectory() as base:
+        directory, changed_directory = Path(base) / "initial", Path(base) / "changed"
+        directory.mkdir()
+        changed_directory.mkdir()
+        size = write_files(directory, documents)
+        write_files(changed_directory, changed)
+
+        goals = len(GRADES) * args.chapters * args.requirements * args.goals
+        print(
+            f"{len(GRADES)} grades, {len(GRADES) * args.chapters} chapters, "
+            f"{len(GRADES) * args.chapters * args.requirements} requirements, {goals} goals, "
+            f"{size / 1e6:.1f} MB of JSON"
+        )
+        print(f"\n{'import':>10} {'seconds':>8} {'nodes':>8} {'links':>8}")
+        if args.neo4j:
+            live(directory, changed_directory, args.batch_size)
+        else:
+            offline(directory, changed_directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, default=12, help="Chapters per grade")
+    parser.add_argument("--requirements", type=int, default=6, help="Requirements per chapter")
+    parser.add_argument("--goals", type=int, default=8, help="Goals per requirement")
+    parser.add_argument("--changed", type=float, default=0.05, help="Share of goals edited for the third import")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--neo4j", action="store_true", help="Import into the configured Neo4j database")
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
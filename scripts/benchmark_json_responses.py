@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of the largest API responses.
+
+Three payloads are built from the API schemas: the full CurriculumStructure, a
+ProblemSolution whose steps each carry several curriculum goals, and a page of
+problem history. Each is serialized four ways:
+
+  jsonable      jsonable_encoder + stdlib json (routes without a response_model)
+  dict+json     model dump to JSON-compatible data + stdlib json (JSONResponse)
+  dict+fast     model dump to JSON-compatible data + FastJSONResponse
+  dump_json     Pydantic's dump_json straight to bytes (FastJSONResponse given a
+                model, and FastAPI's own path for response models on recent versions)
+
+and the median time and the peak memory allocated during one serialization
+(tracemalloc) are reported.
+
+Usage:
+    python scripts/benchmark_json_responses.py --repeats 50
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse, orjson
+from app.schemas.curriculum import ChapterDetail, CurriculumStructure, GoalBase, RequirementWithGoals
+from app.schemas.pagination import Page
+from app.schemas.problems import (
+    CurriculumGoal, ProblemHistoryResponse, ProblemSolution, RequirementBase, SolutionStep,
+)
+
+WORDS = ["solve", "compare", "represent", "calculate", "estimate", "equation", "fraction", "angle", "function"]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def curriculum_payload(rng: random.Random, chapters: int = 12, requirements: int = 6, goals: int = 8):
+    return CurriculumStructure(chapters=[
+        ChapterDetail(id=f"C{c}", name=f"Chapter {c}", grade_level=8, requirements=[
+            RequirementWithGoals(id=f"R{c}.{r}", description=sentence(rng, 10), goals=[
+                GoalBase(id=f"G{c}.{r}.{g}", description=sentence(rng, 12)) for g in range(goals)
+            ])
+            for r in range(requirements)
+        ])
+        for c in range(chapters)
+    ])
+
+
+def solution_payload(rng: random.Random, steps: int = 40, goals: int = 6):
+    return ProblemSolution(problem_id="P1", problem_text=sentence(rng, 60), subject_area="algebra", solution_steps=[
+        SolutionStep(
+            id=f"S{s}", step_number=s, description=sentence(rng, 20), hint=sentence(rng, 15),
+            solution=sentence(rng, 25), user_solved=s % 2 == 0,
+            curriculum_goals=[
+                CurriculumGoal(id=f"G{g}", description=sentence(rng, 12), requirements=[
+                    RequirementBase(id=f"R{g}.{r}", description=sentence(rng, 10)) for r in range(3)
+                ])
+                for g in range(goals)
+            ],
+        )
+        for s in range(steps)
+    ])
+
+
+def history_payload(rng: random.Random, items: int = 2000):
+    start = datetime(2024, 1, 1)
+    return Page[ProblemHistoryResponse](items=[
+        ProblemHistoryResponse(
+            problem_id=f"P{i}", problem_text=sentence(rng, 40), subject_area="algebra",
+            attempted_at=start + timedelta(minutes=i), completed=i % 3 != 0, time_spent_seconds=rng.randint(30, 900),
+            steps_completed=rng.randint(0, 5), steps_with_hints=rng.randint(0, 2),
+        )
+        for i in range(items)
+    ], next_cursor="cursor")
+
+
+def strategies(model):
+    adapter = TypeAdapter(type(model))
+    response = FastJSONResponse(content=None)
+    return {
+        "jsonable": lambda: json.dumps(jsonable_encoder(model)).encode("utf-8"),
+        "dict+json": lambda: json.dumps(adapter.dump_python(model, mode="json")).encode("utf-8"),
+        "dict+fast": lambda: response.render(adapter.dump_python(model, mode="json")),
+        "dump_json": lambda: response.render(model),
+    }
+
+
+def measure(fn, repeats: int):
+    """(median ms, peak KiB allocated during one call)"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 1024
+
+
+def main(repeats: int):
+    rng = random.Random(42)
+    payloads = {
+        "curriculum": curriculum_payload(rng),
+        "solution": solution_payload(rng),
+        "history": history_payload(rng),
+    }
+    print(f"orjson {'installed' if orjson is not None else 'not installed (stdlib fallback)'}, "
+          f"median of {repeats} runs")
+    print(f"{'payload':<11} {'KiB':>6}  {'strategy':<10} {'ms':>8} {'peak KiB':>9} {'speedup':>8}")
+    for name, model in payloads.items():
+        fns = strategies(model)
+        outputs = {key: json.loads(fn()) for key, fn in fns.items()}
+        assert all(output == outputs["dump_json"] for output in outputs.values()), name
+        size = len(fns["dump_json"]()) / 1024
+        baseline = None
+        for key, fn in fns.items():
+            ms, peak = measure(fn, repeats)
+            baseline = baseline or ms
+            print(f"{name:<11} {size:>6.0f}  {key:<10} {ms:>8.2f} {peak:>9.0f} {baseline / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+    main(args.repeats)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark root-cause gap detection on a synthetic prerequisite graph.
+
+Generates a layered curriculum DAG (default 5k goals, each with 0-4 prerequisites
+drawn mostly from the few preceding layers), then measures graph build time,
+single-user latency and batch throughput for users who practiced a random
+subset of goals.
+
+Usage:
+    python scripts/benchmark_knowledge_gaps.py --goals 5000 --users 2000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from app.services.knowledge_gaps import PrerequisiteGraph
+
+
+def synthetic_curriculum(goals: int, seed: int, layer_size: int = 50):
+    rng = random.Random(seed)
+    goal_ids = [f"G{i}" for i in range(goals)]
+    edges = []
+    for i in range(layer_size, goals):
+        layer_start = (i // layer_size) * layer_size
+        window_start = max(0, layer_start - 3 * layer_size)
+        for prerequisite in rng.sample(range(window_start, layer_start), rng.randint(0, 4)):
+            edges.append((goal_ids[prerequisite], goal_ids[i]))
+    return goal_ids, edges
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main(goals: int, users: int, practiced: int, seed: int):
+    goal_ids, edges = synthetic_curriculum(goals, seed)
+    graph = PrerequisiteGraph()
+    started = time.perf_counter()
+    graph.build(goal_ids, edges)
+    print(f"{goals} goals, {len(edges)} prerequisite edges, built in {time.perf_counter() - started:.2f} s")
+
+    rng = random.Random(seed + 1)
+    masteries = [
+        {goal_id: rng.random() for goal_id in rng.sample(goal_ids, min(practiced, goals))}
+        for _ in range(users)
+    ]
+
+    timings = []
+    for mastery in masteries[:500]:
+        started = time.perf_counter()
+        graph.root_gaps(mastery)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"single user: p50 {statistics.median(timings):.2f} ms, p99 {percentile(timings, 0.99):.2f} ms")
+
+    print(f"\n{'batch':>6} {'seconds':>8} {'users/s':>9}")
+    for batch_size in (64, 256, 1024):
+        started = time.perf_counter()
+        for start in range(0, users, batch_size):
+            graph.root_gaps_batch(masteries[start:start + batch_size])
+        elapsed = time.perf_counter() - started
+        print(f"{batch_size:>6} {elapsed:>8.2f} {users / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--goals", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--practiced", type=int, default=500, help="Goals with mastery per user")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.goals, args.users, args.practiced, args.seed)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyset pagination against OFFSET/LIMIT for a heavy user's problem history.
+
+Fills a scratch SQLite database with problem history (one heavy user plus background
+users), then times fetching a single page at increasing depths with both strategies.
+OFFSET has to walk and discard every earlier row; keyset seeks straight to the cursor
+through the (user_id, attempted_at, id) index, so its latency stays flat.
+
+Usage:
+    python scripts/benchmark_pagination.py --rows 200000 --page-size 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from sqlalchemy import and_, create_engine, insert, or_, select
+
+from app.db.base import Base
+from app.models.users import ProblemHistory
+
+HEAVY_USER_ID = 1
+
+
+def populate(engine, rows: int, background_users: int = 50, batch_size: int = 10000):
+    """Insert `rows` attempts for the heavy user and as many spread over other users"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        batch = []
+        for i in range(rows * 2):
+            user_id = HEAVY_USER_ID if i % 2 == 0 else rng.randint(2, background_users + 1)
+            batch.append({
+                "user_id": user_id,
+                "problem_id": f"P{rng.randint(1, 5000)}",
+                # Coarse timestamps so many rows tie on attempted_at and the id tiebreak matters
+                "attempted_at": start + timedelta(minutes=rng.randint(0, 60 * 24 * 600)),
+                "completed": rng.random() < 0.6,
+                "steps_completed": rng.randint(0, 4),
+                "steps_with_hints": 0,
+            })
+            if len(batch) == batch_size:
+                conn.execute(insert(ProblemHistory), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(ProblemHistory), batch)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def offset_page(conn, depth: int, page_size: int):
+    query = (
+        select(ProblemHistory.id, ProblemHistory.problem_id, ProblemHistory.attempted_at)
+        .where(ProblemHistory.user_id == HEAVY_USER_ID)
+        .order_by(ProblemHistory.attempted_at.desc(), ProblemHistory.id.desc())
+        .offset(depth)
+        .limit(page_size)
+    )
+    return conn.execute(query).all()
+
+
+def keyset_page(conn, before, page_size: int):
+    query = (
+        select(ProblemHistory.id, ProblemHistory.problem_id, ProblemHistory.attempted_at)
+        .where(ProblemHistory.user_id == HEAVY_USER_ID)
+    )
+    if before is not None:
+        attempted_at, row_id = before
+        query = query.where(
+            ProblemHistory.attempted_at <= attempted_at,
+            or_(
+                ProblemHistory.attempted_at < attempted_at,
+                and_(ProblemHistory.attempted_at == attempted_at, ProblemHistory.id < row_id),
+            ),
+        )
+    query = query.order_by(ProblemHistory.attempted_at.desc(), ProblemHistory.id.desc()).limit(page_size)
+    return conn.execute(query).all()
+
+
+def time_call(fn, repeats: int) -> float:
+    """Median wall time of `fn` in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(rows: int, page_size: int, repeats: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'pagination.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, rows)
+
+        depths = [d for d in (0, 1000, 10000, 50000, 100000, 150000, rows - page_size) if d <= rows - page_size]
+        print(f"{rows} history rows for one user, page size {page_size}, median of {repeats} runs")
+        print(f"{'depth':>8} {'offset ms':>10} {'keyset ms':>10}")
+        with engine.connect() as conn:
+            for depth in depths:
+                # Sort key of the row just before the page, as a client would hold it in its cursor
+                before = None
+                if depth > 0:
+                    last = offset_page(conn, depth - 1, 1)[0]
+                    before = (last.attempted_at, last.id)
+                assert offset_page(conn, depth, page_size) == keyset_page(conn, before, page_size)
+
+                offset_ms = time_call(lambda: offset_page(conn, depth, page_size), repeats)
+                keyset_ms = time_call(lambda: keyset_page(conn, before, page_size), repeats)
+                print(f"{depth:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="History rows for the heavy user")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=15)
+    args = parser.parse_args()
+    main(args.rows, args.page_size, args.repeats)
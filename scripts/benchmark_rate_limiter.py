@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Measure the per-request overhead of the token-bucket rate limiter.
+
+Times RateLimiter.hit against the in-memory store and the shared SQLite store
+for a number of distinct client keys, then plays requests in-process against
+a bare route and the same route behind the per-IP limit dependency of the
+problems router (memory store, then SQLite store through the threadpool), so
+the difference is what the limiter adds to a request.
+
+Usage:
+    python scripts/benchmark_rate_limiter.py --calls 20000 --keys 1000 --requests 2000
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import problems
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import MemoryBucketStore, RateLimiter, SQLiteBucketStore
+
+
+def time_hits(store, calls: int, keys: int) -> float:
+    """Microseconds per hit, cycling through `keys` clients"""
+    # Limits high enough that every hit is allowed; refusals cost the same
+    limiter = RateLimiter("bench", per_minute=1e9, burst=1e9, store=store)
+    start = time.perf_counter()
+    for i in range(calls):
+        limiter.hit(str(i % keys))
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def time_requests(client: TestClient, path: str, requests: int) -> float:
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.get(path)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def main(calls: int, keys: int, requests: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stores = {
+            "memory": MemoryBucketStore(),
+            "sqlite": SQLiteBucketStore(str(Path(tmp_dir) / "buckets.db")),
+        }
+        print(f"RateLimiter.hit, {calls} calls over {keys} keys")
+        print(f"{'store':<8} {'us/hit':>8} {'hits/s':>10}")
+        for name, store in stores.items():
+            us = time_hits(store, calls, keys)
+            print(f"{name:<8} {us:>8.1f} {1e6 / us:>10.0f}")
+
+        app = FastAPI()
+
+        @app.get("/plain")
+        async def plain():
+            return {"ok": True}
+
+        @app.get("/limited", dependencies=[Depends(problems.limit_by_ip)])
+        async def limited():
+            return {"ok": True}
+
+        settings.RATE_LIMIT_IP_BURST = 10 ** 9
+        settings.RATE_LIMIT_IP_PER_MINUTE = 10 ** 9
+        client = TestClient(app)
+        baseline = time_requests(client, "/plain", requests)
+        print(f"\n{requests} in-process requests, median latency")
+        print(f"{'route':<16} {'us':>8} {'overhead us':>12}")
+        print(f"{'no limiter':<16} {baseline:>8.0f} {'':>12}")
+        for name, store in stores.items():
+            rate_limit.get_bucket_store.cache_clear()
+            settings.RATE_LIMIT_STORE = name
+            settings.RATE_LIMIT_SQLITE_PATH = getattr(store, "path", settings.RATE_LIMIT_SQLITE_PATH)
+            us = time_requests(client, "/limited", requests)
+            print(f"{'ip limit, ' + name:<16} {us:>8.0f} {us - baseline:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.calls, args.keys, args.requests)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the goal -> problems inverted index used for recommendation candidates.
+
+Builds the index over a synthetic problem set (default 100k problems over 500 goals,
+each problem linked to 1-6 goals with a skew towards popular goals), then measures
+build time, memory and candidate generation latency for users whose weakest goals
+are 3, 5 or 10 goals, with and without difficulty/subject filters.
+
+Usage:
+    python scripts/benchmark_recommendation_index.py --problems 100000 --goals 500
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from app.services.recommendation_index import GoalProblemIndex
+
+SUBJECT_AREAS = ["Algebra", "Geometry", "Arithmetic", "Statistics"]
+
+
+def synthetic_records(problems: int, goals: int, seed: int):
+    rng = random.Random(seed)
+    goal_ids = [f"G{i}" for i in range(goals)]
+    # Zipf-like weights: a few goals appear in many problems, as real curricula do
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(goals)]
+    for i in range(problems):
+        linked = set(rng.choices(goal_ids, weights=weights, k=rng.randint(1, 6)))
+        yield f"problem-{i}", sorted(linked), rng.randint(1, 5), rng.choice(SUBJECT_AREAS)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main(problems: int, goals: int, queries: int, seed: int):
+    records = list(synthetic_records(problems, goals, seed))
+
+    tracemalloc.start()
+    index = GoalProblemIndex()
+    started = time.perf_counter()
+    index.build(records)
+    build_seconds = time.perf_counter() - started
+    memory_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    postings = [len(index.postings(goal_id)) for goal_id in index.goal_ids()]
+    print(f"{problems} problems, {goals} goals, {sum(postings)} postings "
+          f"(largest {max(postings)}, median {int(statistics.median(postings))})")
+    print(f"build {build_seconds:.2f} s, index memory {memory_bytes / 1024 / 1024:.1f} MiB")
+
+    started = time.perf_counter()
+    index.add_problem(f"problem-{problems}", ["G0", "G1"], 3, "Algebra")
+    print(f"incremental add_problem {(time.perf_counter() - started) * 1e6:.1f} us")
+
+    rng = random.Random(seed + 1)
+    goal_ids = index.goal_ids()
+    scenarios = [
+        ("3 weakest goals", 3, {}),
+        ("5 weakest goals", 5, {}),
+        ("10 weakest goals", 10, {}),
+        ("5 goals, difficulty 2-3", 5, {"min_difficulty": 2, "max_difficulty": 3}),
+        ("5 goals, Geometry only", 5, {"subject_area": "Geometry"}),
+    ]
+    print(f"\n{'scenario':<28} {'p50 ms':>8} {'p99 ms':>8} {'candidates':>11}")
+    for name, goal_count, filters in scenarios:
+        timings, sizes = [], []
+        for _ in range(queries):
+            weakest = rng.sample(goal_ids, goal_count)
+            exclude = [f"problem-{rng.randrange(problems)}" for _ in range(50)]
+            started = time.perf_counter()
+            result = index.candidates(weakest, exclude=exclude, limit=50, **filters)
+            timings.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(result))
+        print(f"{name:<28} {statistics.median(timings):>8.3f} {percentile(timings, 0.99):>8.3f} "
+              f"{statistics.mean(sizes):>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problems", type=int, default=100000)
+    parser.add_argument("--goals", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=500, help="Queries per scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.problems, args.goals, args.queries, args.seed)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch scoring of problems against user mastery vectors.
+
+Builds the goal -> problems index over the same synthetic problem set as
+benchmark_recommendation_index.py, lays it out as a sparse incidence matrix and
+scores synthetic users (mastery for a random subset of goals, some attempted
+problems) in chunks, reporting users/second for the nightly precomputation.
+
+Usage:
+    python scripts/benchmark_recommendation_scorer.py --problems 100000 --goals 500 --users 2000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from benchmark_recommendation_index import synthetic_records
+
+from app.services.recommendation_index import GoalProblemIndex
+from app.services.recommendation_scorer import ProblemMatrix, UserProfile, score_users
+
+
+def synthetic_profiles(users: int, goal_ids, problems: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        UserProfile(
+            user_id=user_id,
+            mastery={goal_id: rng.random() for goal_id in rng.sample(goal_ids, min(40, len(goal_ids)))},
+            attempted={f"problem-{rng.randrange(problems)}" for _ in range(50)},
+        )
+        for user_id in range(users)
+    ]
+
+
+def main(problems: int, goals: int, users: int, limit: int, seed: int):
+    index = GoalProblemIndex()
+    index.build(synthetic_records(problems, goals, seed))
+
+    started = time.perf_counter()
+    matrix = ProblemMatrix(index)
+    print(f"incidence matrix {matrix.incidence.shape}, {matrix.incidence.nnz} non-zeros, "
+          f"built in {time.perf_counter() - started:.2f} s")
+
+    profiles = synthetic_profiles(users, matrix.goal_ids, problems, seed + 1)
+    print(f"\n{'chunk':>6} {'seconds':>8} {'users/s':>9}")
+    for chunk_size in (1, 16, 64, 256):
+        started = time.perf_counter()
+        ranked = score_users(matrix, profiles, limit=limit, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - started
+        assert len(ranked) == users
+        print(f"{chunk_size:>6} {elapsed:>8.2f} {users / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problems", type=int, default=100000)
+    parser.add_argument("--goals", type=int, default=500)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20, help="Recommendations kept per user")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.problems, args.goals, args.users, args.limit, args.seed)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Measure how long `import app.main` takes and how much memory it leaves behind.
+
+Each run imports the app in a fresh interpreter with `python -X importtime`,
+so nothing is cached between runs. Reports the median total import time, the
+modules with the largest cumulative import time and the child's peak RSS, and
+lists heavy modules that should only be imported on first use (numpy, scipy,
+passlib, the neo4j driver, openai) if any of them were loaded.
+
+With --max-import-ms, --max-rss-mb or --forbid the script exits with status 1
+when a threshold is exceeded or a forbidden module is imported, so CI can
+catch startup regressions.
+
+Usage:
+    python scripts/benchmark_startup.py --runs 5
+    python scripts/benchmark_startup.py --max-import-ms 2000 --max-rss-mb 150 --forbid numpy scipy passlib neo4j openai
+"""
+
+import argparse
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = str(Path(__file__).resolve().parent.parent)
+
+DEFAULT_FORBIDDEN = ["numpy", "scipy", "passlib", "neo4j", "openai"]
+
+# "import time: self [us] | cumulative | imported package", the package indented by nesting
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+# Prints the modules loaded by the import, after the importtime output on stderr
+PROBE = "import sys; import app.main; print(' '.join(sorted(sys.modules)))"
+
+
+def run_once(target: str):
+    """Import `target` in a new interpreter; returns (importtime rows, loaded modules, peak RSS of the children in KB)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.replace("app.main", target)],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+        # Read the compiled .pyc files as a deployed app would, without writing new ones
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+    # Peak RSS over all finished children; every run imports the same modules
+    rss_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent)))
+    modules = set(result.stdout.strip().splitlines()[-1].split()) if result.stdout.strip() else set()
+    return rows, modules, rss_kb
+
+
+def main(runs: int, target: str, top: int, forbid, max_import_ms, max_rss_mb) -> int:
+    totals_ms = []
+    cumulative = {}
+    modules = set()
+    rss_kb = 0
+    for _ in range(runs):
+        rows, modules, rss_kb = run_once(target)
+        total_row = next((row for row in rows if row[0] == target), None)
+        totals_ms.append(total_row[2] / 1000 if total_row else sum(row[1] for row in rows) / 1000)
+        for name, _, cumulative_us, _ in rows:
+            cumulative.setdefault(name, []).append(cumulative_us / 1000)
+
+    total_ms = statistics.median(totals_ms)
+    rss_mb = rss_kb / 1024 if sys.platform != "darwin" else rss_kb / 1024 / 1024
+    print(f"import {target}: median {total_ms:.0f} ms over {runs} runs "
+          f"(min {min(totals_ms):.0f}, max {max(totals_ms):.0f}), peak RSS {rss_mb:.1f} MB")
+
+    print(f"\n{'module':<48} {'cumulative ms':>14}")
+    ranked = sorted(cumulative.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in [item for item in ranked if item[0] != target][:top]:
+        print(f"{name:<48} {statistics.median(values):>14.1f}")
+
+    failures = []
+    loaded = sorted(name for name in forbid if name in modules)
+    if loaded:
+        failures.append(f"imported at startup: {', '.join(loaded)}")
+    if max_import_ms is not None and total_ms > max_import_ms:
+        failures.append(f"import time {total_ms:.0f} ms exceeds {max_import_ms:.0f} ms")
+    if max_rss_mb is not None and rss_mb > max_rss_mb:
+        failures.append(f"peak RSS {rss_mb:.1f} MB exceeds {max_rss_mb:.0f} MB")
+
+    if failures:
+        print("\nFAILED: " + "; ".join(failures))
+        return 1
+    if forbid or max_import_ms is not None or max_rss_mb is not None:
+        print("\nWithin thresholds")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--forbid", nargs="*", default=[], metavar="MODULE",
+                        help=f"fail if any of these is imported (suggested: {' '.join(DEFAULT_FORBIDDEN)})")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-rss-mb", type=float)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.target, args.top, args.forbid, args.max_import_ms, args.max_rss_mb))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Generate a seeded, reproducible synthetic dataset for load testing and benchmarks.
+
+Writes users, settings, goal progress, problem history (and the attempt log) to the
+SQL database with bulk inserts, and problems with solution steps and goal links to
+Neo4j with UNWIND batches. Every synthetic user logs in with password "password123".
+
+Examples:
+    # ~1.2M SQL rows: 10k users x 100 attempts (+ attempt log), 12 goals each
+    python scripts/generate_synthetic_data.py --users 10000 --history-per-user 100 --problems 20000
+
+    # SQL only, into a scratch database
+    python scripts/generate_synthetic_data.py --database-url sqlite:///./bench.db --skip-neo4j
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from loguru import logger
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.synthetic_data import generate_synthetic_data
+# Import all models here to ensure they're registered with Base
+from app.models.users import User, GoalProgress, ProblemHistory, UserSettings
+from app.models.attempts import AttemptRollup
+from app.models.recommendations import UserRecommendations
+from app.models.goal_stats import GoalStats
+
+
+def main(args):
+    database_url = args.database_url or settings.SQLALCHEMY_DATABASE_URI
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    if engine.dialect.name == "sqlite":
+        # Bulk load settings: the dataset is disposable, so trade durability for speed
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+    neo4j_instance = None
+    if not args.skip_neo4j:
+        from app.db.neo4j import neo4j_db
+        neo4j_instance = neo4j_db
+
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        if engine.dialect.name == "sqlite":
+            db.connection().exec_driver_sql("PRAGMA synchronous=OFF")
+        stats = generate_synthetic_data(
+            db,
+            users=args.users,
+            problems=args.problems,
+            history_per_user=args.history_per_user,
+            goals_per_user=args.goals_per_user,
+            min_steps=args.min_steps,
+            max_steps=args.max_steps,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            neo4j_instance=neo4j_instance,
+            with_attempt_log=not args.skip_attempt_log,
+            now=datetime.fromisoformat(args.now) if args.now else None,
+        )
+    finally:
+        db.close()
+
+    # attempt_log is absent with --skip-attempt-log
+    total_rows = sum(stats.get(key, 0) for key in ("users", "goal_progress", "problem_history", "attempt_log"))
+    total_time = sum(stats["timings"].values())
+    print(f"Wrote {total_rows} SQL rows and {stats['problems']} problems ({stats['solution_steps']} steps)")
+    for stage, seconds in stats["timings"].items():
+        print(f"  {stage:<16} {seconds:8.2f} s")
+    print(f"  {'total':<16} {total_time:8.2f} s  ({total_rows / total_time:,.0f} SQL rows/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--problems", type=int, default=1000)
+    parser.add_argument("--history-per-user", type=int, default=50)
+    parser.add_argument("--goals-per-user", type=int, default=12)
+    parser.add_argument("--min-steps", type=int, default=2)
+    parser.add_argument("--max-steps", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--now", help="ISO timestamp anchoring generated dates (default: current time)")
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: SQLALCHEMY_DATABASE_URI)")
+    parser.add_argument("--skip-neo4j", action="store_true", help="Do not store problems in Neo4j")
+    parser.add_argument("--skip-attempt-log", action="store_true", help="Do not mirror history into the attempt log")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    main(args)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Import curriculum files (JSON or CSV, one per grade level) into Neo4j.
+
+Only new or changed chapters, requirements and goals are written, so running
+the same import twice makes no changes the second time.
+
+Usage:
+    python scripts/import_curriculum.py data/curriculum/
+    python scripts/import_curriculum.py grade_7.json grade_8.csv --dry-run
+    python scripts/import_curriculum.py data/curriculum/ --prune   # also delete what the files no longer list
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.db.curriculum_import import import_curriculum
+from app.db.neo4j import neo4j_db
+from app.db.neo4j_schema import ensure_schema
+
+
+def main(args):
+    try:
+        ensure_schema(neo4j_db)
+        report = import_curriculum(neo4j_db, args.paths, args.batch_size, args.prune, args.dry_run)
+        print(json.dumps(report, indent=2))
+        return 0
+    finally:
+        neo4j_db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Curriculum files or directories")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per UNWIND statement")
+    parser.add_argument("--prune", action="store_true", help="Delete nodes and links missing from the files")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing")
+    sys.exit(main(parser.parse_args()))
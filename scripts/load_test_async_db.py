@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Load test comparing the sync (threadpool) and async (event loop) database paths.
+
+The script runs in-process against the FastAPI app through httpx's ASGI transport,
+so it needs neither a running server nor Neo4j. It serves the same "who am I"
+lookup twice:
+  - sync:  a `def` handler using `Session` from `get_db` (the old auth path)
+  - async: the real `/api/auth/user` endpoint using `AsyncSession` from `get_async_db`
+and reports requests/second, latency percentiles and how saturated the anyio
+worker threadpool got while the clients were running.
+
+Usage:
+    python scripts/load_test_async_db.py --clients 500 --requests 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+import anyio.to_thread
+import httpx
+from fastapi import APIRouter, Depends
+from jose import jwt
+from loguru import logger
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.auth import oauth2_scheme
+from app.core.config import settings
+from app.core.security import create_access_token, get_password_hash
+from app.db.base import Base, get_async_db, get_db
+from app.main import app
+from app.models.users import User
+
+
+def build_sync_router() -> APIRouter:
+    """Sync twin of /api/auth/user, as it was before the async session path"""
+    router = APIRouter()
+
+    @router.get("/sync/auth/user")
+    def sync_user_profile(
+        db: Session = Depends(get_db),
+        token: str = Depends(oauth2_scheme),
+    ):
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        user = db.query(User).filter(User.id == payload.get("sub")).first()
+        return {"id": user.id, "username": user.username}
+
+    return router
+
+
+def setup_database(database_path: str) -> str:
+    """Create tables and a single user in a scratch SQLite file, return a token for it"""
+    engine = create_engine(f"sqlite:///{database_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with SyncSession() as db:
+        user = User(username="loadtest", email="loadtest@example.com", hashed_password=get_password_hash("loadtest"))
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    def override_get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    AsyncSessionFactory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncSessionFactory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return create_access_token(user_id)
+
+
+async def sample_threadpool(stop: asyncio.Event, samples: list, interval: float = 0.005):
+    """Record (busy threads, waiting tasks) of the default anyio threadpool until stopped"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    while not stop.is_set():
+        stats = limiter.statistics()
+        samples.append((stats.borrowed_tokens, stats.tasks_waiting))
+        await asyncio.sleep(interval)
+
+
+async def run_load(path: str, token: str, clients: int, requests_per_client: int) -> dict:
+    """Fire `clients` concurrent clients, each sending `requests_per_client` requests"""
+    latencies = []
+    errors = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        async def client_loop():
+            nonlocal errors
+            for _ in range(requests_per_client):
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        stop = asyncio.Event()
+        samples = []
+        sampler = asyncio.create_task(sample_threadpool(stop, samples))
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+
+    latencies.sort()
+    total = len(latencies)
+    limiter_size = anyio.to_thread.current_default_thread_limiter().total_tokens
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed": elapsed,
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(total - 1, int(total * 0.99))] * 1000,
+        "threads_total": limiter_size,
+        "threads_peak": max(busy for busy, _ in samples) if samples else 0,
+        "threads_mean": statistics.mean(busy for busy, _ in samples) if samples else 0,
+        "waiting_peak": max(waiting for _, waiting in samples) if samples else 0,
+    }
+
+
+def print_report(name: str, result: dict):
+    print(
+        f"{name:<6} {result['requests']:>7} req  {result['errors']:>4} err  "
+        f"{result['rps']:>8.1f} req/s  p50 {result['p50_ms']:>7.1f} ms  p99 {result['p99_ms']:>7.1f} ms  "
+        f"threadpool busy peak {result['threads_peak']:>3}/{result['threads_total']:<3} "
+        f"mean {result['threads_mean']:>5.1f}  queued peak {result['waiting_peak']:>4}"
+    )
+
+
+async def main(clients: int, requests_per_client: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        token = setup_database(os.path.join(tmp_dir, "loadtest.db"))
+        app.include_router(build_sync_router())
+
+        # Warm up both paths (connection pools, JWT, first query compilation)
+        await run_load("/sync/auth/user", token, 10, 2)
+        await run_load("/api/auth/user", token, 10, 2)
+
+        print(f"{clients} concurrent clients x {requests_per_client} requests")
+        print_report("sync", await run_load("/sync/auth/user", token, clients, requests_per_client))
+        print_report("async", await run_load("/api/auth/user", token, clients, requests_per_client))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=4, help="Requests sent by each client")
+    args = parser.parse_args()
+
+    # Keep per-request logging out of the report
+    logger.remove()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(args.clients, args.requests))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+List the Neo4j queries that cost the most, from query stats dumps.
+
+Each API worker writes a dump on shutdown when NEO4J_QUERY_STATS_PATH is set,
+with its pid added to the file name; pass one or more dumps and they are merged. Set
+NEO4J_PROFILE_SAMPLE_RATE (e.g. 0.01) to also collect db hits.
+
+Usage:
+    python scripts/neo4j_query_report.py query_stats.*.json
+    python scripts/neo4j_query_report.py query_stats.1234.json --sort p95_ms --limit 5
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from app.db.queries import load_stats, top_queries
+
+SORT_KEYS = ["total_ms", "calls", "mean_ms", "p95_ms", "max_ms", "rows", "db_hits_per_call", "retries", "errors"]
+
+
+def format_value(value, width):
+    if value is None:
+        return f"{'-':>{width}}"
+    if isinstance(value, float):
+        return f"{value:>{width}.1f}"
+    return f"{value:>{width}}"
+
+
+def main(args):
+    timings = load_stats(args.stats)
+    rows = top_queries(timings, args.limit, args.sort)
+    grand_total = sum(timing.total_ms for timing in timings.values()) or 1.0
+
+    columns = [
+        "calls", "total_ms", "mean_ms", "p50_ms", "p95_ms", "max_ms", "rows", "db_hits_per_call", "retries", "errors",
+    ]
+    name_width = max([len("query")] + [len(row["name"]) for row in rows])
+    print(f"{'query':<{name_width}} {'share':>6} " + " ".join(f"{column:>10}" for column in columns))
+    for row in rows:
+        share = f"{100 * row['total_ms'] / grand_total:5.1f}%"
+        print(f"{row['name']:<{name_width}} {share:>6} " + " ".join(format_value(row[column], 10) for column in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("stats", nargs="+", help="Query stats JSON dumps")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="total_ms")
+    parser.add_argument("--limit", type=int, default=20)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Nightly batch job: precompute top-K problem recommendations for every active user.
+
+Loads the goal -> problem index from Neo4j, then scores users shard by shard in a
+process pool and stores the lists in the user_recommendations table.
+
+With --scaling, runs the job once per worker count instead and reports
+users/second for each, e.g. against a synthetic dataset:
+
+    python scripts/generate_synthetic_data.py --database-url sqlite:///./bench.db --users 20000 --skip-neo4j
+    python scripts/precompute_recommendations.py --database-url sqlite:///./bench.db \\
+        --synthetic-problems 100000 --scaling 1 2 4 8
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.db.base import Base
+# Import all models here to ensure they're registered with Base
+from app.models.users import User, GoalProgress, ProblemHistory, UserSettings
+from app.models.recommendations import UserRecommendations
+from app.services.recommendation_index import GoalProblemIndex
+from app.services.recommendations import precompute_recommendations
+
+
+def load_index(args) -> GoalProblemIndex:
+    index = GoalProblemIndex()
+    if args.synthetic_problems:
+        # Same synthetic problem set as the index/scorer benchmarks, over the G1-G12 goals
+        from benchmark_recommendation_index import synthetic_records
+        index.build(
+            (problem_id, [f"G{int(goal_id[1:]) % 12 + 1}" for goal_id in goal_ids], difficulty, subject_area)
+            for problem_id, goal_ids, difficulty, subject_area in synthetic_records(args.synthetic_problems, 12, 42)
+        )
+    else:
+        from app.db.neo4j import neo4j_db
+        index.load_from_neo4j(neo4j_db)
+    return index
+
+
+def main(args):
+    database_url = args.database_url or settings.SQLALCHEMY_DATABASE_URI
+    Base.metadata.create_all(bind=create_engine(database_url))
+    index = load_index(args)
+
+    if not args.scaling:
+        stats = precompute_recommendations(database_url, index, args.workers, args.shard_size, args.limit)
+        print(f"{stats['users']} users in {stats['seconds']:.1f}s ({stats['users_per_second']:.0f} users/s)")
+        return
+
+    print(f"{'workers':>8} {'users':>8} {'seconds':>8} {'users/s':>9} {'speedup':>8}")
+    baseline = None
+    for workers in args.scaling:
+        stats = precompute_recommendations(database_url, index, workers, args.shard_size, args.limit)
+        baseline = baseline or stats["users_per_second"]
+        print(f"{workers:>8} {stats['users']:>8} {stats['seconds']:>8.1f} "
+              f"{stats['users_per_second']:>9.0f} {stats['users_per_second'] / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Defaults to SQLALCHEMY_DATABASE_URI")
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to one per core")
+    parser.add_argument("--shard-size", type=int, default=500, help="Users per shard")
+    parser.add_argument("--limit", type=int, default=20, help="Recommendations stored per user")
+    parser.add_argument("--scaling", type=int, nargs="+", help="Report throughput for each worker count")
+    parser.add_argument("--synthetic-problems", type=int, default=0,
+                        help="Score against N synthetic problems instead of the Neo4j problem graph")
+    args = parser.parse_args()
+    main(args)
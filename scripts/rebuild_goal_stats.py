@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Rebuild or check the goal_stats cube against goal_progress.
+
+    python scripts/rebuild_goal_stats.py            # recompute the cube
+    python scripts/rebuild_goal_stats.py --check    # report drift, exit 1 if any
+    python scripts/rebuild_goal_stats.py --benchmark --grade-level 8
+
+--benchmark times the class-wide "weakest goals" view read from the cube against
+the same view computed by grouping every student's goal_progress.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+parent_dir = str(Path(__file__).resolve().parent.parent)
+sys.path.append(parent_dir)
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.goal_stats import check_goal_stats, expected_stats_query, goal_stats_query, rebuild_goal_stats
+# Import all models here to ensure they're registered with Base
+from app.models.users import User, GoalProgress
+from app.models.goal_stats import GoalStats
+
+
+def time_query(db, query, repeats: int = 20) -> float:
+    """Median wall time of a query in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        db.execute(query).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(args):
+    engine = create_engine(args.database_url or settings.SQLALCHEMY_DATABASE_URI)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        if args.check:
+            mismatches = check_goal_stats(db)
+            for mismatch in mismatches[:50]:
+                print(mismatch)
+            print(f"{len(mismatches)} mismatches")
+            return 1 if mismatches else 0
+
+        if args.benchmark:
+            grouped = expected_stats_query()
+            if args.grade_level is not None:
+                grouped = grouped.where(User.grade_level == args.grade_level)
+            progress_rows = db.query(GoalProgress).count()
+            print(f"{progress_rows} goal_progress rows")
+            print(f"cube read:        {time_query(db, goal_stats_query(args.grade_level)):8.2f} ms")
+            print(f"group by scan:    {time_query(db, grouped):8.2f} ms")
+            return 0
+
+        started = time.perf_counter()
+        rows = rebuild_goal_stats(db)
+        db.commit()
+        print(f"Rebuilt {rows} goal_stats rows in {time.perf_counter() - started:.2f} s")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Defaults to SQLALCHEMY_DATABASE_URI")
+    parser.add_argument("--check", action="store_true", help="Compare without writing")
+    parser.add_argument("--benchmark", action="store_true", help="Time cube reads against a full group-by")
+    parser.add_argument("--grade-level", type=int, default=None)
+    sys.exit(main(parser.parse_args()))
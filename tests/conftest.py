@@ -0,0 +1,129 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.main import app
+from app.core.config import settings
+from app.db import neo4j
+from app.db.base import Base, get_db, get_async_db
+from app.db.curriculum_import import SAMPLE_CURRICULUM_PATH, read_curriculum_files
+from app.models.users import User
+from app.core.metrics import instrument_engine
+from app.core.rate_limit import get_bucket_store
+from app.core.security import get_password_hash
+from app.services.curriculum_snapshot import curriculum_snapshot
+
+# Create a test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine on the same file; NullPool because every TestClient runs its own event loop
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+# Background jobs and other code outside request dependencies use the test database too;
+# the app's engines are created on first use, so this is in time
+settings.SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URL
+settings.JOBS_SQLITE_PATH = ":memory:"
+settings.CACHE_SQLITE_PATH = ":memory:"
+
+# Time test DB statements like the app's own engines
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+# Override the get_db dependency
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Override the get_async_db dependency
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+# Apply mocks to bypass Neo4j connections
+@pytest.fixture(scope="module", autouse=True)
+def mock_neo4j():
+    # Create mock for Neo4jDatabase class
+    neo4j_db_mock = MagicMock()
+    neo4j_db_mock.get_driver.return_value = MagicMock()
+    neo4j_db_mock.verify_curriculum_structure.return_value = True
+    neo4j_db_mock.create_curriculum_structure.return_value = None
+    
+    # Patch the neo4j_db instance and init function
+    with patch("app.db.neo4j.neo4j_db", neo4j_db_mock):
+        with patch("app.db.neo4j.init_neo4j_db") as mock_init:
+            mock_init.return_value = None
+            yield
+
+
+# Every test starts with full rate limit buckets
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    get_bucket_store().clear()
+    yield
+
+
+@pytest.fixture
+def curriculum_rows():
+    """The sample curriculum as rows of the curriculum tree query"""
+    rows = list(read_curriculum_files([str(SAMPLE_CURRICULUM_PATH)]))
+    neo4j.neo4j_db.run_query.side_effect = lambda query, params=None, **kwargs: rows
+    curriculum_snapshot.invalidate()
+    yield rows
+    neo4j.neo4j_db.run_query.side_effect = None
+    curriculum_snapshot.invalidate()
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    # Create the test database and tables
+    Base.metadata.create_all(bind=engine)
+    
+    # Create a test user
+    db = TestingSessionLocal()
+    test_user = User(
+        username="testuser",
+        email="test@example.com",
+        hashed_password=get_password_hash("password123")
+    )
+    db.add(test_user)
+    db.commit()
+    db.close()
+    
+    yield  # Run the tests
+    
+    # Clean up
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def client(test_db):
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def auth_headers(client):
+    # Login as the test user and build the bearer header
+    response = client.post(
+        "/api/auth/login",
+        data={
+            "username": "testuser",
+            "password": "password123"
+        }
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
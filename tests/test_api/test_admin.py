@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.profiler import SamplingProfiler, request_profiles
+
+
+@pytest.fixture
+def admin_headers(auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["testuser"])
+    yield auth_headers
+    request_profiles.disarm()
+    request_profiles.latest = None
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampling_profiler_collapses_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.002).start()
+    time.sleep(0.2)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    assert profiler.samples > 10
+    lines = profiler.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy;")]
+    assert busy and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert "busy_loop (test_admin.py:" in busy[0]
+    assert not any("sampling-profiler" in line for line in lines)
+
+
+def test_admin_endpoints_require_admin(client, auth_headers):
+    assert client.post("/api/admin/profile?seconds=0.1").status_code == 401
+    assert client.post("/api/admin/profile?seconds=0.1", headers=auth_headers).status_code == 403
+
+
+def test_profile_process(client, admin_headers):
+    response = client.post("/api/admin/profile?seconds=0.1&interval_ms=2&include_idle=true", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].startswith('attachment; filename="process-')
+    assert int(response.headers["x-profile-samples"]) > 5
+    assert response.text.strip()
+
+    too_long = client.post(f"/api/admin/profile?seconds={settings.PROFILER_MAX_SECONDS + 1}", headers=admin_headers)
+    assert too_long.status_code == 400
+
+
+def test_profile_flagged_request(client, admin_headers):
+    assert client.get("/api/admin/profile/request", headers=admin_headers).status_code == 404
+    armed = client.post("/api/admin/profile/request?path_prefix=/health&interval_ms=0.5", headers=admin_headers)
+    assert armed.json()["path_prefix"] == "/health"
+
+    client.get("/")
+    assert request_profiles.armed is not None
+    client.get("/health")
+    client.get("/health")
+    assert request_profiles.armed is None
+
+    response = client.get("/api/admin/profile/request", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["x-profile-path"] == "/health"
+    assert response.headers["x-profile-status"] == "200"
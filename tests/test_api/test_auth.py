@@ -1,73 +1,3 @@
-import pytest
-from unittest.mock import patch, MagicMock
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from app.main import app
-from app.db.base import Base, get_db
-from app.models.users import User
-from app.core.security import get_password_hash
-
-# Create a test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Override the get_db dependency
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-app.dependency_overrides[get_db] = override_get_db
-
-# Apply mocks to bypass Neo4j connections
-@pytest.fixture(scope="module", autouse=True)
-def mock_neo4j():
-    # Create mock for Neo4jDatabase class
-    neo4j_db_mock = MagicMock()
-    neo4j_db_mock.get_driver.return_value = MagicMock()
-    neo4j_db_mock.verify_curriculum_structure.return_value = True
-    neo4j_db_mock.create_curriculum_structure.return_value = None
-    
-    # Patch the neo4j_db instance and init function
-    with patch("app.db.neo4j.neo4j_db", neo4j_db_mock):
-        with patch("app.db.neo4j.init_neo4j_db") as mock_init:
-            mock_init.return_value = None
-            yield
-
-
-@pytest.fixture(scope="module")
-def test_db():
-    # Create the test database and tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Create a test user
-    db = TestingSessionLocal()
-    test_user = User(
-        username="testuser",
-        email="test@example.com",
-        hashed_password=get_password_hash("password123")
-    )
-    db.add(test_user)
-    db.commit()
-    db.close()
-    
-    yield  # Run the tests
-    
-    # Clean up
-    Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture
-def client(test_db):
-    with TestClient(app) as c:
-        yield c
-
-
 def test_register_user(client):
     response = client.post(
         "/api/auth/register",
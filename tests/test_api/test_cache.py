@@ -0,0 +1,90 @@
+import time
+from unittest.mock import MagicMock
+
+from app.core.cache import TieredCache, decode, encode
+from app.core.metrics import registry
+from app.services.curriculum_snapshot import CurriculumSnapshot, curriculum_snapshot
+
+
+def test_encoding_round_trip():
+    assert decode(encode(b"\x00raw")) == b"\x00raw"
+    assert decode(encode({"ids": [1, 2], "name": "G1"})) == {"ids": [1, 2], "name": "G1"}
+    # Every tier returns the JSON form, so tuples come back as lists everywhere
+    cache = TieredCache(None)
+    assert cache.set("pair", (1, 2)) == [1, 2]
+    assert cache.get("pair") == [1, 2]
+
+
+def test_second_worker_reads_through_l2(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = TieredCache(path, poll_seconds=0), TieredCache(path, poll_seconds=0)
+    first.set("answer", {"value": 42})
+
+    assert second.get("answer") == {"value": 42}
+    assert second.get("missing") is None
+    assert second.get_or_set("missing", lambda: "loaded") == "loaded"
+    assert first.get("missing") == "loaded"
+
+    metrics = registry.render()
+    for result in ("l1", "l2", "miss"):
+        assert f'cache_lookups_total{{result="{result}"}}' in metrics
+
+
+def test_entries_expire_in_both_tiers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = TieredCache(path, poll_seconds=0), TieredCache(path, poll_seconds=0)
+    first.set("short", b"x", ttl=0.05)
+    assert second.get("short") == b"x"
+    time.sleep(0.1)
+    assert first.get("short") is None
+    assert second.get("short") is None
+
+
+def test_delete_and_overwrite_reach_other_workers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = TieredCache(path, poll_seconds=0), TieredCache(path, poll_seconds=0)
+    first.set("key", "old")
+    assert second.get("key") == "old"  # now in the second worker's L1
+
+    first.set("key", "new")
+    assert second.get("key") == "new"
+    first.delete("key")
+    assert second.get("key") is None
+
+    # With a long poll interval the L1 copy is served until the next check
+    slow = TieredCache(path, poll_seconds=3600)
+    first.set("key", "v1")
+    assert slow.get("key") == "v1"
+    first.set("key", "v2")
+    assert slow.get("key") == "v1"
+
+
+def test_clear_reaches_other_workers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = TieredCache(path, poll_seconds=0), TieredCache(path, poll_seconds=0)
+    first.set("a", 1)
+    first.set("b", 2)
+    assert (second.get("a"), second.get("b")) == (1, 2)
+
+    first.clear()
+    assert (second.get("a"), second.get("b")) == (None, None)
+    first.set("a", 3)
+    assert second.get("a") == 3
+
+
+def test_curriculum_snapshot_is_built_from_the_shared_cache(curriculum_rows):
+    loading = MagicMock()
+    loading.run_query.return_value = curriculum_rows
+    curriculum_snapshot.ensure_fresh(loading)
+
+    # Another worker finds the tree in the shared cache and never queries Neo4j
+    other_worker = CurriculumSnapshot()
+    unavailable = MagicMock()
+    unavailable.run_query.side_effect = RuntimeError("Neo4j is down")
+    other_worker.ensure_fresh(unavailable)
+    unavailable.run_query.assert_not_called()
+    assert other_worker.get("structure") == curriculum_snapshot.get("structure")
+
+    curriculum_snapshot.invalidate()
+    other_worker.ensure_fresh(loading)
+    assert loading.run_query.call_count == 2
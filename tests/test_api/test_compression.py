@@ -0,0 +1,74 @@
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, brotli, choose_encoding
+
+BODY = b'{"goals": "' + "Rozwiązuje równania pierwszego stopnia. ".encode("utf-8") * 100 + b'"}'
+
+
+def make_client(**kwargs):
+    app = FastAPI()
+
+    @app.get("/tree")
+    def tree():
+        return Response(content=BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/live")
+    def live():
+        return Response(content=BODY, media_type="application/json")
+
+    @app.get("/small")
+    def small():
+        return {"status": "healthy"}
+
+    middleware = CompressionMiddleware(app, **kwargs)
+    return TestClient(middleware), middleware
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate", ("br", "gzip")) == "gzip"
+    assert choose_encoding("gzip;q=0.5, br", ("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0, *;q=0.1", ("br", "gzip")) == "gzip"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+    assert choose_encoding("", ("br", "gzip")) is None
+
+
+def test_gzip_above_threshold_only():
+    client, _ = make_client(minimum_size=500)
+    response = client.get("/live", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(BODY) / 10
+    assert response.content == BODY
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"status": "healthy"}
+
+    identity = client.get("/live", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers and identity.content == BODY
+
+
+def test_etag_responses_are_compressed_once():
+    client, middleware = make_client()
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    for encoding in encodings:
+        bodies = set()
+        for _ in range(3):
+            response = client.get("/tree", headers={"Accept-Encoding": encoding})
+            assert response.headers["content-encoding"] == encoding
+            assert response.headers["etag"] == 'W/"v1"'
+            assert response.content == BODY
+            bodies.add(response.headers["content-length"])
+        assert len(bodies) == 1
+    assert middleware.cache.misses == len(encodings)
+    assert middleware.cache.hits == 2 * len(encodings)
+
+
+
+def test_encoded_responses_carry_a_weak_etag():
+    client, _ = make_client()
+    identity = client.get("/tree", headers={"Accept-Encoding": "identity"})
+    encoded = client.get("/tree", headers={"Accept-Encoding": "gzip"})
+    assert identity.headers["etag"] == '"v1"'
+    assert encoded.headers["etag"] == 'W/"v1"'
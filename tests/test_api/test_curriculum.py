@@ -0,0 +1,63 @@
+from app.services.curriculum_snapshot import curriculum_snapshot
+
+
+def test_structure_has_strong_etag_and_cache_control(client, auth_headers, curriculum_rows):
+    response = client.get("/api/curriculum/structure", headers={**auth_headers, "Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    chapters = response.json()["chapters"]
+    assert [chapter["id"] for chapter in chapters] == ["C1", "C2", "C3"]
+    assert sum(len(requirement["goals"]) for chapter in chapters for requirement in chapter["requirements"]) == 12
+    assert response.headers["etag"].startswith('"') and not response.headers["etag"].startswith("W/")
+    assert "max-age=" in response.headers["cache-control"]
+
+
+def test_matching_if_none_match_returns_304(client, auth_headers, curriculum_rows):
+    etag = client.get("/api/curriculum/chapters", headers=auth_headers).headers["etag"]
+    for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        response = client.get("/api/curriculum/chapters", headers={**auth_headers, "If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    response = client.get("/api/curriculum/chapters", headers={**auth_headers, "If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+
+def test_etag_changes_with_the_curriculum(client, auth_headers, curriculum_rows):
+    etag = client.get("/api/curriculum/goals", headers=auth_headers).headers["etag"]
+    curriculum_rows[0]["goal_description"] = "Classify, compare and order real numbers"
+    curriculum_snapshot.invalidate()
+
+    response = client.get("/api/curriculum/goals", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()[0] == {"id": "G1", "description": "Classify, compare and order real numbers"}
+
+
+def test_chapter_detail(client, auth_headers, curriculum_rows):
+    response = client.get("/api/curriculum/chapters/C2", headers=auth_headers)
+    assert response.status_code == 200
+    assert [requirement["id"] for requirement in response.json()["requirements"]] == ["R3", "R4"]
+
+    missing = client.get("/api/curriculum/chapters/C9", headers={**auth_headers, "If-None-Match": "*"})
+    assert missing.status_code == 404
+
+
+def test_curriculum_requires_auth(client, curriculum_rows):
+    assert client.get("/api/curriculum/structure").status_code == 401
+
+
+def test_structure_is_gzipped(client, auth_headers, curriculum_rows):
+    plain = client.get("/api/curriculum/structure", headers={**auth_headers, "Accept-Encoding": "identity"})
+    response = client.get("/api/curriculum/structure", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(plain.content)
+    assert response.json() == plain.json()
+    # A different representation: the ETag is weak, and still revalidates
+    assert response.headers["etag"] == f"W/{plain.headers['etag']}"
+    revalidated = client.get(
+        "/api/curriculum/structure",
+        headers={**auth_headers, "Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
@@ -0,0 +1,102 @@
+import asyncio
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.startup import FAILED, READY, Startup
+
+
+def sleeper(seconds):
+    return lambda: time.sleep(seconds)
+
+
+def fail():
+    raise ConnectionError("Neo4j is down")
+
+
+def test_critical_steps_run_concurrently_and_deferred_after():
+    async def run():
+        startup = Startup()
+        await startup.initialize(
+            {"sqlite": sleeper(0.2), "neo4j": sleeper(0.2)},
+            [("neo4j_schema", fail), ("curriculum", sleeper(0.01))],
+        )
+        assert startup.ready and not startup.complete
+        await startup.background
+        return startup
+
+    startup = asyncio.run(run())
+    assert startup.critical_elapsed_ms < 350
+    report = startup.report()
+    assert report["status"] == "ready" and report["startup_complete"]
+    assert report["dependencies"]["neo4j_schema"]["status"] == FAILED
+    assert report["dependencies"]["neo4j_schema"]["error"] == "ConnectionError: Neo4j is down"
+    assert report["dependencies"]["curriculum"]["status"] == READY
+    assert report["dependencies"]["sqlite"]["elapsed_ms"] >= 200
+
+
+def flaky(failures):
+    """A step that fails `failures` times, then succeeds"""
+    calls = []
+
+    def step():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise ConnectionError("Neo4j is down")
+    return step
+
+
+def test_critical_failure_is_retried_before_deferred_steps():
+    async def run():
+        startup = Startup()
+        await startup.initialize(
+            {"sqlite": sleeper(0), "neo4j": flaky(2)}, [("curriculum", sleeper(0))], retry_delay=0.01,
+        )
+        assert not startup.ready
+        assert startup.steps["neo4j"].status == FAILED
+        assert startup.steps["curriculum"].status == "pending"
+        await startup.background
+        return startup
+
+    startup = asyncio.run(run())
+    assert startup.ready and startup.complete
+    assert startup.steps["neo4j"].attempts == 3 and startup.steps["neo4j"].error is None
+    assert startup.steps["sqlite"].attempts == 1
+    assert startup.steps["curriculum"].status == READY
+
+
+def test_liveness_and_readiness(monkeypatch):
+    neo4j_step = flaky(1)
+    monkeypatch.setattr(main, "startup", Startup())
+    monkeypatch.setattr(main.settings, "STARTUP_RETRY_INITIAL_SECONDS", 0.2)
+    monkeypatch.setattr(main, "startup_steps", lambda create_sample_data=False: (
+        {"sqlite": sleeper(0), "neo4j": neo4j_step}, [("sample_data", sleeper(0))],
+    ))
+
+    with TestClient(main.app) as running:
+        # The app serves while a critical dependency is down, but is not ready
+        assert running.get("/health/live").json()["status"] == "alive"
+        not_ready = running.get("/health/ready")
+        assert not_ready.status_code == 503 and not_ready.json()["status"] == "starting"
+        assert not_ready.json()["dependencies"]["neo4j"]["error"] == "ConnectionError: Neo4j is down"
+
+        async def wait_for_startup():
+            await main.startup.background
+
+        running.portal.call(wait_for_startup)
+        ready = running.get("/health/ready")
+        assert ready.status_code == 200
+        assert set(ready.json()["dependencies"]) == {"sqlite", "neo4j", "sample_data"}
+        assert ready.json()["dependencies"]["neo4j"]["attempts"] == 2
+        assert ready.json()["critical_init_ms"] is not None
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    probe = "import sys, app.main; print(' '.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    loaded = set(result.stdout.split())
+    assert "app.main" in loaded
+    assert not {"numpy", "scipy", "passlib", "neo4j"} & loaded
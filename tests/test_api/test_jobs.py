@@ -0,0 +1,211 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.jobs import ASYNC, PROCESS, Job, JobQueueFull, JobRunner, JobStore, JobType, job_runner
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services import jobs
+
+
+class Number(BaseModel):
+    value: int
+
+
+def square(payload: Number) -> int:
+    # Module level so the process pool can pickle it
+    return payload.value ** 2
+
+
+def make_runner(record, **job_options):
+    async def handler(payload: Number):
+        record.append(payload.value)
+
+    runner = JobRunner(retry_delay_seconds=0)
+    runner.register(JobType("record", handler, Number, executor=ASYNC, **job_options))
+    return runner
+
+
+def test_jobs_run_and_are_removed_from_the_journal():
+    record = []
+
+    async def run():
+        runner = make_runner(record, dedupe_key=lambda payload: str(payload.value))
+        await runner.start(":memory:")
+        first = await runner.submit("record", {"value": 1})
+        duplicate = await runner.submit("record", {"value": 1})
+        await runner.submit("record", Number(value=2))
+        await runner.join()
+        counts = runner.store.counts()
+        await runner.stop()
+        return first, duplicate, counts
+
+    first, duplicate, counts = asyncio.run(run())
+    assert first is not None and duplicate is None
+    assert record == [1, 2]
+    assert counts == {}
+
+
+def test_full_queue_is_rejected():
+    release = None
+
+    async def blocked(payload: Number):
+        await release.wait()
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        runner = JobRunner()
+        runner.register(JobType("blocked", blocked, Number, executor=ASYNC, max_queue=1))
+        await runner.start(":memory:")
+        await runner.submit("blocked", {"value": 1})
+        await asyncio.sleep(0.01)  # the worker takes the first job
+        await runner.submit("blocked", {"value": 2})
+        with pytest.raises(JobQueueFull):
+            await runner.submit("blocked", {"value": 3})
+        release.set()
+        await runner.stop()
+
+    asyncio.run(run())
+
+
+def test_failed_jobs_are_retried_then_kept_as_failed():
+    attempts = []
+
+    async def flaky(payload: Number):
+        attempts.append(payload.value)
+        if payload.value == 1 or len(attempts) < 2:
+            raise ValueError("boom")
+
+    async def run():
+        runner = JobRunner(retry_delay_seconds=0)
+        runner.register(JobType("flaky", flaky, Number, executor=ASYNC, max_attempts=2))
+        await runner.start(":memory:")
+        await runner.submit("flaky", {"value": 2})
+        await runner.submit("flaky", {"value": 1})
+        for _ in range(50):
+            await runner.join()
+            await asyncio.sleep(0.01)
+            if len(runner.store.failed()) == 1 and len(attempts) == 4:
+                break
+        failed = runner.store.failed()
+        await runner.stop()
+        return failed
+
+    failed = asyncio.run(run())
+    assert sorted(attempts) == [1, 1, 2, 2]
+    assert [(job["payload"], job["attempts"]) for job in failed] == [({"value": 1}, 2)]
+    assert failed[0]["error"] == "ValueError: boom"
+
+
+def test_unfinished_jobs_are_recovered_on_start(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    record = []
+
+    async def stuck(payload: Number):
+        await asyncio.Event().wait()
+
+    async def run():
+        runner = JobRunner()
+        runner.register(JobType("record", stuck, Number, executor=ASYNC))
+        await runner.start(path)
+        await runner.submit("record", {"value": 7})
+        await runner.submit("record", {"value": 8})
+        # Shut down while one job runs and one waits; both stay journaled
+        await runner.stop(timeout=0.05)
+
+        restarted = make_runner(record)
+        await restarted.start(path)
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            await restarted.join()
+            if len(record) == 2:
+                break
+        counts = restarted.store.counts()
+        await restarted.stop()
+        return counts
+
+    assert asyncio.run(run()) == {}
+    assert record == [7, 8]
+
+
+def test_runners_share_a_journal_and_run_each_job_once(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    record = []
+    release = None
+
+    async def gated(payload: Number):
+        await release.wait()
+        record.append(payload.value)
+
+    def make_gated_runner():
+        runner = JobRunner()
+        runner.register(JobType("record", gated, Number, executor=ASYNC))
+        return runner
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        first, second = make_gated_runner(), make_gated_runner()
+        await first.start(path, lease_seconds=0.1)
+        for value in range(1, 6):
+            await first.submit("record", {"value": value})
+        # Starting a second runner while the first one's jobs wait takes none of them
+        await second.start(path, lease_seconds=0.1)
+        for value in range(6, 11):
+            await second.submit("record", {"value": value})
+        # A worker that died with a job journaled: its lease runs out and one runner takes it over
+        crashed = JobStore(path, lease_seconds=0)
+        crashed.add(Job("record", Number(value=11)))
+        crashed.close()
+
+        await asyncio.sleep(0.3)  # several lease renewals
+        release.set()
+        for _ in range(50):
+            await asyncio.gather(first.join(), second.join())
+            await asyncio.sleep(0.01)
+            if len(record) == 11:
+                break
+        await asyncio.sleep(0.1)
+        counts = first.store.counts()
+        await first.stop()
+        await second.stop()
+        return counts
+
+    assert asyncio.run(run()) == {}
+    assert sorted(record) == list(range(1, 12))
+
+
+def test_process_executor():
+    async def run():
+        runner = JobRunner()
+        runner.register(JobType("square", square, Number, executor=PROCESS))
+        await runner.start(":memory:")
+        await runner.submit("square", {"value": 3})
+        await runner.join()
+        counts = runner.store.counts()
+        await runner.stop()
+        return counts
+
+    assert asyncio.run(run()) == {}
+
+
+def test_admin_job_endpoints_and_metrics(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["testuser"])
+    response = client.post("/api/admin/jobs/rebuild_goal_stats", headers=auth_headers)
+    assert response.status_code == 202
+    client.portal.call(job_runner.join)
+
+    assert client.post("/api/admin/jobs/unknown", headers=auth_headers).status_code == 404
+    invalid = client.post("/api/admin/jobs/precompute_recommendations", json={"workers": "many"}, headers=auth_headers)
+    assert invalid.status_code == 422
+
+    body = client.get("/api/admin/jobs", headers=auth_headers).json()
+    assert body["running"] is True
+    assert set(body["types"]) >= {jobs.REFRESH_RECOMMENDATIONS, jobs.REBUILD_GOAL_STATS}
+    assert body["journal"] == {}
+
+    metrics = registry.render()
+    assert 'background_jobs_total{job_type="rebuild_goal_stats",outcome="succeeded"}' in metrics
+    assert 'background_job_queue_depth{job_type="refresh_recommendations"} 0' in metrics
@@ -0,0 +1,105 @@
+import re
+
+from app.core.metrics import REQUEST_DB_TIME, REQUESTS, Counter, Histogram
+from app.db import neo4j
+
+
+def sample(text, line_prefix):
+    """Value of the first exposition line starting with `line_prefix`"""
+    match = re.search(rf"^{re.escape(line_prefix)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_histogram_exposition():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+    counter = Counter("odd_total", "Odd labels", ("name",))
+    counter.inc('say "hi"\n')
+    assert counter.render()[-1] == 'odd_total{name="say \\"hi\\"\\n"} 1'
+
+
+def test_requests_are_counted_by_route_template(client):
+    before = REQUESTS.value("GET", "/health", "200")
+    client.get("/health")
+    client.get("/health")
+    client.get("/does/not/exist/42")
+    assert REQUESTS.value("GET", "/health", "200") == before + 2
+    assert REQUESTS.value("GET", "unmatched", "404") >= 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, 'http_requests_total{method="GET",route="/health",status="200"}') == before + 2
+    assert sample(text, 'http_request_duration_seconds_count{method="GET",route="/health"}') >= 2
+    assert sample(text, 'http_requests_in_progress{method="GET"}') == 1
+    assert "/does/not/exist/42" not in text
+
+
+def test_db_and_neo4j_time_are_attributed_to_the_route(client, auth_headers):
+    route = "/api/auth/user"
+    count = REQUEST_DB_TIME.count(route)
+    client.get(route, headers=auth_headers)
+    assert REQUEST_DB_TIME.count(route) == count + 1
+
+    text = client.get("/metrics").text
+    assert sample(text, f'http_request_db_seconds_sum{{route="{route}"}}') > 0
+    assert sample(text, f'http_request_neo4j_seconds_sum{{route="{route}"}}') == 0
+
+
+def test_neo4j_transactions_add_request_time(monkeypatch):
+    from app.core import metrics
+
+    timings = metrics.RequestTimings()
+    token = metrics._current_timings.set(timings)
+    try:
+        database = neo4j.Neo4jDatabase()
+        monkeypatch.setattr(database, "session", lambda *args, **kwargs: _Session())
+        database.run_query("RETURN 1")
+    finally:
+        metrics._current_timings.reset(token)
+    assert timings.neo4j_transactions == 1
+    assert timings.neo4j_seconds > 0
+
+
+def test_route_template_keeps_parameters(client, auth_headers):
+    neo4j.neo4j_db.run_query.return_value = []
+    client.post("/api/progress/goals/G1/practice", headers=auth_headers)
+    assert REQUEST_DB_TIME.count("/api/progress/goals/{goal_id}/practice") >= 1
+    assert REQUEST_DB_TIME.count("/api/progress/goals/G1/practice") == 0
+
+
+class _Session:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, text, parameters):
+        return _Result()
+
+    def last_bookmarks(self):
+        return None
+
+
+class _Result:
+    def __iter__(self):
+        return iter([{"n": 1}])
+
+    def data(self):
+        return [{"n": 1}]
+
+    def consume(self):
+        return None
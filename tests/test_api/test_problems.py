@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.jobs import job_runner
+from app.db import neo4j
+from app.models.recommendations import UserRecommendations
+from app.models.users import GoalProgress, User
+from app.services.recommendations import RECOMMENDATION_LIMIT
+from app.services.recommendation_index import goal_problem_index
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(scope="module")
+def recommendation_data(test_db):
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.username == "testuser").first()
+    db.add(GoalProgress(user_id=user.id, goal_id="G1", mastery_level=0.1, attempts_count=3))
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    goal_problem_index.build([
+        ("P1", ["G1"], 2, "Algebra"),
+        ("P2", ["G2"], 1, "Geometry"),
+        ("P3", ["G1", "G2"], 4, "Algebra"),
+    ])
+    yield user_id
+
+    goal_problem_index.build([])
+    goal_problem_index.built_at = None
+    db = TestingSessionLocal()
+    db.query(UserRecommendations).delete()
+    db.query(GoalProgress).filter(GoalProgress.user_id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def stored(user_id):
+    db = TestingSessionLocal()
+    row = db.get(UserRecommendations, user_id)
+    db.close()
+    return row
+
+
+def test_recommendations_computed_online_when_missing(client, auth_headers, recommendation_data):
+    def run_query(query, params=None, **kwargs):
+        if "(g:Goal)" in query:
+            return [{"id": "G1", "description": "Solves linear equations"}]
+        return [{"id": "P1", "text": "Solve 2x = 4", "subject_area": "Algebra"}]
+
+    neo4j.neo4j_db.run_query.side_effect = run_query
+    try:
+        response = client.get("/api/problems/recommendations", headers=auth_headers)
+        filtered = client.get(
+            "/api/problems/recommendations",
+            params={"subject_area": "Algebra", "max_difficulty": 3},
+            headers=auth_headers,
+        ).json()
+    finally:
+        neo4j.neo4j_db.run_query.side_effect = None
+    assert response.status_code == 200
+    items = response.json()
+    assert {item["problem_id"] for item in items} == {"P1", "P2", "P3"}
+    assert stored(recommendation_data) is not None
+
+    assert [item["problem_id"] for item in filtered] == ["P1"]
+    assert filtered[0]["problem_text"] == "Solve 2x = 4"
+    assert filtered[0]["related_goals"] == [{"id": "G1", "description": "Solves linear equations"}]
+
+
+def test_fresh_precomputed_list_is_served(client, auth_headers, recommendation_data):
+    db = TestingSessionLocal()
+    db.query(UserRecommendations).delete()
+    db.add(UserRecommendations(
+        user_id=recommendation_data,
+        recommendations=[{"problem_id": "P9", "score": 1.0, "difficulty": 1, "subject_area": "Algebra", "goal_ids": []}],
+        generated_at=datetime.utcnow(),
+    ))
+    db.commit()
+    db.close()
+
+    items = client.get("/api/problems/recommendations", headers=auth_headers).json()
+    assert [item["problem_id"] for item in items] == ["P9"]
+
+
+def test_stale_list_is_served_and_refreshed_in_background(client, auth_headers, recommendation_data):
+    db = TestingSessionLocal()
+    row = db.get(UserRecommendations, recommendation_data)
+    row.generated_at = datetime.utcnow() - timedelta(days=2)
+    db.commit()
+    db.close()
+
+    items = client.get("/api/problems/recommendations", headers=auth_headers).json()
+    assert [item["problem_id"] for item in items] == ["P9"]
+
+    client.portal.call(job_runner.join)
+    refreshed = stored(recommendation_data)
+    assert refreshed.generated_at > datetime.utcnow() - timedelta(minutes=1)
+    assert "P9" not in [entry["problem_id"] for entry in refreshed.recommendations]
+
+
+def test_filtered_request_rescored_when_stored_list_comes_up_short(client, auth_headers, recommendation_data):
+    db = TestingSessionLocal()
+    db.query(UserRecommendations).delete()
+    db.add(UserRecommendations(
+        user_id=recommendation_data,
+        recommendations=[
+            {"problem_id": f"X{i}", "score": 1.0, "difficulty": 2, "subject_area": "Algebra", "goal_ids": []}
+            for i in range(RECOMMENDATION_LIMIT)
+        ],
+        generated_at=datetime.utcnow(),
+    ))
+    db.commit()
+    db.close()
+
+    # No Geometry problem made the stored top-N, but P2 matches
+    items = client.get("/api/problems/recommendations?subject_area=Geometry", headers=auth_headers).json()
+    assert [item["problem_id"] for item in items] == ["P2"]
+    # Unfiltered requests are still served from the stored list
+    items = client.get("/api/problems/recommendations?limit=3", headers=auth_headers).json()
+    assert [item["problem_id"] for item in items] == ["X0", "X1", "X2"]
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.users import GoalProgress, ProblemHistory, User
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(scope="module")
+def progress_data(test_db):
+    # Give the test user some goal progress and problem history
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.username == "testuser").first()
+    db.add_all([
+        GoalProgress(user_id=user.id, goal_id="G1", mastery_level=0.2, attempts_count=5, successful_attempts=1),
+        GoalProgress(user_id=user.id, goal_id="G2", mastery_level=0.9, attempts_count=4, successful_attempts=4),
+        GoalProgress(user_id=user.id, goal_id="G3", mastery_level=0.5, attempts_count=2, successful_attempts=1),
+    ])
+    now = datetime.utcnow()
+    for i in range(7):
+        db.add(ProblemHistory(
+            user_id=user.id,
+            problem_id=f"P{i}",
+            attempted_at=now - timedelta(days=i),
+            completed=i % 2 == 0,
+            steps_completed=2,
+        ))
+    db.commit()
+    db.close()
+
+
+def test_list_goal_progress(client, auth_headers, progress_data):
+    response = client.get("/api/progress/goals", headers=auth_headers)
+    assert response.status_code == 200
+    page = response.json()
+    assert [goal["goal_id"] for goal in page["items"]] == ["G1", "G2", "G3"]
+    assert page["next_cursor"] is None
+
+
+def test_goal_progress_pages(client, auth_headers, progress_data):
+    first = client.get("/api/progress/goals", params={"limit": 2}, headers=auth_headers).json()
+    assert [goal["goal_id"] for goal in first["items"]] == ["G1", "G2"]
+    second = client.get(
+        "/api/progress/goals", params={"limit": 2, "cursor": first["next_cursor"]}, headers=auth_headers
+    ).json()
+    assert [goal["goal_id"] for goal in second["items"]] == ["G3"]
+    assert second["next_cursor"] is None
+
+
+def test_problem_history_pages_are_stable_under_inserts(client, auth_headers, progress_data):
+    first = client.get("/api/progress/history", params={"limit": 3}, headers=auth_headers).json()
+    assert [entry["problem_id"] for entry in first["items"]] == ["P0", "P1", "P2"]
+
+    # A new attempt arriving between page fetches must not shift the next page
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.username == "testuser").first()
+    new_attempt = ProblemHistory(user_id=user.id, problem_id="P-new", attempted_at=datetime.utcnow())
+    db.add(new_attempt)
+    db.commit()
+
+    seen = [entry["problem_id"] for entry in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(
+            "/api/progress/history", params={"limit": 3, "cursor": cursor}, headers=auth_headers
+        ).json()
+        seen += [entry["problem_id"] for entry in page["items"]]
+        cursor = page["next_cursor"]
+    assert seen == ["P0", "P1", "P2", "P3", "P4", "P5", "P6"]
+
+    db.delete(new_attempt)
+    db.commit()
+    db.close()
+
+
+def test_tampered_cursor_is_rejected(client, auth_headers, progress_data):
+    first = client.get("/api/progress/goals", params={"limit": 1}, headers=auth_headers).json()
+    payload, signature = first["next_cursor"].split(".")
+    response = client.get(
+        "/api/progress/goals", params={"cursor": payload[:-2] + "AA." + signature}, headers=auth_headers
+    )
+    assert response.status_code == 400
+    # Cursors are scoped to a listing
+    response = client.get("/api/progress/history", params={"cursor": first["next_cursor"]}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_progress_summary(client, auth_headers, progress_data):
+    response = client.get("/api/progress/summary", headers=auth_headers)
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["total_problems_attempted"] == 7
+    assert summary["problems_completed"] == 4
+    assert summary["average_mastery"] == pytest.approx(0.53, abs=0.01)
+    assert summary["struggling_areas"] == ["G1"]
+    assert summary["strongest_areas"] == ["G2"]
+    # Most recent attempts come first
+    assert [entry["problem_id"] for entry in summary["recent_activity"]] == ["P0", "P1", "P2", "P3", "P4"]
+
+
+def test_progress_requires_token(client):
+    response = client.get("/api/progress/goals")
+    assert response.status_code == 401
+
+
+def test_knowledge_gaps(client, auth_headers, progress_data):
+    from app.db.curriculum_import import SAMPLE_CURRICULUM_PATH, collect_curriculum, read_curriculum_files
+    from app.services.knowledge_gaps import prerequisite_graph
+
+    curriculum = collect_curriculum(read_curriculum_files([str(SAMPLE_CURRICULUM_PATH)]))
+    prerequisite_graph.build(sorted(curriculum.goals), sorted(curriculum.links))
+    try:
+        response = client.get("/api/progress/gaps", headers=auth_headers)
+    finally:
+        prerequisite_graph.loaded = False
+    assert response.status_code == 200
+    # Weak G1 (0.2) has no prerequisites, so it is its own root cause
+    assert [gap["goal_id"] for gap in response.json()] == ["G1"]
+    assert response.json()[0]["mastery_level"] == 0.2
+
+
+def test_goal_practice_updates_class_stats(client, auth_headers, progress_data, monkeypatch):
+    response = client.post("/api/progress/goals/G7/practice", json={"successful": True}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["attempts_count"] == 1
+    client.post("/api/progress/goals/G7/practice", json={"successful": False}, headers=auth_headers)
+
+    # Class-wide statistics are for admins only
+    assert client.get("/api/progress/class/goals", headers=auth_headers).status_code == 403
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["testuser"])
+    stats = client.get("/api/progress/class/goals", headers=auth_headers).json()
+    g7 = next(goal for goal in stats if goal["goal_id"] == "G7")
+    assert (g7["students"], g7["attempts_count"], g7["successful_attempts"]) == (1, 2, 1)
+    assert g7["average_mastery"] == 0.5
+    assert g7["mastery_histogram"] == [0, 0, 1, 0, 0]
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.problems import require_token_budget
+from app.core.config import settings
+from app.core.rate_limit import BucketStore, MemoryBucketStore, RateLimiter, SQLiteBucketStore, refill_and_take
+from app.models.users import User
+from app.services import usage
+from tests.conftest import TestingAsyncSessionLocal
+
+
+def test_token_bucket_refill_and_retry_after():
+    state, result = refill_and_take(None, capacity=2, rate=1.0, cost=1, now=100.0)
+    assert result.allowed and result.remaining == 1
+    state, result = refill_and_take(state, 2, 1.0, 1, now=100.0)
+    state, result = refill_and_take(state, 2, 1.0, 1, now=100.0)
+    assert not result.allowed
+    assert result.retry_after == pytest.approx(1.0)
+    assert result.retry_after_header == "1"
+    # Half a second refills half a token, not enough yet
+    _, result = refill_and_take(state, 2, 1.0, 1, now=100.5)
+    assert not result.allowed and result.retry_after == pytest.approx(0.5)
+    # Refill is capped at the capacity
+    _, result = refill_and_take(state, 2, 1.0, 1, now=1000.0)
+    assert result.allowed and result.remaining == 1
+
+
+def test_memory_store_keys_are_independent():
+    limiter = RateLimiter("user", per_minute=1, burst=1, store=MemoryBucketStore())
+    assert limiter.hit("1").allowed
+    assert not limiter.hit("1").allowed
+    assert limiter.hit("2").allowed
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    first = RateLimiter("ip", per_minute=6, burst=2, store=SQLiteBucketStore(path))
+    second = RateLimiter("ip", per_minute=6, burst=2, store=SQLiteBucketStore(path))
+    assert first.hit("10.0.0.1").allowed
+    assert second.hit("10.0.0.1").allowed
+    result = first.hit("10.0.0.1")
+    assert not result.allowed
+    assert result.retry_after_header in ("9", "10")
+    assert second.store.prune(older_than_seconds=3600) == 0
+
+
+def test_problems_router_returns_429_with_retry_after(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_BURST", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_PER_MINUTE", 1)
+
+    assert client.get("/api/problems/usage", headers=auth_headers).status_code == 200
+    assert client.get("/api/problems/usage", headers=auth_headers).status_code == 200
+    response = client.get("/api/problems/usage", headers=auth_headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == 60
+
+
+def test_ip_limit_applies_before_authentication(client, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_IP_BURST", 1)
+    monkeypatch.setattr(settings, "RATE_LIMIT_IP_PER_MINUTE", 1)
+
+    assert client.get("/api/problems/usage").status_code == 401
+    assert client.get("/api/problems/usage").status_code == 429
+
+
+def test_token_usage_ledger_and_budget(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "DAILY_TOKEN_BUDGET", 1000)
+
+    async def spend():
+        async with TestingAsyncSessionLocal() as db:
+            user_id = await db.scalar(select(User.id).where(User.username == "testuser"))
+            await usage.record_usage(db, user_id, 300, 200)
+            await usage.record_usage(db, user_id, 100, 50, now=datetime(2020, 1, 1))
+            await db.commit()
+            return user_id
+
+    user_id = asyncio.run(spend())
+    body = client.get("/api/problems/usage", headers=auth_headers).json()
+    assert body["requests"] == 1
+    assert (body["prompt_tokens"], body["completion_tokens"]) == (300, 200)
+    assert (body["daily_budget"], body["remaining"]) == (1000, 500)
+
+    async def check_budget():
+        async with TestingAsyncSessionLocal() as db:
+            user = await db.get(User, user_id)
+            assert await require_token_budget(user, db) == 500
+            await usage.record_usage(db, user_id, 400, 100)
+            await db.commit()
+            with pytest.raises(HTTPException) as error:
+                await require_token_budget(user, db)
+            return error.value
+
+    error = asyncio.run(check_budget())
+    assert error.status_code == 429
+    assert 0 < int(error.headers["Retry-After"]) <= 86400
+    body = client.get("/api/problems/usage", headers=auth_headers).json()
+    assert (body["requests"], body["remaining"]) == (2, 0)
+
+    monkeypatch.setattr(settings, "DAILY_TOKEN_BUDGET", 0)
+    body = client.get("/api/problems/usage", headers=auth_headers).json()
+    assert (body["daily_budget"], body["remaining"]) == (None, None)
+
+
+def test_bucket_store_is_abstract():
+    with pytest.raises(TypeError):
+        BucketStore()
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.responses import FastJSONResponse, dumps
+from app.schemas.problems import CurriculumGoal, ProblemHistoryResponse, RequirementBase
+
+
+def history_item(i):
+    return ProblemHistoryResponse(
+        problem_id=f"P{i}", problem_text="Solve 2x + 3 = 7", subject_area="algebra",
+        attempted_at=datetime(2024, 5, 1, 12, i), completed=True, steps_completed=2, steps_with_hints=0,
+    )
+
+
+def test_dumps_matches_the_default_encoding():
+    goal = CurriculumGoal(id="G1", description="Równania", requirements=[RequirementBase(id="R1", description="x")])
+    assert json.loads(dumps(goal)) == json.loads(goal.model_dump_json())
+    assert json.loads(dumps({"goals": [goal], "ids": {"G1"}})) == {"goals": [goal.model_dump()], "ids": ["G1"]}
+    assert json.loads(dumps([history_item(0)]))[0]["attempted_at"] == "2024-05-01T12:00:00"
+
+
+def test_fast_json_response_class():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/history", response_model=List[ProblemHistoryResponse])
+    def history():
+        return [history_item(i) for i in range(3)]
+
+    @app.get("/raw")
+    def raw():
+        return {"item": history_item(0)}
+
+    client = TestClient(app)
+    response = client.get("/history")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [json.loads(history_item(i).model_dump_json()) for i in range(3)]
+    assert client.get("/raw").json()["item"]["problem_id"] == "P0"
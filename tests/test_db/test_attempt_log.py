@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import attempt_log
+from app.db.base import Base
+
+
+@pytest.fixture
+def db():
+    # Fresh in-memory database per test
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def add_attempts(db, user_id, moments, completed=True):
+    for i, moment in enumerate(moments):
+        attempt_log.append_attempt(
+            db, user_id=user_id, problem_id=f"P{i}", attempted_at=moment,
+            completed=completed, time_spent_seconds=60, steps_completed=2,
+        )
+    db.commit()
+
+
+def test_attempts_are_routed_to_monthly_partitions(db):
+    add_attempts(db, 1, [datetime(2026, 8, 31, 23), datetime(2026, 9, 1), datetime(2026, 10, 5)])
+    assert attempt_log.list_partitions(db) == [
+        "problem_attempt_log_202608",
+        "problem_attempt_log_202609",
+        "problem_attempt_log_202610",
+    ]
+    # Every partition gets the composite (user_id, attempted_at) index
+    indexes = db.execute(text("PRAGMA index_list('problem_attempt_log_202609')")).all()
+    assert "ix_problem_attempt_log_202609_user_attempted" in [index.name for index in indexes]
+
+
+def test_partition_rolled_back_with_its_transaction_is_created_again(db):
+    add_attempts(db, 1, [datetime(2026, 8, 7)])
+    # The first insert opens the transaction, so the September partition is created inside it
+    attempt_log.append_attempt(db, user_id=1, problem_id="P1", attempted_at=datetime(2026, 8, 8))
+    attempt_log.append_attempt(db, user_id=1, problem_id="P2", attempted_at=datetime(2026, 9, 7))
+    db.rollback()
+    assert attempt_log.list_partitions(db) == ["problem_attempt_log_202608"]
+
+    add_attempts(db, 1, [datetime(2026, 9, 8)])
+    assert attempt_log.list_partitions(db) == ["problem_attempt_log_202608", "problem_attempt_log_202609"]
+    assert len(attempt_log.query_attempts(db, 1, datetime(2026, 8, 1), datetime(2026, 10, 1))) == 2
+
+
+def test_query_prunes_to_overlapping_partitions(db):
+    add_attempts(db, 1, [datetime(2026, 6, 10), datetime(2026, 8, 10), datetime(2026, 9, 10), datetime(2026, 10, 10)])
+    add_attempts(db, 2, [datetime(2026, 9, 11)])
+
+    start, end = datetime(2026, 8, 15), datetime(2026, 10, 1)
+    assert attempt_log.partitions_for_range(db, start, end) == [
+        "problem_attempt_log_202608",
+        "problem_attempt_log_202609",
+    ]
+    attempts = attempt_log.query_attempts(db, 1, datetime(2026, 8, 1), end)
+    assert [attempt.attempted_at for attempt in attempts] == [datetime(2026, 9, 10), datetime(2026, 8, 10)]
+
+
+def test_weekly_stats(db):
+    add_attempts(db, 1, [datetime(2026, 9, 7), datetime(2026, 9, 9), datetime(2026, 9, 15)])
+    stats = attempt_log.weekly_attempt_stats(db, 1, datetime(2026, 9, 1), datetime(2026, 10, 1))
+    assert [(week["week_start"].isoformat(), week["attempts"]) for week in stats] == [
+        ("2026-09-07", 2),
+        ("2026-09-14", 1),
+    ]
+    assert stats[0]["time_spent_seconds"] == 120
+
+
+def test_log_is_append_only(db):
+    add_attempts(db, 1, [datetime(2026, 9, 7)])
+    with pytest.raises(DatabaseError, match="append-only"):
+        db.execute(text("UPDATE problem_attempt_log_202609 SET completed = 0"))
+
+
+def test_rollup_aggregates_and_drops_old_partitions(db):
+    add_attempts(db, 1, [datetime(2025, 1, 3), datetime(2025, 1, 20)])
+    add_attempts(db, 1, [datetime(2025, 1, 21)], completed=False)
+    add_attempts(db, 1, [datetime(2026, 9, 7)])
+
+    rolled_up = attempt_log.rollup_partitions(db, retain_months=12, now=datetime(2026, 10, 19))
+    assert rolled_up == ["problem_attempt_log_202501"]
+    assert attempt_log.list_partitions(db) == ["problem_attempt_log_202609"]
+
+    rollups = attempt_log.monthly_rollups(db, 1)
+    assert len(rollups) == 1
+    assert rollups[0].month.isoformat() == "2025-01-01"
+    assert (rollups[0].attempts_count, rollups[0].completed_count) == (3, 2)
+    assert rollups[0].time_spent_seconds == 180
+
+    # The dropped month can be written again later without stale partition state
+    add_attempts(db, 1, [datetime(2025, 1, 5)])
+    assert "problem_attempt_log_202501" in attempt_log.list_partitions(db)
+
+
+def test_rolling_up_a_month_twice_adds_to_the_totals(db):
+    add_attempts(db, 1, [datetime(2025, 1, 3), datetime(2025, 1, 20)])
+    attempt_log.rollup_partitions(db, retain_months=12, now=datetime(2026, 10, 19))
+    add_attempts(db, 1, [datetime(2025, 1, 25)], completed=False)
+    assert attempt_log.rollup_partitions(db, retain_months=12, now=datetime(2026, 10, 19)) == [
+        "problem_attempt_log_202501",
+    ]
+
+    rollups = attempt_log.monthly_rollups(db, 1)
+    assert len(rollups) == 1
+    assert (rollups[0].attempts_count, rollups[0].completed_count) == (3, 2)
+    assert (rollups[0].time_spent_seconds, rollups[0].steps_completed) == (180, 6)
@@ -0,0 +1,177 @@
+import csv
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.cache import get_shared_cache
+from app.db import queries
+from app.db.curriculum_import import (
+    CSV_COLUMNS, LABELS, SAMPLE_CURRICULUM_PATH, ExistingCurriculum, apply_plan, collect_curriculum,
+    grade_levels, import_curriculum, plan_import, read_curriculum_files,
+)
+from app.services.curriculum_snapshot import CACHE_KEY
+
+
+def existing_from(curriculum):
+    """Graph state right after importing `curriculum`"""
+    nodes = (curriculum.chapters, curriculum.requirements, curriculum.goals)
+    hashes = {
+        label: {node_id: node["content_hash"] for node_id, node in items.items()}
+        for label, items in zip(LABELS, nodes)
+    }
+    return ExistingCurriculum(hashes, set(curriculum.links), grade_levels(curriculum))
+
+
+def sample_records():
+    return list(read_curriculum_files([str(SAMPLE_CURRICULUM_PATH)]))
+
+
+def test_sample_curriculum_file():
+    curriculum = collect_curriculum(sample_records())
+    assert (len(curriculum.chapters), len(curriculum.requirements), len(curriculum.goals)) == (3, 6, 12)
+    assert curriculum.links == {
+        ("G1", "G2"), ("G1", "G3"), ("G3", "G4"), ("G4", "G5"), ("G7", "G5"),
+        ("G5", "G6"), ("G7", "G8"), ("G4", "G9"), ("G9", "G10"), ("G11", "G12"),
+    }
+
+
+def test_csv_and_json_produce_the_same_nodes(tmp_path):
+    records = sample_records()
+    path = tmp_path / "grade_8.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow({**record, "prerequisites": ";".join(record["prerequisites"])})
+
+    from_json = collect_curriculum(records)
+    from_csv = collect_curriculum(read_curriculum_files([str(tmp_path)]))
+    assert from_csv == from_json
+
+
+def test_reimport_only_touches_changed_nodes():
+    records = sample_records()
+    curriculum = collect_curriculum(records)
+    existing = existing_from(curriculum)
+    assert plan_import(curriculum, existing).is_empty
+
+    records[0]["goal_description"] = "Classify, compare and order real numbers"
+    # Move G12 under R5
+    records[-1]["requirement_id"], records[-1]["requirement_description"] = (
+        records[8]["requirement_id"], records[8]["requirement_description"]
+    )
+    records.append({**records[0], "goal_id": "G13", "goal_description": "Round real numbers", "prerequisites": ["G1"]})
+    plan = plan_import(collect_curriculum(records), existing)
+
+    assert [row["id"] for row in plan.upserts["Goal"]] == ["G1", "G12", "G13"]
+    assert plan.created["Goal"] == 1 and plan.updated["Goal"] == 2
+    assert plan.upserts["Chapter"] == [] and plan.upserts["Requirement"] == []
+    assert plan.add_links == [("G1", "G13")]
+
+
+def test_prune_deletes_what_the_files_no_longer_list():
+    records = sample_records()
+    existing = existing_from(collect_curriculum(records))
+    remaining = [record for record in records if record["chapter_id"] != "C3"]
+    for record in remaining:
+        if record["goal_id"] == "G5":
+            record["prerequisites"] = ["G4"]
+
+    kept = plan_import(collect_curriculum(remaining), existing)
+    assert kept.missing == {"Chapter": 1, "Requirement": 2, "Goal": 4}
+    assert not any(kept.deletes.values()) and kept.remove_links == []
+
+    pruned = plan_import(collect_curriculum(remaining), existing, prune=True)
+    assert pruned.deletes == {"Chapter": ["C3"], "Requirement": ["R5", "R6"], "Goal": ["G10", "G11", "G12", "G9"]}
+    assert pruned.remove_links == [("G7", "G5")]
+
+
+def test_conflicting_or_dangling_definitions_are_rejected():
+    records = sample_records()
+    with pytest.raises(ValueError, match="defined twice"):
+        collect_curriculum(records + [{**records[0], "goal_description": "Something else"}])
+    dangling = collect_curriculum(records + [{**records[0], "goal_id": "G99", "prerequisites": ["G404"]}])
+    with pytest.raises(ValueError, match="unknown goals"):
+        plan_import(dangling, existing_from(collect_curriculum(records)))
+
+
+def grade_7_records():
+    """The sample curriculum renumbered as grade 7 (ids prefixed with 7)"""
+    return [
+        {
+            **record,
+            "grade_level": 7,
+            **{key: f"7{record[key]}" for key in ("chapter_id", "requirement_id", "goal_id")},
+            "prerequisites": [f"7{prerequisite}" for prerequisite in record["prerequisites"]],
+        }
+        for record in sample_records()
+    ]
+
+
+def test_prerequisites_may_refer_to_goals_already_in_the_graph():
+    existing = existing_from(collect_curriculum(grade_7_records()))
+    records = sample_records()
+    records[0]["prerequisites"] = ["7G12"]
+
+    plan = plan_import(collect_curriculum(records), existing)
+    assert ("7G12", "G1") in plan.add_links
+    # A grade 8 import on its own still needs them in the graph
+    with pytest.raises(ValueError, match="unknown goals: 7G12"):
+        plan_import(collect_curriculum(records), existing_from(collect_curriculum(sample_records())))
+
+
+def test_prune_leaves_other_grades_alone():
+    grade_7 = collect_curriculum(grade_7_records())
+    existing = existing_from(collect_curriculum(grade_7_records() + sample_records()))
+    remaining = [record for record in sample_records() if record["chapter_id"] != "C3"]
+    for record in remaining:
+        if record["goal_id"] == "G5":
+            record["prerequisites"] = ["G4"]
+
+    pruned = plan_import(collect_curriculum(remaining), existing, prune=True)
+    assert pruned.missing == {"Chapter": 1, "Requirement": 2, "Goal": 4}
+    assert pruned.deletes == {"Chapter": ["C3"], "Requirement": ["R5", "R6"], "Goal": ["G10", "G11", "G12", "G9"]}
+    assert pruned.remove_links == [("G7", "G5")]
+    assert not any(node_id in grade_7.goals for node_id in pruned.deletes["Goal"])
+
+
+def test_apply_plan_batches_parents_first():
+    curriculum = collect_curriculum(sample_records())
+    plan = plan_import(curriculum, ExistingCurriculum({label: {} for label in LABELS}, set()))
+    neo4j_mock = MagicMock()
+    apply_plan(neo4j_mock, plan, batch_size=5)
+
+    calls = [(call.args[0], len(next(iter(call.args[1].values())))) for call in neo4j_mock.run_query.call_args_list]
+    assert calls == [
+        (queries.UPSERT_CHAPTERS, 3),
+        (queries.UPSERT_REQUIREMENTS, 5), (queries.UPSERT_REQUIREMENTS, 1),
+        (queries.UPSERT_GOALS, 5), (queries.UPSERT_GOALS, 5), (queries.UPSERT_GOALS, 2),
+        (queries.CREATE_PREREQUISITE_LINKS, 5), (queries.CREATE_PREREQUISITE_LINKS, 5),
+    ]
+
+
+def test_import_curriculum_dry_run_reads_the_graph_only(tmp_path):
+    path = tmp_path / "grade_8.json"
+    path.write_text(json.dumps(json.loads(SAMPLE_CURRICULUM_PATH.read_text())))
+    neo4j_mock = MagicMock()
+    neo4j_mock.run_query.return_value = []
+
+    report = import_curriculum(neo4j_mock, [path], dry_run=True)
+    assert report["created"] == {"Chapter": 3, "Requirement": 6, "Goal": 12}
+    assert all(call.args[0].access == queries.READ for call in neo4j_mock.run_query.call_args_list)
+
+
+def test_import_invalidates_the_curriculum_snapshot(tmp_path):
+    path = tmp_path / "grade_8.json"
+    path.write_text(SAMPLE_CURRICULUM_PATH.read_text())
+    neo4j_mock = MagicMock()
+    neo4j_mock.run_query.return_value = []
+    cache = get_shared_cache()
+
+    cache.set(CACHE_KEY, b"{}")
+    import_curriculum(neo4j_mock, [path], dry_run=True)
+    assert cache.get(CACHE_KEY) == b"{}"
+
+    import_curriculum(neo4j_mock, [path])
+    assert cache.get(CACHE_KEY) is None
@@ -0,0 +1,99 @@
+import random
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import goal_stats
+from app.db.base import Base
+from app.models.goal_stats import GoalStats
+from app.models.users import GoalProgress, User
+from app.services import progress_tracking
+from app.services.progress_tracking import update_goal_progress
+
+
+@pytest.fixture
+def db():
+    # Fresh in-memory database per test, with students in grades 7 and 8 and a teacher
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for user_id, grade_level in ((1, 7), (2, 8), (3, 8), (4, None)):
+        session.add(User(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com",
+                         hashed_password="x", grade_level=grade_level))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def cube(db):
+    return {(row.goal_id, row.grade_level): row for row in db.scalars(select(GoalStats))}
+
+
+def test_mastery_buckets():
+    assert [goal_stats.mastery_bucket(m) for m in (None, 0.0, 0.19, 0.2, 0.59, 0.6, 0.8, 1.0)] == [0, 0, 0, 1, 2, 3, 4, 4]
+
+
+def test_write_path_updates_cube(db):
+    update_goal_progress(db, 2, "G1", successful=True)
+    update_goal_progress(db, 2, "G1", successful=False)
+    update_goal_progress(db, 3, "G1", successful=False)
+    update_goal_progress(db, 4, "G1", successful=True)
+    db.commit()
+
+    stats = cube(db)
+    grade8 = stats[("G1", 8)]
+    assert (grade8.students, grade8.attempts_count, grade8.successful_attempts) == (2, 3, 1)
+    assert grade8.mastery_sum == pytest.approx(0.5)
+    assert [grade8.mastery_bucket_0, grade8.mastery_bucket_2] == [1, 1]
+    # Users without a grade level are counted under NO_GRADE
+    assert stats[("G1", goal_stats.NO_GRADE)].students == 1
+    assert goal_stats.check_goal_stats(db) == []
+
+
+def test_concurrent_first_practice_counts_on_top_of_the_other(db):
+    update_goal_progress(db, 2, "G1", successful=True)
+    db.commit()
+    # This request read no row before the other one committed its insert
+    with patch.object(progress_tracking, "_locked_goal_progress", side_effect=[None, db.scalar(select(GoalProgress))]):
+        progress = update_goal_progress(db, 2, "G1", successful=False)
+    db.commit()
+
+    assert (progress.attempts_count, progress.successful_attempts) == (2, 1)
+    assert db.scalars(select(GoalProgress)).all() == [progress]
+    assert cube(db)[("G1", 8)].students == 1
+    assert goal_stats.check_goal_stats(db) == []
+
+
+def test_checker_detects_drift_and_rebuild_repairs_it(db):
+    rng = random.Random(3)
+    for _ in range(200):
+        update_goal_progress(db, rng.randint(1, 4), f"G{rng.randint(1, 6)}", successful=rng.random() < 0.5)
+    db.commit()
+    assert goal_stats.check_goal_stats(db) == []
+
+    # A bulk write that bypasses the write path leaves the cube stale
+    db.add(GoalProgress(user_id=1, goal_id="G99", mastery_level=0.9, attempts_count=3, successful_attempts=3))
+    db.commit()
+    mismatches = goal_stats.check_goal_stats(db)
+    assert {(m["goal_id"], m["grade_level"]) for m in mismatches} == {("G99", 7)}
+
+    before = {key: row.students for key, row in cube(db).items()}
+    goal_stats.rebuild_goal_stats(db)
+    db.commit()
+    assert goal_stats.check_goal_stats(db) == []
+    assert {key: row.students for key, row in cube(db).items()} == {**before, ("G99", 7): 1}
+
+
+def test_goal_stats_query_weakest_first(db):
+    for user_id, goal_id, successful in ((1, "G1", True), (2, "G1", True), (2, "G2", False), (3, "G2", True)):
+        update_goal_progress(db, user_id, goal_id, successful)
+    db.commit()
+
+    all_grades = db.execute(goal_stats.goal_stats_query()).all()
+    assert [(row.goal_id, row.students) for row in all_grades] == [("G2", 2), ("G1", 2)]
+    grade7 = db.execute(goal_stats.goal_stats_query(grade_level=7)).all()
+    assert [(row.goal_id, row.mastery_sum) for row in grade7] == [("G1", 1.0)]
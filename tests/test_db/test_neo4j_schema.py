@@ -0,0 +1,102 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.db import neo4j_schema
+
+
+def schema_mock(*index_state_rounds):
+    """A neo4j_db stand-in whose SHOW INDEXES returns the given rounds of states in turn"""
+    rounds = iter(index_state_rounds)
+    neo4j_mock = MagicMock()
+
+    def run_query(query, parameters=None):
+        if query.startswith("SHOW INDEXES"):
+            return [
+                {"name": name, "state": state, "populationPercent": 100.0 if state == "ONLINE" else 50.0}
+                for name, state in next(rounds).items()
+            ]
+        return []
+
+    neo4j_mock.run_query.side_effect = run_query
+    return neo4j_mock
+
+
+def test_schema_statements_are_idempotent_and_named():
+    for name, statement in {**neo4j_schema.CONSTRAINTS, **neo4j_schema.INDEXES}.items():
+        assert f" {name} IF NOT EXISTS " in statement
+
+
+def test_ensure_schema_waits_for_population():
+    neo4j_mock = schema_mock(
+        {"problem_text": "POPULATING", "goal_id": "ONLINE"},
+        {"problem_text": "ONLINE", "goal_id": "ONLINE"},
+    )
+    neo4j_schema.ensure_schema(neo4j_mock)
+
+    statements = [call.args[0] for call in neo4j_mock.run_query.call_args_list]
+    created = [statement for statement in statements if statement.startswith("CREATE")]
+    assert len(created) == len(neo4j_schema.CONSTRAINTS) + len(neo4j_schema.INDEXES)
+    assert sum(statement.startswith("SHOW INDEXES") for statement in statements) == 2
+
+
+def test_await_indexes_fails_fast_on_failed_index():
+    with pytest.raises(RuntimeError, match="problem_text"):
+        neo4j_schema.await_indexes(schema_mock({"problem_text": "FAILED", "goal_id": "ONLINE"}))
+
+
+def test_await_indexes_times_out():
+    neo4j_mock = schema_mock(*[{"problem_text": "POPULATING"}] * 3)
+    with pytest.raises(RuntimeError, match="still populating"):
+        neo4j_schema.await_indexes(neo4j_mock, timeout_seconds=0, poll_seconds=0)
+
+
+def test_flatten_plan():
+    plan = {
+        "operatorType": "ProduceResults@neo4j",
+        "children": [{"operatorType": "Filter@neo4j", "children": [{"operatorType": "NodeByLabelScan@neo4j"}]}],
+    }
+    operators = neo4j_schema.flatten_plan(plan)
+    assert operators == ["ProduceResults", "Filter", "NodeByLabelScan"]
+    assert neo4j_schema.uses_label_scan(operators)
+    assert not neo4j_schema.uses_label_scan(["ProduceResults", "NodeUniqueIndexSeek"])
+
+
+@pytest.mark.skipif(not os.getenv("NEO4J_TEST_URI"), reason="set NEO4J_TEST_URI to profile against a live Neo4j")
+def test_hot_queries_use_index_seeks():
+    from neo4j import GraphDatabase
+
+    class LiveNeo4j:
+        def __init__(self):
+            self.driver = GraphDatabase.driver(
+                os.environ["NEO4J_TEST_URI"],
+                auth=(os.getenv("NEO4J_TEST_USER", "neo4j"), os.getenv("NEO4J_TEST_PASSWORD", "password")),
+            )
+
+        def session(self):
+            return self.driver.session()
+
+        def run_query(self, query, parameters=None):
+            with self.session() as session:
+                return list(session.run(query, parameters or {}))
+
+    live = LiveNeo4j()
+    try:
+        neo4j_schema.ensure_schema(live, await_timeout_seconds=60)
+        # Enough nodes that a label scan would be a real choice for the planner
+        live.run_query(
+            """
+            UNWIND range(1, 500) AS i
+            CREATE (:Problem {id: 'schema-test-P' + i, text: 'Solve equation ' + i, subject_area: 'Algebra',
+                              difficulty: i % 5 + 1, user_id: i % 20, schema_test: true})
+            CREATE (:SolutionStep {id: 'schema-test-S' + i, step_number: 1, schema_test: true})
+            """
+        )
+        for name, hot in neo4j_schema.HOT_QUERIES.items():
+            operators = neo4j_schema.plan_operators(live, hot["query"], hot["parameters"])
+            assert not neo4j_schema.uses_label_scan(operators), f"{name} scans a label: {operators}"
+            assert any("Index" in operator for operator in operators), f"{name} uses no index: {operators}"
+    finally:
+        live.run_query("MATCH (n) WHERE n.schema_test = true DETACH DELETE n")
+        live.driver.close()
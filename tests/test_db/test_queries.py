@@ -0,0 +1,214 @@
+import pickle
+from unittest.mock import MagicMock, patch
+
+import pytest
+from neo4j import READ_ACCESS, WRITE_ACCESS, Bookmarks
+from neo4j.exceptions import ClientError, ServiceUnavailable, TransientError
+
+from app.db import queries
+from app.db.neo4j import Neo4jDatabase
+
+
+def fake_database(records, profile=None, bookmark="bm:1"):
+    """
+    A Neo4jDatabase over a stub driver whose sessions return `records` for every query.
+    Managed transactions run their function once with the session standing in for the transaction.
+    """
+    result = MagicMock()
+    result.__iter__.side_effect = lambda: iter(records)
+    result.single.return_value = records[0] if records else None
+    result.consume.return_value.profile = profile
+    session = MagicMock()
+    session.run.return_value = result
+    session.__enter__.return_value = session
+    session.execute_read.side_effect = lambda work: work(session)
+    session.execute_write.side_effect = lambda work: work(session)
+    session.last_bookmarks.return_value = Bookmarks.from_raw_values([bookmark])
+    database = Neo4jDatabase()
+    database._driver = MagicMock()
+    database._driver.session.return_value = session
+    return database, session
+
+
+def failing(session, errors):
+    """Make managed writes raise each of `errors` in turn before running normally"""
+    pending = list(errors)
+
+    def execute_write(work):
+        if pending:
+            raise pending.pop(0)
+        return work(session)
+
+    session.execute_write.side_effect = execute_write
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    with patch("app.db.neo4j.time.sleep") as sleep:
+        yield sleep
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    queries.query_stats.reset()
+    yield
+    queries.query_stats.reset()
+
+
+def test_registered_queries_are_named_strings():
+    assert queries.QUERIES["problems.goals"] is queries.PROBLEM_GOALS
+    assert queries.PROBLEM_GOALS.startswith("MATCH (p:Problem)")
+    assert queries.query_name(queries.PROBLEM_GOALS) == "problems.goals"
+    assert queries.query_name("RETURN 1") == queries.ADHOC
+    assert pickle.loads(pickle.dumps(queries.PROBLEM_GOALS)).name == "problems.goals"
+    with pytest.raises(ValueError):
+        queries.register("problems.goals", "RETURN 1")
+
+
+def test_run_query_records_latency_and_rows():
+    database, session = fake_database([{"id": "G1"}, {"id": "G2"}])
+    assert len(database.run_query(queries.GOAL_IDS)) == 2
+    database.run_query_single(queries.GOAL_COUNT)
+    database.run_query("RETURN 1")
+
+    stats = queries.query_stats.snapshot()
+    assert stats["curriculum.goal_ids"]["calls"] == 1
+    assert stats["curriculum.goal_ids"]["rows"] == 2
+    assert stats["curriculum.goal_count"]["rows"] == 1
+    assert stats[queries.ADHOC]["calls"] == 1
+    assert sum(stats["curriculum.goal_ids"]["buckets"]) == 1
+    # Without sampling nothing runs under PROFILE
+    assert not any(call.args[0].startswith("PROFILE") for call in session.run.call_args_list)
+
+
+def test_sampled_profile_records_db_hits():
+    plan = {"dbHits": 3, "children": [{"dbHits": 10, "children": []}]}
+    database, session = fake_database([{"id": "G1"}], profile=plan)
+    with patch("app.db.neo4j.settings.NEO4J_PROFILE_SAMPLE_RATE", 1.0):
+        database.run_query(queries.GOAL_IDS)
+        database.run_query("RETURN 1")
+
+    statements = [call.args[0] for call in session.run.call_args_list]
+    assert statements == [f"PROFILE {queries.GOAL_IDS}", "RETURN 1"]
+    stats = queries.query_stats.snapshot()
+    assert stats["curriculum.goal_ids"]["profiled"] == 1
+    assert stats["curriculum.goal_ids"]["db_hits"] == 13
+    assert stats[queries.ADHOC]["profiled"] == 0
+
+
+def test_failed_query_counts_as_error():
+    database, session = fake_database([])
+    session.run.side_effect = RuntimeError("connection lost")
+    with pytest.raises(RuntimeError):
+        database.run_query(queries.GOAL_IDS)
+    assert queries.query_stats.snapshot()["curriculum.goal_ids"]["errors"] == 1
+
+
+def test_dump_load_and_rank(tmp_path):
+    stats = queries.QueryStats()
+    for elapsed_ms in (2.0, 3.0, 400.0):
+        stats.record("problems.goals", elapsed_ms, rows=10)
+    stats.record("curriculum.goal_ids", 1.0, rows=12)
+    first = queries.worker_stats_path(str(tmp_path / "query_stats.json"), pid=101)
+    second = queries.worker_stats_path(str(tmp_path / "query_stats.json"), pid=102)
+    assert first.endswith("query_stats.101.json") and first != second
+    stats.dump(first)
+    stats.dump(second)
+
+    timings = queries.load_stats(sorted(str(path) for path in tmp_path.glob("query_stats.*.json")))
+    assert timings["problems.goals"].calls == 6
+    assert timings["problems.goals"].max_ms == 400.0
+    ranked = queries.top_queries(timings, limit=1)
+    assert [row["name"] for row in ranked] == ["problems.goals"]
+    assert ranked[0]["p50_ms"] == 5
+    assert ranked[0]["p95_ms"] == 400.0
+
+
+def test_queries_are_routed_by_access_mode():
+    database, session = fake_database([{"count": 1}])
+    database.run_query(queries.GOAL_IDS)
+    database.run_query(queries.CREATE_PREREQUISITE_LINKS, {"links": []})
+    database.run_query("SHOW INDEXES")
+
+    modes = [call.kwargs["default_access_mode"] for call in database._driver.session.call_args_list]
+    assert modes == [READ_ACCESS, WRITE_ACCESS, WRITE_ACCESS]
+    assert session.execute_read.call_count == 1
+    assert session.execute_write.call_count == 1
+    assert queries.CREATE_PROBLEM.access == queries.WRITE
+    assert queries.PROBLEM_DETAILS.access == queries.READ
+
+
+def test_reads_wait_for_own_writes():
+    database, session = fake_database([], bookmark="bm:42")
+    database.run_query(queries.CREATE_PROBLEM, {"id": "P1"}, bookmark_key=7)
+    database.run_query(queries.PROBLEM_DETAILS, {"problem_ids": ["P1"]}, bookmark_key=7)
+    database.run_query(queries.PROBLEM_DETAILS, {"problem_ids": ["P1"]}, bookmark_key=8)
+
+    calls = database._driver.session.call_args_list
+    assert "bookmarks" not in calls[0].kwargs
+    assert calls[1].kwargs["bookmarks"].raw_values == frozenset({"bm:42"})
+    assert "bookmarks" not in calls[2].kwargs
+
+
+def test_bookmark_store_is_bounded():
+    database, _ = fake_database([])
+    database.bookmarks.max_keys = 2
+    for user_id in (1, 2, 3):
+        database.bookmarks.update(user_id, Bookmarks.from_raw_values([f"bm:{user_id}"]))
+    assert database.bookmarks.get(1) is None
+    assert database.bookmarks.get(3).raw_values == frozenset({"bm:3"})
+
+
+def test_transient_errors_are_retried_and_counted(no_backoff):
+    database, session = fake_database([])
+    failing(session, [TransientError("deadlock"), ServiceUnavailable("leader switch")])
+    database.run_query(queries.CREATE_PROBLEM, {"id": "P1"})
+
+    assert session.execute_write.call_count == 3
+    assert no_backoff.call_count == 2
+    stats = queries.query_stats.snapshot()["problems.create"]
+    assert stats["calls"] == 1
+    assert stats["retries"] == 2
+    assert stats["errors"] == 0
+
+
+def test_retries_are_bounded(no_backoff):
+    database, session = fake_database([])
+    failing(session, [TransientError("deadlock")] * 10)
+    with patch("app.db.neo4j.settings.NEO4J_TRANSACTION_MAX_ATTEMPTS", 3):
+        with pytest.raises(TransientError):
+            database.run_query(queries.CREATE_PROBLEM, {"id": "P1"})
+
+    assert session.execute_write.call_count == 3
+    stats = queries.query_stats.snapshot()["problems.create"]
+    assert stats["errors"] == 1
+    assert stats["retries"] == 2
+
+
+def test_client_errors_and_autocommit_are_not_retried():
+    database, session = fake_database([])
+    failing(session, [ClientError("syntax error")])
+    with pytest.raises(ClientError):
+        database.run_query(queries.CREATE_PROBLEM, {"id": "P1"})
+    assert session.execute_write.call_count == 1
+
+    session.run.side_effect = ServiceUnavailable("gone")
+    with pytest.raises(ServiceUnavailable):
+        database.run_query("SHOW INDEXES")
+    assert session.run.call_count == 1
+
+
+def test_write_transaction_groups_statements():
+    database, session = fake_database([])
+    failing(session, [TransientError("deadlock")])
+
+    def create(tx, problem_id):
+        tx.run(queries.CREATE_PROBLEM, {"id": problem_id})
+        tx.run(queries.CREATE_SOLUTION_STEP, {"problem_id": problem_id, "id": "S1"})
+        return problem_id
+
+    assert database.write_transaction("problems.create_with_steps", create, "P1", bookmark_key=3) == "P1"
+    # Only the successful attempt reached the statements, both in the same transaction
+    assert [call.args[0] for call in session.run.call_args_list] == [queries.CREATE_PROBLEM, queries.CREATE_SOLUTION_STEP]
+    assert queries.query_stats.snapshot()["problems.create_with_steps"]["retries"] == 1
+    assert database.bookmarks.get(3) is not None
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, insert
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.users import GoalProgress, ProblemHistory, User
+from app.services import progress_tracking
+
+USER_ID = 7
+
+# Every hot per-user read, as built by the progress service
+HOT_QUERIES = {
+    "goal_progress_first_page": progress_tracking.goal_progress_page_query(USER_ID, 50),
+    "goal_progress_next_page": progress_tracking.goal_progress_page_query(USER_ID, 50, after=("G20", 120)),
+    "problem_history_first_page": progress_tracking.problem_history_page_query(USER_ID, 20),
+    "problem_history_next_page": progress_tracking.problem_history_page_query(
+        USER_ID, 20, before=(datetime(2026, 5, 1), 5000)
+    ),
+    "recent_problem_history": progress_tracking.recent_problem_history_query(USER_ID, 10),
+    "weakest_goals": progress_tracking.weakest_goals_query(USER_ID, 10),
+    "struggling_goals": progress_tracking.struggling_goals_query(USER_ID),
+    "strongest_goals": progress_tracking.strongest_goals_query(USER_ID),
+    "average_mastery": progress_tracking.average_mastery_query(USER_ID),
+    "history_totals": progress_tracking.history_totals_query(USER_ID),
+}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    # Realistic row counts and ANALYZE statistics, so the planner has real choices
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.com", "hashed_password": "x"}
+            for user_id in range(1, 51)
+        ])
+        conn.execute(insert(GoalProgress), [
+            {"user_id": user_id, "goal_id": f"G{goal}", "mastery_level": (user_id * goal % 100) / 100}
+            for user_id in range(1, 51) for goal in range(1, 101)
+        ])
+        conn.execute(insert(ProblemHistory), [
+            {"user_id": i % 50 + 1, "problem_id": f"P{i % 300}", "attempted_at": start + timedelta(minutes=i)}
+            for i in range(20000)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    yield engine
+    engine.dispose()
+
+
+def explain(engine, query):
+    """EXPLAIN QUERY PLAN detail lines for a SQLAlchemy query"""
+    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index_seek(engine, name):
+    plan = explain(engine, HOT_QUERIES[name])
+    # SEARCH is an index seek; SCAN (even of an index) reads the whole table
+    assert not [step for step in plan if step.startswith("SCAN")], f"{name} degraded to a full scan: {plan}"
+    # The index must also deliver the requested order
+    assert not [step for step in plan if "TEMP B-TREE" in step], f"{name} needs a sort: {plan}"
+
+
+def test_migration_adds_composite_indexes(tmp_path):
+    # A database created before the composite indexes existed
+    database_url = f"sqlite:///{tmp_path / 'migrate.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_goal_progress_user_mastery")
+        conn.exec_driver_sql("DROP INDEX ix_problem_history_user_attempted")
+
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", database_url)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+    inspector = inspect(engine)
+    goal_indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes("goal_progress")}
+    history_indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes("problem_history")}
+    assert goal_indexes["ix_goal_progress_user_mastery"] == ["user_id", "mastery_level", "goal_id"]
+    assert history_indexes["ix_problem_history_user_attempted"] == ["user_id", "attempted_at", "id"]
+
+    # Re-running on an up-to-date schema is a no-op, and downgrade removes them again
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
+    assert "ix_goal_progress_user_mastery" not in {index["name"] for index in inspect(engine).get_indexes("goal_progress")}
+    engine.dispose()
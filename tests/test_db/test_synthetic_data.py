@@ -0,0 +1,79 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import attempt_log
+from app.db.base import Base
+from app.db.queries import BULK_CREATE_PROBLEMS
+from app.db.synthetic_data import generate_synthetic_data
+from app.models.users import GoalProgress, ProblemHistory, User, UserSettings
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def make_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def snapshot(db):
+    return (
+        db.execute(select(User.username, User.grade_level, User.created_at).order_by(User.id)).all(),
+        db.execute(select(GoalProgress.user_id, GoalProgress.goal_id, GoalProgress.mastery_level).order_by(GoalProgress.id)).all(),
+        db.execute(select(ProblemHistory.user_id, ProblemHistory.problem_id, ProblemHistory.attempted_at).order_by(ProblemHistory.id)).all(),
+    )
+
+
+def test_generator_is_reproducible():
+    first, second = make_session(), make_session()
+    generate_synthetic_data(first, users=20, problems=15, history_per_user=8, seed=7, batch_size=16, now=NOW)
+    generate_synthetic_data(second, users=20, problems=15, history_per_user=8, seed=7, batch_size=16, now=NOW)
+    assert snapshot(first) == snapshot(second)
+
+    third = make_session()
+    generate_synthetic_data(third, users=20, problems=15, history_per_user=8, seed=8, batch_size=16, now=NOW)
+    assert snapshot(first) != snapshot(third)
+
+
+def test_generator_counts_and_shared_password_hash():
+    db = make_session()
+    stats = generate_synthetic_data(db, users=30, problems=10, history_per_user=5, goals_per_user=4, batch_size=7, now=NOW)
+
+    assert stats["users"] == db.query(User).count() == 30
+    assert db.query(UserSettings).count() == 30
+    assert stats["goal_progress"] == db.query(GoalProgress).count() == 120
+    assert stats["problem_history"] == db.query(ProblemHistory).count() == 150
+    assert len({user.hashed_password for user in db.query(User)}) == 1
+
+    # History is mirrored into the monthly attempt log
+    logged = sum(
+        len(attempt_log.query_attempts(db, user_id, datetime(2025, 1, 1), NOW))
+        for user_id in range(1, 31)
+    )
+    assert logged == stats["attempt_log"] == 150
+
+
+def test_generator_appends_after_existing_users():
+    db = make_session()
+    generate_synthetic_data(db, users=5, problems=2, history_per_user=1, now=NOW)
+    generate_synthetic_data(db, users=5, problems=2, history_per_user=1, seed=9, now=NOW)
+    assert [user.id for user in db.query(User).order_by(User.id)] == list(range(1, 11))
+
+
+def test_problems_are_sent_to_neo4j_in_unwind_batches():
+    neo4j_mock = MagicMock()
+    db = make_session()
+    stats = generate_synthetic_data(
+        db, users=2, problems=1200, history_per_user=1, goal_ids=["G1", "G2", "G3"], neo4j_instance=neo4j_mock, now=NOW
+    )
+
+    calls = neo4j_mock.run_query.call_args_list
+    assert [call.args[0] for call in calls] == [BULK_CREATE_PROBLEMS] * 3
+    batches = [call.args[1]["problems"] for call in calls]
+    assert [len(batch) for batch in batches] == [500, 500, 200]
+    assert all(set(step["goal_ids"]) <= {"G1", "G2", "G3"} for batch in batches for row in batch for step in row["steps"])
+    assert stats["problems"] == 1200
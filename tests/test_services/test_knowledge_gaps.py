@@ -0,0 +1,87 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.db.curriculum_import import SAMPLE_CURRICULUM_PATH, collect_curriculum, read_curriculum_files
+from app.db.queries import PREREQUISITES
+from app.services.knowledge_gaps import PrerequisiteGraph
+
+GOALS = [f"G{i}" for i in range(1, 13)]
+SAMPLE_PREREQUISITES = sorted(collect_curriculum(read_curriculum_files([str(SAMPLE_CURRICULUM_PATH)])).links)
+
+
+def sample_graph():
+    graph = PrerequisiteGraph()
+    graph.build(GOALS, SAMPLE_PREREQUISITES)
+    return graph
+
+
+def test_build_sorts_topologically():
+    graph = sample_graph()
+    position = {goal_id: i for i, goal_id in enumerate(graph.goal_ids)}
+    assert sorted(graph.goal_ids) == sorted(GOALS)
+    assert all(position[prerequisite] < position[goal] for prerequisite, goal in SAMPLE_PREREQUISITES)
+    assert sorted(graph.prerequisites_of("G5")) == ["G4", "G7"]
+    assert graph.prerequisites_of("G1") == []
+
+
+def test_build_rejects_cycles():
+    with pytest.raises(ValueError, match="cycle"):
+        PrerequisiteGraph().build(["A", "B", "C"], [("A", "B"), ("B", "C"), ("C", "A")])
+
+
+def test_root_gap_is_weakest_foundation():
+    graph = sample_graph()
+    # Weak at G6 and G5, and at G4 underneath them; G3 and G7 are fine
+    mastery = {"G6": 0.1, "G5": 0.2, "G4": 0.3, "G3": 0.9, "G7": 0.8}
+    gaps = graph.root_gaps(mastery)
+    assert [gap.goal_id for gap in gaps] == ["G4"]
+    # G4 carries its own deficit plus pressure propagated from G5 and G6
+    assert gaps[0].pressure > 0.4 - 0.3
+
+
+def test_unpracticed_prerequisite_of_weak_goal_is_a_gap():
+    graph = sample_graph()
+    gaps = graph.root_gaps({"G10": 0.1, "G11": 0.2, "G12": 0.9})
+    # G9 was never practiced and sits under weak G10; its prerequisite G4 is not implicated
+    assert [(gap.goal_id, gap.mastery_level) for gap in gaps] == [("G9", None), ("G11", 0.2)]
+    assert graph.root_gaps({"G1": 0.9, "G6": 0.95}) == []
+
+
+def test_batch_matches_single_user():
+    rng = random.Random(7)
+    goal_ids = [f"N{i}" for i in range(300)]
+    edges = [
+        (goal_ids[rng.randrange(i)], goal_ids[i])
+        for i in range(1, len(goal_ids))
+        for _ in range(rng.randint(0, 3))
+    ]
+    graph = PrerequisiteGraph()
+    graph.build(goal_ids, edges)
+    masteries = [
+        {goal_id: round(rng.random(), 2) for goal_id in rng.sample(goal_ids, 120)}
+        for _ in range(20)
+    ]
+
+    batch = graph.root_gaps_batch(masteries, limit=None)
+    for mastery, batch_gaps in zip(masteries, batch):
+        single = graph.root_gaps(mastery, limit=None)
+        assert [gap.goal_id for gap in batch_gaps] == [gap.goal_id for gap in single]
+        assert [gap.mastery_level for gap in batch_gaps] == [gap.mastery_level for gap in single]
+        assert [gap.pressure for gap in batch_gaps] == pytest.approx([gap.pressure for gap in single])
+
+
+def test_load_from_neo4j():
+    neo4j_mock = MagicMock()
+    neo4j_mock.run_query.side_effect = lambda query, params=None: (
+        [{"prerequisite_id": "G1", "goal_id": "G2"}] if query == PREREQUISITES
+        else [{"id": "G2"}, {"id": "G1"}, {"id": "G3"}]
+    )
+    graph = PrerequisiteGraph()
+    graph.ensure_loaded(neo4j_mock)
+    graph.ensure_loaded(neo4j_mock)
+
+    assert neo4j_mock.run_query.call_count == 2
+    assert graph.goal_ids.index("G1") < graph.goal_ids.index("G2")
+    assert len(graph) == 3
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+
+from app.db.queries import PROBLEM_GOALS
+from app.services.recommendation_index import GoalProblemIndex
+
+
+def build_index():
+    index = GoalProblemIndex()
+    index.build([
+        ("P1", ["G1", "G2"], 1, "Algebra"),
+        ("P2", ["G2"], 3, "Geometry"),
+        ("P3", ["G1", "G2", "G3"], 2, "Algebra"),
+        ("P4", ["G3"], 5, "Algebra"),
+    ])
+    return index
+
+
+def test_candidates_ranked_by_matched_goals():
+    index = build_index()
+    assert index.candidates(["G1", "G2"]) == [("P1", 2), ("P3", 2), ("P2", 1)]
+    assert index.candidates(["G1", "G2", "G3"], limit=2) == [("P3", 3), ("P1", 2)]
+    assert index.candidates(["G-unknown"]) == []
+
+
+def test_candidates_filters():
+    index = build_index()
+    assert index.candidates(["G2", "G3"], min_difficulty=2, max_difficulty=4) == [("P3", 2), ("P2", 1)]
+    assert index.candidates(["G2", "G3"], subject_area="Geometry") == [("P2", 1)]
+    assert index.candidates(["G2"], subject_area="Statistics") == []
+    assert index.candidates(["G1", "G2"], exclude=["P1", "P-unknown"]) == [("P3", 2), ("P2", 1)]
+
+
+def test_difficulties_are_coerced_and_clamped():
+    index = GoalProblemIndex()
+    index.build([("P1", ["G1"], 2.0, "Algebra"), ("P2", ["G1"], 300, "Algebra"), ("P3", ["G1"], None, "Algebra")])
+    assert list(index.postings("G1").difficulties) == [2, 5, 1]
+    # Filters see the same values as the scoring matrix
+    assert index.candidates(["G1"], min_difficulty=5) == [("P2", 1)]
+
+
+def test_incremental_add_keeps_postings_sorted():
+    index = build_index()
+    index.add_problem("P5", ["G1"], 4, "Geometry")
+    # New goal links for an existing problem are inserted in key order
+    index.add_problem("P2", ["G1", "G2"], 3, "Geometry")
+
+    postings = index.postings("G1")
+    assert list(postings.keys) == sorted(postings.keys)
+    assert [index.problem_id(key) for key in postings.keys] == ["P1", "P2", "P3", "P5"]
+    assert list(postings.difficulties) == [1, 3, 2, 4]
+    assert index.candidates(["G1"], subject_area="Geometry") == [("P2", 1), ("P5", 1)]
+    assert len(index) == 5
+
+
+def test_load_from_neo4j():
+    neo4j_mock = MagicMock()
+    neo4j_mock.run_query.return_value = [
+        {"problem_id": "P1", "goal_ids": ["G5", "G7"], "difficulty": 1, "subject_area": "Algebra"},
+        {"problem_id": "P2", "goal_ids": ["G9"], "difficulty": None, "subject_area": None},
+    ]
+    index = GoalProblemIndex()
+    assert not index.is_loaded
+    index.ensure_loaded(neo4j_mock)
+    index.ensure_loaded(neo4j_mock)
+
+    neo4j_mock.run_query.assert_called_once_with(PROBLEM_GOALS)
+    assert index.is_loaded
+    assert index.goal_ids() == ["G5", "G7", "G9"]
+    assert index.candidates(["G9"]) == [("P2", 1)]
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.models.users import GoalProgress, ProblemHistory, UserSettings
+from app.services.recommendation_index import GoalProblemIndex
+from app.services.recommendation_scorer import (
+    DIFFICULTY_PENALTY,
+    ProblemMatrix,
+    UserProfile,
+    load_user_profiles,
+    score_users,
+)
+from tests.conftest import TestingSessionLocal
+
+
+def build_matrix():
+    index = GoalProblemIndex()
+    index.build([
+        ("P1", ["G1", "G2"], 1, "Algebra"),
+        ("P2", ["G2"], 3, "Geometry"),
+        ("P3", ["G1", "G2", "G3"], 2, "Algebra"),
+        ("P4", ["G3"], 5, "Algebra"),
+    ])
+    return ProblemMatrix(index)
+
+
+def test_matrix_layout():
+    matrix = build_matrix()
+    assert matrix.goal_ids == ["G1", "G2", "G3"]
+    assert matrix.incidence.shape == (4, 3)
+    assert matrix.incidence.toarray().tolist() == [[1, 1, 0], [0, 1, 0], [1, 1, 1], [0, 0, 1]]
+    assert matrix.difficulties.tolist() == [1, 3, 2, 5]
+
+
+def test_out_of_range_difficulties_are_clipped():
+    index = GoalProblemIndex()
+    index.build([("P1", ["G1"], 9, "Algebra"), ("P2", ["G1"], -3, "Algebra"), ("P3", ["G1"], 4, "Algebra")])
+    matrix = ProblemMatrix(index)
+    assert matrix.difficulties.tolist() == [5, 1, 4]
+
+    ranked = score_users(matrix, [UserProfile(user_id=1, difficulty_preference="hard")], limit=3)
+    assert [problem_id for problem_id, _ in ranked[1]] == ["P3", "P1", "P2"]
+
+
+def test_scores_match_dense_computation():
+    matrix = build_matrix()
+    profile = UserProfile(user_id=1, mastery={"G1": 0.2, "G2": 0.9, "G3": 0.5})
+    need = np.array([0.8, 0.1, 0.5], dtype=np.float32)
+    target = 1.0 + 4.0 * (0.2 + 0.9 + 0.5) / 3
+    expected = matrix.incidence.toarray() @ need - DIFFICULTY_PENALTY * np.abs(matrix.difficulties - target)
+
+    assert np.allclose(matrix.score([profile])[0], expected)
+
+
+def test_score_users_ranks_filters_and_excludes():
+    matrix = build_matrix()
+    profiles = [
+        UserProfile(user_id=1, mastery={"G1": 0.1, "G2": 0.1, "G3": 0.1}, difficulty_preference="easy"),
+        UserProfile(user_id=2, mastery={"G3": 0.0}, attempted={"P3", "P-unknown"}, difficulty_preference="hard"),
+        UserProfile(user_id=3),
+    ]
+    ranked = score_users(matrix, profiles, limit=2, chunk_size=2)
+
+    assert [problem_id for problem_id, _ in ranked[1]] == ["P3", "P1"]
+    # P1 and P2 tie on score, the older problem wins
+    assert [problem_id for problem_id, _ in ranked[2]] == ["P4", "P1"]
+    assert len(ranked[3]) == 2
+
+    algebra = score_users(matrix, profiles, limit=10, max_difficulty=2, subject_area="Algebra")
+    assert {problem_id for problem_id, _ in algebra[1]} == {"P1", "P3"}
+    assert [problem_id for problem_id, _ in algebra[2]] == ["P1"]
+    assert score_users(matrix, profiles, subject_area="Statistics") == {1: [], 2: [], 3: []}
+
+
+def test_load_user_profiles(test_db):
+    db = TestingSessionLocal()
+    try:
+        db.add_all([
+            GoalProgress(user_id=901, goal_id="G1", mastery_level=0.25),
+            GoalProgress(user_id=901, goal_id="G2", mastery_level=0.75),
+            ProblemHistory(user_id=901, problem_id="P1", attempted_at=datetime(2024, 1, 1)),
+            ProblemHistory(user_id=901, problem_id="P1", attempted_at=datetime(2024, 1, 2)),
+            UserSettings(user_id=901, difficulty_preference="hard"),
+        ])
+        db.commit()
+
+        first, second = load_user_profiles(db, [901, 902])
+        assert first.mastery == {"G1": 0.25, "G2": 0.75}
+        assert first.attempted == {"P1"}
+        assert first.target_difficulty() == 4.0
+        assert second.mastery == {} and second.attempted == set()
+        assert second.target_difficulty() == 1.0
+    finally:
+        db.query(GoalProgress).filter(GoalProgress.user_id == 901).delete()
+        db.query(ProblemHistory).filter(ProblemHistory.user_id == 901).delete()
+        db.query(UserSettings).filter(UserSettings.user_id == 901).delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,125 @@
+import threading
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.recommendations import UserRecommendations
+from app.models.users import GoalProgress, ProblemHistory, User
+from app.services.recommendation_index import GoalProblemIndex
+from app.services import recommendations
+from app.services.recommendations import precompute_recommendations, save_recommendations, shard_user_ids
+
+RECORDS = [
+    ("P1", ["G1", "G2"], 1, "Algebra"),
+    ("P2", ["G2"], 3, "Geometry"),
+    ("P3", ["G1", "G2", "G3"], 2, "Algebra"),
+    ("P4", ["G3"], 5, "Algebra"),
+]
+
+
+def build_index():
+    index = GoalProblemIndex()
+    index.build(RECORDS)
+    return index
+
+
+def populate(database_url):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        for user_id in range(1, 6):
+            db.add(User(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com",
+                        hashed_password="x", is_active=user_id != 5))
+            db.add(GoalProgress(user_id=user_id, goal_id="G3", mastery_level=0.1 * user_id))
+        db.add(ProblemHistory(user_id=1, problem_id="P3", attempted_at=datetime(2024, 1, 1)))
+        db.commit()
+    return engine
+
+
+def stored_lists(engine):
+    with sessionmaker(bind=engine)() as db:
+        return {row.user_id: row for row in db.query(UserRecommendations)}
+
+
+def test_index_records_round_trip():
+    assert sorted(build_index().records()) == sorted(RECORDS)
+
+
+def test_shard_user_ids():
+    assert shard_user_ids([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+
+
+def test_precompute_in_process(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'batch.db'}"
+    engine = populate(database_url)
+    now = datetime(2024, 6, 1)
+
+    stats = precompute_recommendations(database_url, build_index(), workers=1, shard_size=2, limit=3, now=now)
+    assert stats["users"] == 4 and stats["shards"] == 2
+
+    stored = stored_lists(engine)
+    assert sorted(stored) == [1, 2, 3, 4]
+    assert all(row.generated_at == now for row in stored.values())
+    first = stored[1].recommendations
+    assert len(first) == 3
+    # Already attempted problems are never recommended
+    assert "P3" not in [entry["problem_id"] for entry in first]
+    assert set(first[0]) == {"problem_id", "score", "difficulty", "subject_area", "goal_ids"}
+
+    # Re-running replaces the lists instead of duplicating them
+    precompute_recommendations(database_url, build_index(), workers=1, limit=3, now=datetime(2024, 6, 2))
+    assert {row.generated_at for row in stored_lists(engine).values()} == {datetime(2024, 6, 2)}
+    engine.dispose()
+
+
+def test_precompute_process_pool_matches_in_process(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'batch.db'}"
+    engine = populate(database_url)
+
+    precompute_recommendations(database_url, build_index(), workers=1, shard_size=1)
+    in_process = {user_id: row.recommendations for user_id, row in stored_lists(engine).items()}
+    precompute_recommendations(database_url, build_index(), workers=2, shard_size=1)
+    pooled = {user_id: row.recommendations for user_id, row in stored_lists(engine).items()}
+
+    assert pooled == in_process
+    engine.dispose()
+
+
+def test_save_recommendations_upserts(tmp_path):
+    engine = populate(f"sqlite:///{tmp_path / 'save.db'}")
+    first, second = sessionmaker(bind=engine)(), sessionmaker(bind=engine)()
+    # Both requests found no stored list; the later save replaces the earlier one
+    save_recommendations(first, {1: [{"problem_id": "P1"}]}, datetime(2024, 6, 1))
+    first.commit()
+    save_recommendations(second, {1: [{"problem_id": "P2"}], 2: []}, datetime(2024, 6, 2))
+    second.commit()
+
+    stored = stored_lists(engine)
+    assert stored[1].recommendations == [{"problem_id": "P2"}]
+    assert stored[1].generated_at == datetime(2024, 6, 2)
+    assert stored[2].recommendations == []
+    first.close()
+    second.close()
+    engine.dispose()
+
+
+def test_online_matrix_is_rebuilt_once_per_index_version():
+    built = []
+
+    def slow_matrix(index):
+        built.append(index.version)
+        time.sleep(0.05)
+        return object()
+
+    with patch("app.services.recommendation_scorer.ProblemMatrix", slow_matrix), \
+            patch.dict(recommendations._online_matrix, version=None, matrix=None):
+        threads = [threading.Thread(target=recommendations._current_matrix) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(built) == 1